@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+KR Calendar - KRX 거래일 캘린더
+
+기존: 삼성전자(005930) 10일 OHLCV 조회로 최근 영업일 탐색,
+      배포 워크플로는 평일 여부만 확인 (KRX 휴장일에도 전체 실행)
+변경: KOSPI 지수 일자로 과거 거래일을 시드 → 로컬 JSON 저장,
+      이후 구간은 평일 + 휴장일 목록으로 판정 (네트워크 없이 즉시 응답)
+
+저장 위치: {KR_CACHE_DIR 또는 ./.kr_cache}/calendar.json
+"""
+
+import os
+import json
+import threading
+from datetime import datetime, timedelta
+import pytz
+
+from kr_store import DEFAULT_CACHE_DIR, _atomic_write
+
+# pykrx (지수 일자 시드용, 미설치 시 규칙 기반만 사용)
+try:
+    from pykrx import stock as krx
+    PYKRX_AVAILABLE = True
+except ImportError:
+    PYKRX_AVAILABLE = False
+
+KST = pytz.timezone('Asia/Seoul')
+
+
+# KRX 휴장일 (주말 제외, 시드 구간 이후 판정용)
+KRX_HOLIDAYS = {
+    # 2025
+    '20250101', '20250127', '20250128', '20250129', '20250130',  # 신정, 임시공휴일, 설날
+    '20250303', '20250501', '20250505', '20250506',              # 삼일절 대체, 근로자의날, 어린이날/부처님오신날, 대체
+    '20250603', '20250606', '20250815',                          # 대통령선거, 현충일, 광복절
+    '20251003', '20251006', '20251007', '20251008', '20251009',  # 개천절, 추석, 한글날
+    '20251225', '20251231',                                      # 성탄절, 연말 휴장
+    # 2026
+    '20260101', '20260216', '20260217', '20260218',              # 신정, 설날
+    '20260302', '20260501', '20260505', '20260525',              # 삼일절 대체, 근로자의날, 어린이날, 부처님오신날 대체
+    '20260603', '20260817',                                      # 지방선거, 광복절 대체
+    '20260924', '20260925', '20260928',                          # 추석, 추석 대체
+    '20261005', '20261009', '20261225', '20261231',              # 개천절 대체, 한글날, 성탄절, 연말 휴장
+    # 2027
+    '20270101', '20270208', '20270209', '20270301',              # 신정, 설날, 설날 대체, 삼일절
+    '20270505', '20270513', '20270816',                          # 어린이날, 부처님오신날, 광복절 대체
+    '20270914', '20270915', '20270916',                          # 추석
+    '20271004', '20271011', '20271227', '20271231',              # 개천절/한글날/성탄절 대체, 연말 휴장
+}
+
+
+def _fetch_kospi_sessions(start_str, end_str):
+    """KOSPI 지수(1001) 일봉 일자 = 실제 거래일"""
+    if not PYKRX_AVAILABLE:
+        return None
+    df = krx.get_index_ohlcv(start_str, end_str, '1001')
+    if df is None or df.empty:
+        return None
+    return [d.strftime('%Y%m%d') for d in df.index]
+
+
+class KRXTradingCalendar:
+    """KRX 거래일 캘린더
+
+    synced_through 이전: KOSPI 지수 일자 (실제 거래일)
+    synced_through 이후: 평일 and KRX_HOLIDAYS 아님
+    """
+
+    SEED_YEARS = 5            # 최초 시드 기간
+    MARKET_OPEN_HOUR = 9      # 정규장 시작 (이 시각부터 당일 세션 데이터 존재)
+    MARKET_CLOSE = (15, 30)   # 정규장 마감 (시, 분)
+
+    def __init__(self, root=None, fetch_sessions=None, holidays=None):
+        base = root or DEFAULT_CACHE_DIR
+        os.makedirs(base, exist_ok=True)
+        self.path = os.path.join(base, 'calendar.json')
+        self._fetch_sessions = fetch_sessions or _fetch_kospi_sessions
+        self._holidays = set(KRX_HOLIDAYS if holidays is None else holidays)
+        self._sessions = set()
+        self._synced_through = ''
+        self._seed_from = ''
+        self._refreshed = False
+        self._lock = threading.Lock()
+        self._load()
+
+    # ================================================================
+    # 저장/동기화
+    # ================================================================
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._sessions = set(data.get('sessions', []))
+            self._synced_through = data.get('synced_through', '')
+            self._seed_from = data.get('seed_from', '')
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+
+    def _save(self):
+        payload = json.dumps({
+            'seed_from': self._seed_from,
+            'synced_through': self._synced_through,
+            'sessions': sorted(self._sessions),
+        })
+
+        def _write(path):
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(payload)
+
+        _atomic_write(self.path, _write)
+
+    def refresh(self, now=None):
+        """전일까지 거래일 동기화 (프로세스당 1회, 이미 최신이면 네트워크 없음)"""
+        with self._lock:
+            if self._refreshed:
+                return
+            self._refreshed = True
+            self._refresh(now)
+
+    def _refresh(self, now):
+        now = now or datetime.now(KST)
+        through = (now - timedelta(days=1)).strftime('%Y%m%d')
+        if self._synced_through >= through:
+            return
+
+        if self._synced_through:
+            start = (datetime.strptime(self._synced_through, '%Y%m%d')
+                     + timedelta(days=1)).strftime('%Y%m%d')
+        else:
+            start = (now - timedelta(days=365 * self.SEED_YEARS)).strftime('%Y%m%d')
+
+        try:
+            sessions = self._fetch_sessions(start, through)
+        except Exception as e:
+            print(f"⚠️ 거래일 캘린더 동기화 실패 (평일+휴장일 규칙 사용): {e}")
+            return
+        if not sessions:
+            return
+
+        if not self._seed_from:
+            self._seed_from = start
+        self._sessions.update(d for d in sessions if d <= through)
+        self._synced_through = through
+        self._save()
+
+    # ================================================================
+    # 조회
+    # ================================================================
+    def is_trading_day(self, date=None):
+        """거래일 여부 (date: 'YYYYMMDD' / datetime / None=오늘 KST)"""
+        date_str = self._to_str(date)
+        if self._seed_from and self._seed_from <= date_str <= self._synced_through:
+            return date_str in self._sessions
+        weekday = datetime.strptime(date_str, '%Y%m%d').weekday()
+        return weekday < 5 and date_str not in self._holidays
+
+    def latest_session(self, now=None):
+        """데이터가 존재하는 가장 최근 거래일 (당일은 장 시작 이후부터)"""
+        now = now or datetime.now(KST)
+        today = now.strftime('%Y%m%d')
+        if self.is_trading_day(today) and now.hour >= self.MARKET_OPEN_HOUR:
+            return today
+        return self.previous_session(today)
+
+    def is_market_open(self, now=None):
+        """정규장 시간 여부 (거래일 09:00 ~ 15:30 KST)"""
+        now = now or datetime.now(KST)
+        if not self.is_trading_day(now):
+            return False
+        return self.MARKET_OPEN_HOUR <= now.hour and (now.hour, now.minute) <= self.MARKET_CLOSE
+
+    def previous_session(self, date=None):
+        """date 직전 거래일"""
+        day = datetime.strptime(self._to_str(date), '%Y%m%d')
+        for _ in range(30):
+            day -= timedelta(days=1)
+            if self.is_trading_day(day):
+                return day.strftime('%Y%m%d')
+        return day.strftime('%Y%m%d')
+
+    def sessions(self, start_str, end_str, now=None):
+        """기간 내 거래일 목록 (latest_session 이후 미개장 세션 제외)"""
+        end_str = min(end_str, self.latest_session(now))
+        day = datetime.strptime(start_str, '%Y%m%d')
+        end = datetime.strptime(end_str, '%Y%m%d')
+        result = []
+        while day <= end:
+            if self.is_trading_day(day):
+                result.append(day.strftime('%Y%m%d'))
+            day += timedelta(days=1)
+        return result
+
+    @staticmethod
+    def _to_str(date):
+        if date is None:
+            return datetime.now(KST).strftime('%Y%m%d')
+        if isinstance(date, str):
+            return date.replace('-', '')[:8]
+        return date.strftime('%Y%m%d')
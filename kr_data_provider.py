@@ -6,13 +6,21 @@ pykrx + FinanceDataReader + OpenDartReader 통합
 yfinance 호환 인터페이스로 한국 데이터 제공
 """
 
+import os
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import time
+import pytz
 import warnings
 warnings.filterwarnings('ignore')
 
+from kr_store import OHLCVStore, FrameStore, FundamentalsStore
+from kr_rate_limit import SourceGuard, SourceUnavailable, CircuitBreaker
+from kr_calendar import KRXTradingCalendar, _fetch_kospi_sessions
+
+KST = pytz.timezone('Asia/Seoul')
+
 # pykrx
 try:
     from pykrx import stock as krx
@@ -55,16 +63,118 @@ class KRDataProvider:
     OpenDartReader: ROE, OPM, 매출성장률 (DART 재무제표)
     """
 
-    def __init__(self, dart_api_key=None):
+    # 기간 문자열 → 조회 일수
+    PERIOD_DAYS = {
+        '3mo': 90,
+        '6mo': 180,
+        '1y': 365,
+        '2y': 730,
+        '3y': 1095,
+    }
+
+    # 시장 대표 지수 (KRX 지수 코드) 및 yfinance 대체 티커
+    MARKET_INDICES = {'KOSPI': '1001', 'KOSDAQ': '2001'}
+    INDEX_NAMES = {'1001': 'KOSPI', '2001': 'KOSDAQ'}
+    INDEX_YF_TICKERS = {'1001': '^KS11', '2001': '^KQ11'}
+
+    # 다중 시간대 리샘플링 기준 (pandas Period 빈도: 금요일 마감 주, 월)
+    HORIZON_RULES = {'weekly': 'W-FRI', 'monthly': 'M'}
+
+    # OHLCV 필드별 리샘플링 집계
+    RESAMPLE_AGG = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+
+    # 일봉 확정 시각 (KST): 이 시각 이후 동기화된 봉만 확정 데이터로 간주
+    DAILY_BAR_FINAL_HOUR = 16
+
+    # 증분 동기화 시 수정주가 검증 허용 오차 (분할/병합 감지)
+    ADJUSTMENT_TOLERANCE = 0.005
+
+    # 소스별 호출 제어: rate(초당 호출), burst, 연속 실패 임계치, 쿨다운(초)
+    # krx: 종목별 OHLCV / krx_bulk: 일별 전종목 스냅샷
+    SOURCE_LIMITS = {
+        'krx': {'rate': 10, 'burst': 5, 'failure_threshold': 5, 'cooldown': 30},
+        'krx_bulk': {'rate': 5, 'burst': 2, 'failure_threshold': 5, 'cooldown': 30},
+        'yfinance': {'rate': 5, 'burst': 2, 'failure_threshold': 10, 'cooldown': 60},
+        'dart': {'rate': 5, 'burst': 2, 'failure_threshold': 5, 'cooldown': 60},
+        'naver': {'rate': 3, 'burst': 1, 'failure_threshold': 3, 'cooldown': 60},
+    }
+
+    # 정기공시 제출 기한 (월, 일, reprt_code): 사업(전년도)/1분기/반기/3분기 보고서
+    DISCLOSURE_DEADLINES = [
+        (3, 31, '11011'),
+        (5, 15, '11013'),
+        (8, 14, '11012'),
+        (11, 14, '11014'),
+    ]
+
+    # 재무지표 캐시 만료: 공시 완료 보고서는 정정공시 대비 1년 보관,
+    # 미공시 보고서는 제출 기한 전이면 1일, 기한 경과 후에도 최대 7일마다 재확인
+    FILED_REPORT_TTL = timedelta(days=365)
+    MISSING_REPORT_TTL = timedelta(days=1)
+    MISSING_REPORT_MAX_TTL = timedelta(days=7)
+
+    # yfinance 재무 보조 필드 (재무지표 캐시 대상)
+    YF_FINANCIAL_KEYS = [
+        'returnOnEquity', 'operatingMargins', 'revenueGrowth',
+        'freeCashflow', 'totalRevenue', 'enterpriseToEbitda',
+        'debtToEquity', 'beta', 'pegRatio', 'payoutRatio',
+        'earningsGrowth', 'fiveYearAvgDividendYield', 'dividendRate',
+    ]
+
+    def __init__(self, dart_api_key=None, cache_dir=None, force_resync=None):
         self._fundamental_cache = {}   # {date_str: DataFrame}
         self._market_cap_cache = {}    # {date_str: DataFrame}
+        self._market_membership = {}   # {date_str: {code: 'KOSPI'/'KOSDAQ'}}
         self._stock_listing_cache = {} # {'KOSPI': df, 'KOSDAQ': df}
         self._dart = None
         self._dart_cache = {}          # {code: {roe, opm, revenue_growth}}
-        self._naver_enabled = True     # NAVER 스크래핑 활성 (실패 시 자동 비활성)
-        self._naver_fail_count = 0
-        self._yf_enabled = True        # yfinance 활성 (연속 실패 시 자동 비활성)
-        self._yf_fail_count = 0
+        self._yf_info_cache = {}       # {code: yfinance info dict}
+
+        # 소스별 rate limit + 서킷 브레이커 (스레드 안전, 쿨다운 후 자동 복구)
+        self._guards = {
+            name: SourceGuard(name, **limits)
+            for name, limits in self.SOURCE_LIMITS.items()
+        }
+
+        # 로컬 OHLCV 저장소 (KR_FORCE_RESYNC=1 이면 전체 재동기화)
+        self._ohlcv_store = OHLCVStore(cache_dir)
+        if force_resync is None:
+            force_resync = os.environ.get('KR_FORCE_RESYNC', '') == '1'
+        self._force_resync = force_resync
+        self._resynced_codes = set()   # 이번 프로세스에서 전체 재동기화 완료된 종목
+        self._history_cache = {}       # {code: (start_str, DataFrame)} 프로세스 내 동기화 결과
+        self._intraday_date = None     # 장중 모드: 당일 세션 일자
+        self._intraday_snapshot = None # 장중 모드: 당일 전종목 스냅샷 (잠정 봉)
+
+        # KRX 거래일 캘린더 (지수 일자 시드 + 휴장일 목록, 로컬 저장)
+        self.calendar = KRXTradingCalendar(
+            cache_dir,
+            fetch_sessions=lambda start, end: self._call_source(
+                'krx_bulk', _fetch_kospi_sessions, start, end))
+
+        # 재무지표 캐시 (DART/NAVER/yfinance, 공시 일정 기준 만료)
+        self._fundamentals_store = FundamentalsStore(cache_dir)
+        try:
+            self._fundamentals_store.purge_expired(datetime.now(KST))
+        except Exception:
+            pass
+
+        # 전종목 일별 스냅샷 (growth/value 실행 및 cron 슬롯 간 공유)
+        self._snapshot_store = FrameStore(cache_dir, 'snapshots')
+        self._snapshot_cache = {}      # {date_str: DataFrame}
+
+        # 일자별 전종목 종목명 테이블 (유니버스 구성용)
+        self._ticker_name_store = FrameStore(cache_dir, 'ticker_names')
+        self._ticker_name_cache = {}   # {date_str: Series(code → name)}
+
+        # 지수 OHLCV (KOSPI/KOSDAQ/업종 지수, 확정 일자까지 디스크 저장)
+        self._index_store = FrameStore(cache_dir, 'index_ohlcv')
+        self._index_cache = {}         # {(index_code, period): DataFrame}
+
+        # 일자별 종목코드→섹터 매핑 (KRX 업종 인덱스 20회 호출 재사용)
+        self._sector_map_store = FrameStore(cache_dir, 'sector_map')
+        self._sector_map = {}
+        self._fdr_sector_memo = {}     # {FDR 세부 업종: KRX 대분류}
 
         if dart_api_key and DART_AVAILABLE:
             try:
@@ -73,41 +183,45 @@ class KRDataProvider:
             except Exception as e:
                 print(f"⚠️ DART API 연결 실패: {e}")
 
+    def _call_source(self, source, fn, *args, **kwargs):
+        """소스 가드를 거쳐 호출 (차단 시 SourceUnavailable, 실패 시 예외 재전파)"""
+        return self._guards[source].call(fn, *args, **kwargs)
+
+    def _source_blocked(self, *sources):
+        """지정 소스 중 서킷 브레이커가 닫혀 있지 않은 소스 존재 여부"""
+        return any(self._guards[s].breaker.state != CircuitBreaker.CLOSED for s in sources)
+
+    def source_metrics(self):
+        """소스별 호출 메트릭 {source: {calls, successes, failures, rejected, ...}}"""
+        return {name: guard.metrics() for name, guard in self._guards.items()}
+
+    def print_source_metrics(self):
+        """소스별 호출 메트릭 요약 출력 (호출 없는 소스 제외)"""
+        for name, m in self.source_metrics().items():
+            if m['calls'] == 0 and m['rejected'] == 0:
+                continue
+            print(f"   {name:9s} 호출 {m['calls']:4d} | 성공 {m['successes']:4d} | "
+                  f"실패 {m['failures']:3d} | 거부 {m['rejected']:3d} | "
+                  f"대기 {m['wait_seconds']:.1f}s | 상태 {m['state']}", flush=True)
+
+    def warm_shared_caches(self):
+        """병렬 수집 전 공유 캐시 선로딩 (스레드 간 중복 벌크 호출 방지)"""
+        date_str = self._find_latest_trading_date()
+        self._get_bulk_market_cap(date_str)
+        self._get_bulk_fundamentals(date_str)
+        self._build_sector_map()
+        return date_str
+
     # ================================================================
     # 영업일 탐색
     # ================================================================
-    def _find_latest_trading_date(self, max_lookback=10):
-        """가장 최근 영업일 찾기 (주말/공휴일/장 시작 전 대응)"""
-        if hasattr(self, '_cached_trading_date') and self._cached_trading_date:
+    def _find_latest_trading_date(self):
+        """가장 최근 영업일 (거래일 캘린더 기준, 주말/공휴일/장 시작 전 대응)"""
+        if getattr(self, '_cached_trading_date', None):
             return self._cached_trading_date
-
-        today = datetime.now()
-        # 삼성전자 개별 OHLCV로 최근 영업일 탐색 (벌크 API 장애 대응)
-        try:
-            start_str = (today - timedelta(days=max_lookback)).strftime('%Y%m%d')
-            end_str = today.strftime('%Y%m%d')
-            df = krx.get_market_ohlcv(start_str, end_str, '005930')
-            if df is not None and not df.empty:
-                last_date = df.index[-1]
-                if hasattr(last_date, 'strftime'):
-                    date_str = last_date.strftime('%Y%m%d')
-                else:
-                    date_str = str(last_date).replace('-', '')[:8]
-                self._cached_trading_date = date_str
-                return date_str
-        except Exception:
-            pass
-
-        # fallback: 주말 건너뛴 어제
-        for i in range(max_lookback):
-            date = today - timedelta(days=i)
-            if date.weekday() < 5:
-                fallback = date.strftime('%Y%m%d')
-                self._cached_trading_date = fallback
-                return fallback
-        fallback = (today - timedelta(days=1)).strftime('%Y%m%d')
-        self._cached_trading_date = fallback
-        return fallback
+        self.calendar.refresh()
+        self._cached_trading_date = self.calendar.latest_session()
+        return self._cached_trading_date
 
     # ================================================================
     # 유니버스 (종목 리스트)
@@ -115,6 +229,8 @@ class KRDataProvider:
     def get_universe(self, kosdaq_top_n=100):
         """KOSPI 200 + KOSDAQ 시총 상위 N개 유니버스
 
+        종목명은 일자별 전종목 벌크 테이블 1회 조회 후 join (종목별 조회 없음)
+
         Returns:
             list of dict: [{code, name, market, sector, industry}, ...]
         """
@@ -128,13 +244,7 @@ class KRDataProvider:
                 kospi200_codes = krx.get_index_portfolio_deposit_file('1028')
                 if kospi200_codes and len(kospi200_codes) > 0:
                     print(f"✅ KOSPI 200: {len(kospi200_codes)}개 로드 (pykrx)")
-                    for code in kospi200_codes:
-                        name = krx.get_market_ticker_name(code)
-                        universe.append({
-                            'code': code,
-                            'name': name or code,
-                            'market': 'KOSPI',
-                        })
+                    universe.extend(self._build_universe_rows(kospi200_codes, 'KOSPI', date_str))
                     kospi200_loaded = True
             except Exception:
                 pass
@@ -144,21 +254,10 @@ class KRDataProvider:
             try:
                 all_stocks = self._get_fdr_stock_listing()
                 if all_stocks is not None and not all_stocks.empty:
-                    # KOSPI 주요 종목: 시총 기준으로 상위 200개 선택
-                    # FDR에는 시총이 없으므로 yfinance로 시총 상위 추정
-                    kospi_stocks = all_stocks[all_stocks['Market'] == 'KOSPI']
-                    # KOSPI 전체에서 상위 200개 (이름순 대신 코드 기반)
-                    # 시총 정보 없이는 전체 KOSPI를 가져와야 함
-                    kospi_codes = kospi_stocks['Code'].tolist()[:200]
-                    print(f"✅ KOSPI 상위: {len(kospi_codes)}개 로드 (FDR fallback)")
-                    for _, row in kospi_stocks.head(200).iterrows():
-                        universe.append({
-                            'code': row['Code'],
-                            'name': row['Name'],
-                            'market': 'KOSPI',
-                            'sector': row.get('Sector', ''),
-                            'industry': row.get('Industry', ''),
-                        })
+                    # KOSPI 주요 종목: FDR에는 시총이 없으므로 목록 순서 기준 상위 200개
+                    kospi_stocks = all_stocks[all_stocks['Market'] == 'KOSPI'].head(200)
+                    print(f"✅ KOSPI 상위: {len(kospi_stocks)}개 로드 (FDR fallback)")
+                    universe.extend(self._fdr_universe_rows(kospi_stocks, 'KOSPI'))
                     kospi200_loaded = True
             except Exception as e:
                 print(f"⚠️ FDR KOSPI 로드 실패: {e}")
@@ -171,13 +270,7 @@ class KRDataProvider:
                 if kosdaq_cap is not None and not kosdaq_cap.empty:
                     kosdaq_top = kosdaq_cap.nlargest(kosdaq_top_n, '시가총액')
                     print(f"✅ KOSDAQ 시총 상위 {len(kosdaq_top)}개 로드 (pykrx)")
-                    for code in kosdaq_top.index:
-                        name = krx.get_market_ticker_name(code)
-                        universe.append({
-                            'code': code,
-                            'name': name or code,
-                            'market': 'KOSDAQ',
-                        })
+                    universe.extend(self._build_universe_rows(kosdaq_top.index, 'KOSDAQ', date_str))
                     kosdaq_loaded = True
             except Exception:
                 pass
@@ -186,17 +279,9 @@ class KRDataProvider:
             try:
                 all_stocks = self._get_fdr_stock_listing()
                 if all_stocks is not None and not all_stocks.empty:
-                    kosdaq_stocks = all_stocks[all_stocks['Market'] == 'KOSDAQ']
-                    kosdaq_top = kosdaq_stocks.head(kosdaq_top_n)
+                    kosdaq_top = all_stocks[all_stocks['Market'] == 'KOSDAQ'].head(kosdaq_top_n)
                     print(f"✅ KOSDAQ 상위: {len(kosdaq_top)}개 로드 (FDR fallback)")
-                    for _, row in kosdaq_top.iterrows():
-                        universe.append({
-                            'code': row['Code'],
-                            'name': row['Name'],
-                            'market': 'KOSDAQ',
-                            'sector': row.get('Sector', ''),
-                            'industry': row.get('Industry', ''),
-                        })
+                    universe.extend(self._fdr_universe_rows(kosdaq_top, 'KOSDAQ'))
             except Exception as e:
                 print(f"⚠️ FDR KOSDAQ 로드 실패: {e}")
 
@@ -206,6 +291,65 @@ class KRDataProvider:
         print(f"📊 전체 유니버스: {len(universe)}개 종목")
         return universe
 
+    def _build_universe_rows(self, codes, market, date_str):
+        """종목코드 목록 → 유니버스 레코드 (벌크 종목명 테이블 join)"""
+        frame = pd.DataFrame({'code': list(codes)})
+        names = self._get_ticker_names(date_str)
+        frame['name'] = frame['code'].map(names) if names is not None else None
+
+        # 벌크 테이블에 없는 종목 (당일 신규상장/거래정지 등)만 개별 조회
+        missing = frame['name'].isna() | (frame['name'] == '')
+        if missing.any():
+            frame.loc[missing, 'name'] = frame.loc[missing, 'code'].map(self._lookup_ticker_name)
+        frame['market'] = market
+        return frame.to_dict('records')
+
+    def _fdr_universe_rows(self, stocks, market):
+        """FDR 종목 리스트 → 유니버스 레코드"""
+        frame = pd.DataFrame({
+            'code': stocks['Code'],
+            'name': stocks['Name'],
+            'market': market,
+            'sector': stocks['Sector'] if 'Sector' in stocks.columns else '',
+            'industry': stocks['Industry'] if 'Industry' in stocks.columns else '',
+        })
+        return frame.to_dict('records')
+
+    def _lookup_ticker_name(self, code):
+        """종목명 개별 조회 (벌크 테이블 누락분 보완용)"""
+        try:
+            return krx.get_market_ticker_name(code) or code
+        except Exception:
+            return code
+
+    def _get_ticker_names(self, date_str):
+        """일자별 전종목 종목명 (메모리 → 디스크 → KRX 벌크 1회)
+
+        Returns:
+            Series: index=종목코드, values=종목명 (실패 시 None)
+        """
+        if date_str in self._ticker_name_cache:
+            return self._ticker_name_cache[date_str]
+
+        names = None
+        stored = self._ticker_name_store.read(date_str)
+        if stored is not None and 'name' in stored.columns:
+            names = stored['name']
+        elif PYKRX_AVAILABLE:
+            try:
+                table = self._call_source('krx_bulk', krx.get_market_price_change,
+                                          date_str, date_str, market='ALL')
+                if table is not None and not table.empty and '종목명' in table.columns:
+                    names = table['종목명'].astype(str)
+                    names.index = names.index.astype(str)
+                    names.index.name = 'code'
+                    self._ticker_name_store.write(date_str, names.rename('name').to_frame())
+            except Exception as e:
+                print(f"⚠️ {date_str} 종목명 테이블 로드 실패: {e}")
+
+        self._ticker_name_cache[date_str] = names
+        return names
+
     def _get_fdr_stock_listing(self):
         """FDR 종목 리스트 (캐시)"""
         if not hasattr(self, '_fdr_listing_cache') or self._fdr_listing_cache is None:
@@ -239,46 +383,57 @@ class KRDataProvider:
         '1025': '보험',
         '1026': '서비스업',
     }
+    SECTOR_INDEX_CODES = {name: code for code, name in KRX_SECTOR_INDICES.items()}
+
 
     def _build_sector_map(self):
-        """종목코드→섹터 매핑 구축 (KRX 인덱스 → FDR fallback)"""
-        if hasattr(self, '_sector_map') and self._sector_map:
+        """종목코드→섹터 매핑 구축 (메모리 → 디스크(일자별) → KRX 인덱스 → FDR fallback)"""
+        if self._sector_map:
             return self._sector_map
 
-        self._sector_map = {}
+        date_str = self._find_latest_trading_date()
+        stored = self._sector_map_store.read(date_str)
+        if stored is not None and not stored.empty:
+            self._sector_map = stored['sector'].to_dict()
+            return self._sector_map
+
+        sector_map = {}
+        complete = False
 
         # 방법 1: pykrx KRX 업종 인덱스
         if PYKRX_AVAILABLE:
-            try:
-                for idx_code, sector_name in self.KRX_SECTOR_INDICES.items():
-                    try:
-                        codes = krx.get_index_portfolio_deposit_file(idx_code)
-                        if codes:
-                            for code in codes:
-                                self._sector_map[code] = sector_name
-                    except Exception:
-                        continue
-                if self._sector_map:
-                    return self._sector_map
-            except Exception:
-                pass
+            complete = True
+            for idx_code, sector_name in self.KRX_SECTOR_INDICES.items():
+                try:
+                    codes = self._call_source('krx_bulk', krx.get_index_portfolio_deposit_file, idx_code)
+                    if codes:
+                        for code in codes:
+                            sector_map[code] = sector_name
+                except Exception:
+                    complete = False
+                    continue
 
         # 방법 2: FDR fallback (KRX API 장애 시)
-        if FDR_AVAILABLE:
+        if not sector_map and FDR_AVAILABLE:
             try:
                 all_stocks = self._get_fdr_stock_listing()
                 if all_stocks is not None and not all_stocks.empty:
-                    # FDR Sector를 KRX 업종명으로 근사 매핑
-                    for _, row in all_stocks.iterrows():
-                        code = row.get('Code', '')
-                        sector = row.get('Sector', '')
-                        if code and sector:
-                            # FDR 세부 업종 → KRX 대분류 근사 매핑
-                            mapped = self._map_fdr_sector_to_krx(sector)
-                            self._sector_map[code] = mapped
+                    # FDR 세부 업종 → KRX 대분류 근사 매핑 (고유 업종명 단위로 1회씩)
+                    listing = all_stocks[['Code', 'Sector']].dropna()
+                    listing = listing[(listing['Code'] != '') & (listing['Sector'] != '')]
+                    mapped = self._map_fdr_sectors_to_krx(listing['Sector'])
+                    sector_map = dict(zip(listing['Code'], mapped))
+                    complete = True
             except Exception:
                 pass
 
+        # 일부 인덱스 조회 실패 시 불완전 매핑은 디스크에 남기지 않음
+        if sector_map and complete:
+            frame = pd.DataFrame({'sector': pd.Series(sector_map, dtype=object)})
+            frame.index.name = 'code'
+            self._sector_map_store.write(date_str, frame)
+
+        self._sector_map = sector_map
         return self._sector_map
 
     # FDR 세부 업종 → KRX 대분류 매핑
@@ -301,13 +456,23 @@ class KRDataProvider:
     }
 
     def _map_fdr_sector_to_krx(self, fdr_sector):
-        """FDR 세부 업종명 → KRX 대분류 매핑"""
+        """FDR 세부 업종명 → KRX 대분류 매핑 (업종명별 결과 memo)"""
         if not fdr_sector:
             return ''
+        if fdr_sector in self._fdr_sector_memo:
+            return self._fdr_sector_memo[fdr_sector]
+        mapped = fdr_sector  # 매핑 실패 시 원본 반환
         for keyword, krx_sector in self.FDR_TO_KRX_SECTOR.items():
             if keyword in fdr_sector:
-                return krx_sector
-        return fdr_sector  # 매핑 실패 시 원본 반환
+                mapped = krx_sector
+                break
+        self._fdr_sector_memo[fdr_sector] = mapped
+        return mapped
+
+    def _map_fdr_sectors_to_krx(self, sectors):
+        """FDR 업종 Series → KRX 대분류 Series (고유값만 매핑 후 벡터 치환)"""
+        lookup = {sector: self._map_fdr_sector_to_krx(sector) for sector in sectors.unique()}
+        return sectors.map(lookup)
 
     def _enrich_sector_info(self, universe):
         """섹터 정보 보강 (KRX 인덱스 or FDR)"""
@@ -334,43 +499,53 @@ class KRDataProvider:
     # 벌크 데이터 (캐시)
     # ================================================================
     def _get_bulk_fundamentals(self, date_str):
-        """벌크 PER/PBR/DIV 데이터 (캐시, KRX API 장애 시 빈 DataFrame)"""
+        """벌크 PER/PBR/DIV 데이터 (캐시, KRX API 장애 시 빈 DataFrame — 실패는 캐시하지 않고 재시도)"""
         if date_str not in self._fundamental_cache:
-            if PYKRX_AVAILABLE:
-                try:
-                    df_kospi = krx.get_market_fundamental(date_str, market='KOSPI')
-                    df_kosdaq = krx.get_market_fundamental(date_str, market='KOSDAQ')
-                    combined = pd.concat([df_kospi, df_kosdaq])
-                    if not combined.empty:
-                        self._fundamental_cache[date_str] = combined
-                        return combined
-                except Exception:
-                    pass  # KRX API 장애 → yfinance fallback
-            self._fundamental_cache[date_str] = pd.DataFrame()
+            if not PYKRX_AVAILABLE:
+                self._fundamental_cache[date_str] = pd.DataFrame()
+                return self._fundamental_cache[date_str]
+            try:
+                df_kospi = self._call_source('krx_bulk', krx.get_market_fundamental, date_str, market='KOSPI')
+                df_kosdaq = self._call_source('krx_bulk', krx.get_market_fundamental, date_str, market='KOSDAQ')
+            except SourceUnavailable:
+                return pd.DataFrame()  # 서킷 차단 → yfinance fallback
+            except Exception as e:
+                print(f"⚠️ {date_str} 벌크 재무지표 로드 실패: {e}")
+                return pd.DataFrame()  # KRX API 장애 → yfinance fallback
+            self._fundamental_cache[date_str] = pd.concat([df_kospi, df_kosdaq])
         return self._fundamental_cache[date_str]
 
     def _get_bulk_market_cap(self, date_str):
-        """벌크 시가총액 데이터 (캐시, KRX API 장애 시 빈 DataFrame)"""
+        """벌크 시가총액 데이터 (캐시, KRX API 장애 시 빈 DataFrame — 실패는 캐시하지 않고 재시도)"""
         if date_str not in self._market_cap_cache:
-            if PYKRX_AVAILABLE:
-                try:
-                    df_kospi = krx.get_market_cap(date_str, market='KOSPI')
-                    df_kosdaq = krx.get_market_cap(date_str, market='KOSDAQ')
-                    combined = pd.concat([df_kospi, df_kosdaq])
-                    if not combined.empty:
-                        self._market_cap_cache[date_str] = combined
-                        return combined
-                except Exception:
-                    pass  # KRX API 장애 → yfinance fallback
-            self._market_cap_cache[date_str] = pd.DataFrame()
+            if not PYKRX_AVAILABLE:
+                self._market_cap_cache[date_str] = pd.DataFrame()
+                return self._market_cap_cache[date_str]
+            try:
+                df_kospi = self._call_source('krx_bulk', krx.get_market_cap, date_str, market='KOSPI')
+                df_kosdaq = self._call_source('krx_bulk', krx.get_market_cap, date_str, market='KOSDAQ')
+            except SourceUnavailable:
+                return pd.DataFrame()  # 서킷 차단 → yfinance fallback
+            except Exception as e:
+                print(f"⚠️ {date_str} 벌크 시가총액 로드 실패: {e}")
+                return pd.DataFrame()  # KRX API 장애 → yfinance fallback
+            combined = pd.concat([df_kospi, df_kosdaq])
+            if not combined.empty:
+                membership = dict.fromkeys(df_kospi.index, 'KOSPI')
+                membership.update(dict.fromkeys(df_kosdaq.index, 'KOSDAQ'))
+                self._market_membership[date_str] = membership
+            self._market_cap_cache[date_str] = combined
         return self._market_cap_cache[date_str]
 
     # ================================================================
     # 개별 종목 정보 (yfinance ticker.info 호환)
     # ================================================================
-    def get_info(self, code, date_str=None):
+    def get_info(self, code, date_str=None, batch=None):
         """종목 정보 (yfinance info 호환 딕셔너리)
 
+        Args:
+            batch: get_info_batch() 결과 DataFrame (있으면 벌크 조회/개별 OHLCV 생략)
+
         Returns:
             dict with keys: currentPrice, marketCap, averageVolume,
                            PER, PBR, dividendYield, returnOnEquity,
@@ -380,7 +555,23 @@ class KRDataProvider:
         if date_str is None:
             date_str = self._find_latest_trading_date()
 
-        info = {
+        info = self._empty_info()
+
+        try:
+            if batch is not None and code in batch.index:
+                info.update(batch.loc[code].to_dict())
+            else:
+                self._fill_market_info(code, info, date_str)
+            self._complete_info(code, info)
+
+        except Exception as e:
+            print(f"⚠️ {code} info 로드 실패: {e}")
+
+        return info
+
+    def _empty_info(self):
+        """info 딕셔너리 기본값"""
+        return {
             'currentPrice': 0,
             'regularMarketPrice': 0,
             'marketCap': 0,
@@ -408,94 +599,192 @@ class KRDataProvider:
             'previousClose': 0,
         }
 
+    def _fill_market_info(self, code, info, date_str):
+        """종목별 시장 정보 (이름, 벌크 시총/PER/PBR/DIV 조회, 현재가/전일종가)"""
+        # 이름
         try:
-            # 이름
-            try:
-                name = krx.get_market_ticker_name(code) if PYKRX_AVAILABLE else None
-            except Exception:
-                name = None
-            info['shortName'] = name or code
-
-            # --- pykrx 벌크 API (시총/PER/PBR/DIV) ---
-            # KRX API 장애 시 빈 DataFrame 반환 → yfinance fallback
-            cap_df = self._get_bulk_market_cap(date_str)
-            if not cap_df.empty and code in cap_df.index:
-                row = cap_df.loc[code]
-                info['marketCap'] = int(row.get('시가총액', 0))
-                info['averageVolume'] = int(row.get('거래량', 0))
-                info['tradingValue'] = int(row.get('거래대금', 0))
-
-            fund_df = self._get_bulk_fundamentals(date_str)
-            if not fund_df.empty and code in fund_df.index:
-                row = fund_df.loc[code]
-                per = row.get('PER', 0)
-                pbr = row.get('PBR', 0)
-                div_yield = row.get('DIV', 0)
-                info['trailingPE'] = float(per) if per and per > 0 else 0
-                info['forwardPE'] = float(per) if per and per > 0 else 0
-                info['priceToBook'] = float(pbr) if pbr and pbr > 0 else 0
-                info['dividendYield'] = float(div_yield) / 100 if div_yield and div_yield > 0 else 0
-
-            # --- 현재가 + 전일종가 (pykrx 개별 OHLCV, 아직 작동) ---
-            try:
-                end_date = datetime.strptime(date_str, '%Y%m%d')
-                start_lookback = (end_date - timedelta(days=10)).strftime('%Y%m%d')
-                ohlcv = krx.get_market_ohlcv(start_lookback, date_str, code) if PYKRX_AVAILABLE else None
-                if ohlcv is not None and not ohlcv.empty and len(ohlcv) >= 1:
-                    ohlcv = ohlcv[ohlcv['거래량'] > 0]
-                    if len(ohlcv) >= 1:
-                        info['currentPrice'] = int(ohlcv['종가'].iloc[-1])
-                        info['regularMarketPrice'] = info['currentPrice']
-                        if len(ohlcv) >= 2:
-                            info['previousClose'] = int(ohlcv['종가'].iloc[-2])
-                        else:
-                            info['previousClose'] = info['currentPrice']
-            except Exception:
-                pass
+            name = krx.get_market_ticker_name(code) if PYKRX_AVAILABLE else None
+        except Exception:
+            name = None
+        info['shortName'] = name or code
+
+        # --- pykrx 벌크 API (시총/PER/PBR/DIV) ---
+        # KRX API 장애 시 빈 DataFrame 반환 → yfinance fallback
+        cap_df = self._get_bulk_market_cap(date_str)
+        if not cap_df.empty and code in cap_df.index:
+            row = cap_df.loc[code]
+            info['marketCap'] = int(row.get('시가총액', 0))
+            info['averageVolume'] = int(row.get('거래량', 0))
+            info['tradingValue'] = int(row.get('거래대금', 0))
+
+        fund_df = self._get_bulk_fundamentals(date_str)
+        if not fund_df.empty and code in fund_df.index:
+            row = fund_df.loc[code]
+            per = row.get('PER', 0)
+            pbr = row.get('PBR', 0)
+            div_yield = row.get('DIV', 0)
+            info['trailingPE'] = float(per) if per and per > 0 else 0
+            info['forwardPE'] = float(per) if per and per > 0 else 0
+            info['priceToBook'] = float(pbr) if pbr and pbr > 0 else 0
+            info['dividendYield'] = float(div_yield) / 100 if div_yield and div_yield > 0 else 0
+
+        self._fill_price_from_ohlcv(code, info, date_str)
+
+    def _fill_price_from_ohlcv(self, code, info, date_str):
+        """현재가 + 전일종가 (1년 히스토리의 최근 10일, 거래정지일 제외)
+
+        별도 10일 OHLCV 조회 대신 get_history 결과를 재사용
+        → 이후 분석 단계의 히스토리 조회와 합쳐 종목당 가격 요청 1회
+        """
+        try:
+            hist = self.get_history(code, period='1y')
+            if hist.empty:
+                return
+            end_date = datetime.strptime(date_str, '%Y%m%d')
+            recent = hist[(hist.index >= pd.Timestamp(end_date - timedelta(days=10)))
+                          & (hist.index < pd.Timestamp(end_date + timedelta(days=1)))]
+            if len(recent) >= 1:
+                info['currentPrice'] = int(recent['Close'].iloc[-1])
+                info['regularMarketPrice'] = info['currentPrice']
+                if len(recent) >= 2:
+                    info['previousClose'] = int(recent['Close'].iloc[-2])
+                else:
+                    info['previousClose'] = info['currentPrice']
+        except Exception:
+            pass
 
-            # --- yfinance fallback (pykrx 벌크 API 장애 대응) ---
-            # marketCap, PER, PBR, DIV, previousClose 등이 0이면 yfinance로 보완
-            needs_yf = (info['marketCap'] == 0 or info['trailingPE'] == 0
-                        or info['currentPrice'] == 0)
-            if needs_yf and YF_AVAILABLE and self._yf_enabled:
-                self._fill_from_yfinance(code, info)
+    def _complete_info(self, code, info):
+        """시장 정보 이후 단계: yfinance 보완, 섹터, DART 재무, PBR 추정"""
+        # --- yfinance fallback (pykrx 벌크 API 장애 대응) ---
+        # marketCap, PER, PBR, DIV, previousClose 등이 0이면 yfinance로 보완
+        needs_yf = (info['marketCap'] == 0 or info['trailingPE'] == 0
+                    or info['currentPrice'] == 0)
+        if needs_yf and YF_AVAILABLE:
+            self._fill_from_yfinance(code, info)
 
-            # 섹터/업종
-            self._fill_sector_info(code, info)
+        # 섹터/업종
+        self._fill_sector_info(code, info)
 
-            # DART 재무제표 (ROE, OPM, 매출성장률)
-            self._fill_dart_financials(code, info)
+        # DART 재무제표 (ROE, OPM, 매출성장률)
+        self._fill_dart_financials(code, info)
 
-            # PBR 추정 (yfinance에서 PBR 없는 경우: PBR ≈ PER × ROE)
-            if info['priceToBook'] == 0 and info['trailingPE'] > 0 and info.get('returnOnEquity'):
-                roe = info['returnOnEquity']
-                if roe and roe > 0:
-                    info['priceToBook'] = round(info['trailingPE'] * roe, 2)
+        # PBR 추정 (yfinance에서 PBR 없는 경우: PBR ≈ PER × ROE)
+        if info['priceToBook'] == 0 and info['trailingPE'] > 0 and info.get('returnOnEquity'):
+            roe = info['returnOnEquity']
+            if roe and roe > 0:
+                info['priceToBook'] = round(info['trailingPE'] * roe, 2)
 
-        except Exception as e:
-            print(f"⚠️ {code} info 로드 실패: {e}")
+    # ================================================================
+    # 다종목 정보 (벌크 join)
+    # ================================================================
+    def get_info_batch(self, codes, date_str=None, as_dict=False):
+        """다종목 시장 정보를 벌크 프레임 join으로 한 번에 구성
 
-        return info
+        시총/거래량/거래대금(get_market_cap) + PER/PBR/DIV(get_market_fundamental)
+        + 현재가/전일종가(전종목 일별 스냅샷 2일치)를 종목코드 기준으로 결합.
+        벌크 데이터에 없는 종목만 개별 OHLCV로 보완
+
+        Args:
+            as_dict: True면 {code: info dict} (DART/yfinance/섹터까지 채운
+                     get_info 호환 딕셔너리, _get_fundamental_score 입력용)
+
+        Returns:
+            DataFrame: index=code, columns=BATCH_INFO_COLUMNS
+        """
+        if date_str is None:
+            date_str = self._find_latest_trading_date()
+
+        codes = list(dict.fromkeys(codes))
+        frame = pd.DataFrame(index=pd.Index(codes, name='code'))
+
+        # 종목명 (벌크 테이블 → 누락분만 개별 조회)
+        names = self._get_ticker_names(date_str)
+        short_names = frame.index.to_series().map(names) if names is not None \
+            else pd.Series(np.nan, index=frame.index, dtype=object)
+        missing = short_names.isna() | (short_names == '')
+        if missing.any():
+            short_names[missing] = short_names.index[missing].map(self._lookup_ticker_name)
+        frame['shortName'] = short_names
+
+        # 시총/거래량/거래대금
+        cap_df = self._get_bulk_market_cap(date_str)
+        cap = cap_df.reindex(frame.index) if not cap_df.empty else pd.DataFrame(index=frame.index)
+        for src, dst in [('시가총액', 'marketCap'), ('거래량', 'averageVolume'),
+                         ('거래대금', 'tradingValue')]:
+            values = cap[src] if src in cap.columns else pd.Series(0, index=frame.index)
+            frame[dst] = values.fillna(0).astype('int64')
+
+        # PER/PBR/DIV (0 이하/결측 → 0)
+        fund_df = self._get_bulk_fundamentals(date_str)
+        fund = fund_df.reindex(frame.index) if not fund_df.empty else pd.DataFrame(index=frame.index)
+
+        def _positive(col):
+            values = fund[col] if col in fund.columns else pd.Series(0.0, index=frame.index)
+            values = values.astype(float)
+            return values.where(values > 0, 0.0)
+
+        frame['trailingPE'] = _positive('PER')
+        frame['forwardPE'] = frame['trailingPE']
+        frame['priceToBook'] = _positive('PBR')
+        frame['dividendYield'] = _positive('DIV') / 100
+
+        # 현재가/전일종가 (거래일 스냅샷, 거래정지 종목은 결측 → 개별 보완)
+        frame['currentPrice'] = self._snapshot_close(date_str, frame.index)
+        prev_date = self._previous_trading_date(date_str)
+        frame['previousClose'] = (self._snapshot_close(prev_date, frame.index)
+                                  if prev_date else 0)
+
+        missing = frame.index[(frame['currentPrice'] == 0) | (frame['previousClose'] == 0)]
+        for code in missing:
+            price = {'currentPrice': 0, 'previousClose': 0}
+            self._fill_price_from_ohlcv(code, price, date_str)
+            frame.loc[code, ['currentPrice', 'previousClose']] = [price['currentPrice'],
+                                                                   price['previousClose']]
+        frame['regularMarketPrice'] = frame['currentPrice']
+        frame = frame[self.BATCH_INFO_COLUMNS]
+
+        if as_dict:
+            return {code: self.get_info(code, date_str, batch=frame) for code in frame.index}
+        return frame
+
+    # get_info_batch 결과 컬럼 (get_info 딕셔너리 키와 동일)
+    BATCH_INFO_COLUMNS = [
+        'shortName', 'currentPrice', 'regularMarketPrice', 'previousClose',
+        'marketCap', 'averageVolume', 'tradingValue',
+        'trailingPE', 'forwardPE', 'priceToBook', 'dividendYield',
+    ]
+
+    def _snapshot_close(self, date_str, codes):
+        """일별 스냅샷 종가 (거래량 0/미존재 → 0)"""
+        snap = self._get_daily_snapshot(date_str)
+        if snap is None or snap.empty:
+            return pd.Series(0, index=codes, dtype='int64')
+        traded = snap.loc[snap['Volume'] > 0, 'Close']
+        return traded.reindex(codes).fillna(0).astype('int64')
+
+    def _previous_trading_date(self, date_str):
+        """date_str 직전 영업일"""
+        self.calendar.refresh()
+        return self.calendar.previous_session(date_str)
 
     def _get_yf_info(self, code):
         """yfinance info 캐시 (중복 호출 방지)"""
-        if not hasattr(self, '_yf_info_cache'):
-            self._yf_info_cache = {}
         if code in self._yf_info_cache:
             return self._yf_info_cache[code]
 
         yf_info = None
         for suffix in ['.KS', '.KQ']:
             try:
-                yf_ticker = yf.Ticker(f"{code}{suffix}")
-                candidate = yf_ticker.info
+                candidate = self._call_source(
+                    'yfinance', lambda: yf.Ticker(f"{code}{suffix}").info)
                 if not candidate or not isinstance(candidate, dict):
                     continue
                 if not candidate.get('quoteType') and not candidate.get('shortName'):
                     continue
                 yf_info = candidate
-                self._yf_fail_count = 0
                 break
+            except SourceUnavailable:
+                return None  # 일시 차단 → 캐시하지 않고 다음 호출에서 재시도
             except Exception:
                 continue
 
@@ -568,15 +857,12 @@ class KRDataProvider:
                     info[key] = yf_info[key]
 
         except Exception:
-            self._yf_fail_count += 1
-            if self._yf_fail_count >= 10:
-                self._yf_enabled = False
-                print("   yfinance 자동 비활성화 (연속 10회 API 오류)", flush=True)
+            pass
 
     def _fill_sector_info(self, code, info):
         """종목의 섹터 정보 채우기 (캐시된 sector_map 또는 이름 기반)"""
         try:
-            if hasattr(self, '_sector_map') and self._sector_map:
+            if self._sector_map:
                 sector = self._sector_map.get(code, '')
                 if sector:
                     info['sector'] = sector
@@ -608,7 +894,7 @@ class KRDataProvider:
                 # 최근 연도부터 시도
                 for yr in [current_year - 1, current_year - 2]:
                     try:
-                        fs = self._dart.finstate(code, yr, reprt_code='11011')  # 사업보고서
+                        fs = self._get_dart_finstate(code, yr, '11011')  # 사업보고서
                         if fs is not None and not fs.empty:
                             break
                     except Exception:
@@ -646,7 +932,7 @@ class KRDataProvider:
                         fs_prev = None
                         for yr in [current_year - 2, current_year - 3]:
                             try:
-                                fs_prev = self._dart.finstate(code, yr, reprt_code='11011')
+                                fs_prev = self._get_dart_finstate(code, yr, '11011')
                                 if fs_prev is not None and not fs_prev.empty:
                                     break
                             except Exception:
@@ -664,10 +950,10 @@ class KRDataProvider:
                 # DART 실패 시 조용히 넘어감
                 pass
 
-        # yfinance 한국 종목 (.KS/.KQ) - DART 실패 시 대안 (캐시된 yf_info 재사용)
-        if (roe is None or opm is None or revenue_growth is None) and YF_AVAILABLE and self._yf_enabled:
+        # yfinance 한국 종목 (.KS/.KQ) - DART 실패 시 대안 (재무지표 캐시 우선)
+        if (roe is None or opm is None or revenue_growth is None) and YF_AVAILABLE:
             try:
-                yf_info = self._get_yf_info(code)
+                yf_info = self._get_yf_financials(code)
                 if yf_info:
                     if roe is None and yf_info.get('returnOnEquity') is not None:
                         roe = yf_info['returnOnEquity']
@@ -679,16 +965,14 @@ class KRDataProvider:
                         revenue_growth = yf_info['revenueGrowth']
                         info['revenueGrowth'] = revenue_growth
                     # 추가 필드 (이미 _fill_from_yfinance에서 채워졌을 수 있지만, 호출 순서에 따라 보완)
-                    for key in ['freeCashflow', 'totalRevenue', 'enterpriseToEbitda',
-                                'debtToEquity', 'beta', 'pegRatio', 'payoutRatio',
-                                'earningsGrowth', 'fiveYearAvgDividendYield', 'dividendRate']:
+                    for key in self.YF_FINANCIAL_KEYS[3:]:
                         if info.get(key) is None and yf_info.get(key) is not None:
                             info[key] = yf_info[key]
             except Exception:
                 pass
 
         # NAVER Finance 스크래핑 (yfinance도 실패 시 대안, 자동 비활성화 지원)
-        if (roe is None or opm is None or revenue_growth is None) and self._naver_enabled:
+        if roe is None or opm is None or revenue_growth is None:
             naver_data = self._fetch_naver_financials(code)
             if naver_data:
                 if roe is None and naver_data.get('roe') is not None:
@@ -711,21 +995,119 @@ class KRDataProvider:
                 info['returnOnEquity'] = roe_approx
                 roe = roe_approx
 
-        # 캐시 저장
+        # 캐시 저장 (소스 일시 차단 중이면 근사치 고정 방지 위해 생략 → 복구 후 재조회)
+        if self._source_blocked('dart', 'yfinance', 'naver'):
+            return
         self._dart_cache[code] = {
             'roe': roe,
             'opm': opm,
             'revenue_growth': revenue_growth,
         }
 
+    # ================================================================
+    # 재무지표 캐시 (공시 일정 기준 TTL)
+    # ================================================================
+    def _report_deadline(self, fiscal_year, reprt_code):
+        """보고서 제출 기한 (KST, 기한일 다음날 0시)"""
+        for month, day, code in self.DISCLOSURE_DEADLINES:
+            if code == reprt_code:
+                year = fiscal_year + 1 if reprt_code == '11011' else fiscal_year
+                return KST.localize(datetime(year, month, day)) + timedelta(days=1)
+        raise ValueError(f"unknown reprt_code: {reprt_code}")
+
+    def _disclosure_period(self, now):
+        """now 시점에 제출 기한이 지난 가장 최근 정기보고서 (fiscal_year, reprt_code)"""
+        latest = None
+        for year in (now.year - 1, now.year):
+            for month, day, reprt_code in self.DISCLOSURE_DEADLINES:
+                fiscal_year = year - 1 if reprt_code == '11011' else year
+                if self._report_deadline(fiscal_year, reprt_code) <= now:
+                    latest = (fiscal_year, reprt_code)
+        return latest
+
+    def _next_disclosure_deadline(self, now):
+        """now 이후 가장 가까운 정기보고서 제출 기한"""
+        candidates = [
+            self._report_deadline(year - 1 if reprt_code == '11011' else year, reprt_code)
+            for year in (now.year, now.year + 1)
+            for _, _, reprt_code in self.DISCLOSURE_DEADLINES
+        ]
+        return min(d for d in candidates if d > now)
+
+    def _store_fundamentals(self, code, fiscal_year, reprt_code, source, payload, now):
+        """재무지표 캐시 저장 (없음 → 다음 공시 기한까지, 최대 MISSING_REPORT_MAX_TTL)"""
+        if payload is None:
+            expires_at = min(self._next_disclosure_deadline(now),
+                             now + self.MISSING_REPORT_MAX_TTL)
+        else:
+            expires_at = self._next_disclosure_deadline(now)
+        self._fundamentals_store.put(code, fiscal_year, reprt_code, source, payload, now, expires_at)
+
+    def _get_dart_finstate(self, code, fiscal_year, reprt_code='11011'):
+        """DART 재무제표 (캐시 우선, 조회 실패 시 예외 재전파)
+
+        공시된 보고서는 사실상 불변 → FILED_REPORT_TTL 동안 재사용
+        미공시 보고서는 제출 기한 전이면 1일 후 재조회
+        """
+        now = datetime.now(KST)
+        hit, records = self._fundamentals_store.get(code, fiscal_year, reprt_code, 'dart', now)
+        if hit:
+            return pd.DataFrame(records or [])
+
+        fs = self._call_source('dart', self._dart.finstate, code, fiscal_year, reprt_code=reprt_code)
+        if fs is not None and not fs.empty:
+            self._fundamentals_store.put(code, fiscal_year, reprt_code, 'dart',
+                                         fs.to_dict('records'), now, now + self.FILED_REPORT_TTL)
+            return fs
+
+        if now < self._report_deadline(fiscal_year, reprt_code):
+            self._fundamentals_store.put(code, fiscal_year, reprt_code, 'dart',
+                                         None, now, now + self.MISSING_REPORT_TTL)
+        else:
+            self._store_fundamentals(code, fiscal_year, reprt_code, 'dart', None, now)
+        return pd.DataFrame()
+
+    def _get_yf_financials(self, code):
+        """yfinance 재무 보조 필드 (캐시 우선, 차단/조회 불가 시 None)"""
+        now = datetime.now(KST)
+        fiscal_year, reprt_code = self._disclosure_period(now)
+        hit, cached = self._fundamentals_store.get(code, fiscal_year, reprt_code, 'yfinance', now)
+        if hit:
+            return cached
+
+        yf_info = self._get_yf_info(code)
+        if yf_info is None:
+            if not self._source_blocked('yfinance'):
+                self._fundamentals_store.put(code, fiscal_year, reprt_code, 'yfinance',
+                                             None, now, now + self.MISSING_REPORT_TTL)
+            return None
+
+        financials = {key: yf_info.get(key) for key in self.YF_FINANCIAL_KEYS}
+        self._store_fundamentals(code, fiscal_year, reprt_code, 'yfinance', financials, now)
+        return financials
+
+    def clear_fundamentals_store(self, code=None):
+        """재무지표 캐시 초기화 (다음 조회 시 DART/NAVER/yfinance 재조회)"""
+        self._fundamentals_store.clear(code)
+
     def _fetch_naver_financials(self, code):
         """NAVER Finance에서 재무지표 스크래핑 (DART API 없을 때 대안)
 
-        연속 3회 실패 시 자동 비활성화 (GitHub Actions 등 해외 서버 대응)
+        연속 실패 시 서킷 브레이커로 일시 차단 (GitHub Actions 등 해외 서버 대응)
+        결과는 공시 주기 단위로 재무지표 캐시에 저장 (실패/차단은 저장 안 함)
 
         Returns:
             dict: {roe, opm, revenue_growth} or None
         """
+        now = datetime.now(KST)
+        fiscal_year, reprt_code = self._disclosure_period(now)
+        hit, cached = self._fundamentals_store.get(code, fiscal_year, reprt_code, 'naver', now)
+        if hit:
+            return cached
+
+        guard = self._guards['naver']
+        if not guard.acquire():
+            return None
         try:
             import requests
 
@@ -741,6 +1123,8 @@ class KRDataProvider:
 
             tables = pd.read_html(resp.text, encoding='euc-kr')
             if not tables:
+                guard.record_success()
+                self._store_fundamentals(code, fiscal_year, reprt_code, 'naver', None, now)
                 return None
 
             result = {}
@@ -780,15 +1164,13 @@ class KRDataProvider:
                                 result['revenue_growth'] = (revenues[-1] - revenues[-2]) / abs(revenues[-2])
                             break
 
-            if result:
-                self._naver_fail_count = 0  # 성공 시 카운터 리셋
-            return result if result else None
+            guard.record_success()
+            result = result if result else None
+            self._store_fundamentals(code, fiscal_year, reprt_code, 'naver', result, now)
+            return result
 
         except Exception:
-            self._naver_fail_count += 1
-            if self._naver_fail_count >= 3:
-                self._naver_enabled = False
-                print("   NAVER Finance 스크래핑 비활성화 (연속 실패, PBR/PER 추정 사용)", flush=True)
+            guard.record_failure()
             return None
 
     def _extract_naver_number(self, row):
@@ -845,12 +1227,16 @@ class KRDataProvider:
     # ================================================================
     # OHLCV 히스토리 (yfinance history 호환)
     # ================================================================
-    def get_history(self, code, period='1y'):
+    def get_history(self, code, period='1y', refresh=False):
         """OHLCV DataFrame (yfinance history 호환)
 
+        로컬 저장소를 먼저 읽고, 최근 영업일 기준으로 누락된 구간만 증분 조회
+        (같은 프로세스에서 이미 동기화한 종목은 메모리 결과 재사용)
+
         Args:
             code: 종목코드 (6자리)
             period: '1y', '2y', '6mo', '3mo'
+            refresh: True면 저장소 무시하고 전체 재동기화
 
         Returns:
             DataFrame with columns: Open, High, Low, Close, Volume
@@ -858,24 +1244,103 @@ class KRDataProvider:
         if not PYKRX_AVAILABLE:
             return pd.DataFrame()
 
-        end_date = datetime.now()
-        period_map = {
-            '3mo': 90,
-            '6mo': 180,
-            '1y': 365,
-            '2y': 730,
-            '3y': 1095,
-        }
-        days = period_map.get(period, 365)
-        start_date = end_date - timedelta(days=days)
-
+        days = self.PERIOD_DAYS.get(period, 365)
+        start_date = datetime.now() - timedelta(days=days)
         start_str = start_date.strftime('%Y%m%d')
-        end_str = end_date.strftime('%Y%m%d')
 
+        cached = None if refresh else self._history_cache.get(code)
+        if cached is not None and cached[0] <= start_str:
+            df = cached[1]
+        else:
+            df = self._sync_history(code, start_str, refresh=refresh)
+            if df is not None and not df.empty:
+                self._history_cache[code] = (start_str, df)
+        if df is None or df.empty:
+            return pd.DataFrame()
+        df = df[df.index >= pd.Timestamp(start_date.date())]
+        if self._intraday_snapshot is not None:
+            df = self._splice_intraday_bar(code, df)
+        return df
+
+    def _sync_history(self, code, start_str, refresh=False):
+        """저장소 ↔ KRX 동기화 후 전체 저장 히스토리 반환
+
+        - 저장분 없음 / 요청 구간이 저장 구간보다 과거 / 강제 재동기화 → 전체 조회
+        - 최근 영업일 일봉 확정 이후 동기화됨 → 네트워크 없이 저장분 반환
+        - 그 외 → 마지막 저장일부터 오늘까지 증분 조회 후 병합
+        """
+        if self._force_resync and code not in self._resynced_codes:
+            refresh = True
+
+        stored, meta = self._ohlcv_store.load(code)
+        end_str = datetime.now().strftime('%Y%m%d')
+        now_kst = datetime.now(KST)
+
+        if (refresh or stored is None
+                or meta.get('covered_from', '99999999') > start_str):
+            covered_from = start_str
+            if stored is not None and not refresh:
+                covered_from = min(start_str, meta.get('covered_from', start_str))
+            df = self._fetch_ohlcv(code, covered_from, end_str)
+            if df is None:
+                return stored if stored is not None else pd.DataFrame()
+            self._resynced_codes.add(code)
+            return self._ohlcv_store.save(code, df, covered_from, now_kst.isoformat())
+
+        if self._is_history_fresh(meta):
+            return stored
+
+        # 증분 조회: 마지막 저장일 직전 봉부터 (마지막 저장 봉은 장중 부분 봉일 수 있어 교체 대상)
+        last_date = meta.get('last_date', start_str)
+        reference = stored.index[-2] if len(stored) >= 2 else None
+        fetch_from = reference.strftime('%Y%m%d') if reference is not None else last_date
+        delta = self._fetch_ohlcv(code, fetch_from, end_str)
+        if delta is None:
+            return stored  # 조회 실패 → 기존 저장분 사용
+
+        # 수정주가 변경(분할/병합) 감지 → 확정된 직전 봉 종가가 다르면 전체 재동기화
+        # (저장 구간은 유지: 짧은 기간 요청이 다중 시간대용 장기 저장분을 줄이지 않도록)
+        if reference is not None and reference in delta.index:
+            old_close = float(stored.loc[reference, 'Close'])
+            new_close = float(delta.loc[reference, 'Close'])
+            if old_close > 0 and abs(new_close / old_close - 1) > self.ADJUSTMENT_TOLERANCE:
+                print(f"   ℹ️ {code} 수정주가 변경 감지 → 전체 재동기화", flush=True)
+                covered_from = min(start_str, meta.get('covered_from', start_str))
+                return self._sync_history(code, covered_from, refresh=True)
+
+        return self._ohlcv_store.append(
+            code, stored, delta, meta.get('covered_from', start_str), now_kst.isoformat())
+
+    def _is_history_fresh(self, meta):
+        """최근 영업일 일봉이 확정된 이후 동기화되었는지"""
+        synced_at = meta.get('synced_at')
+        if not synced_at:
+            return False
         try:
-            df = krx.get_market_ohlcv(start_str, end_str, code)
+            synced = datetime.fromisoformat(synced_at)
+            if synced.tzinfo is None:
+                synced = KST.localize(synced)
+        except ValueError:
+            return False
+
+        latest = self._find_latest_trading_date()
+        if self._intraday_snapshot is not None:
+            # 장중 모드: 당일 봉은 스냅샷으로 대체 → 전 거래일 확정 여부만 확인
+            latest = self.calendar.previous_session(latest)
+        final_at = KST.localize(
+            datetime.strptime(latest, '%Y%m%d').replace(hour=self.DAILY_BAR_FINAL_HOUR))
+        return synced >= final_at
+
+    def _fetch_ohlcv(self, code, start_str, end_str):
+        """KRX 개별 종목 OHLCV 조회 (영문 컬럼, 거래정지일 제거)
+
+        Returns:
+            DataFrame (빈 결과 포함) or None (조회 실패)
+        """
+        try:
+            df = self._call_source('krx', krx.get_market_ohlcv, start_str, end_str, code)
             if df is None or df.empty:
-                return pd.DataFrame()
+                return pd.DataFrame(columns=['Open', 'High', 'Low', 'Close', 'Volume'])
 
             # 한글 컬럼명 → 영문 변환
             df = df.rename(columns={
@@ -898,27 +1363,265 @@ class KRDataProvider:
 
         except Exception as e:
             print(f"⚠️ {code} 히스토리 로드 실패: {e}")
+            return None
+
+    def clear_history_store(self, code=None):
+        """로컬 OHLCV 저장소 초기화 (다음 조회 시 전체 재동기화)"""
+        self._ohlcv_store.clear(code)
+        if code:
+            self._history_cache.pop(code, None)
+        else:
+            self._history_cache.clear()
+
+    # ================================================================
+    # 장중 모드 (당일 전종목 스냅샷 → 잠정 봉)
+    # ================================================================
+    def enable_intraday(self):
+        """장중 모드: 당일 전종목 스냅샷 1회 조회 후 모든 히스토리에 잠정 봉으로 결합
+
+        종목별 히스토리는 전 거래일 확정 봉까지만 동기화 (종목별 증분 조회 생략),
+        현재가(get_info_batch)와 마지막 봉이 같은 스냅샷을 사용
+
+        Returns:
+            bool: 스냅샷 로드 성공 여부 (실패 시 일반 모드 유지)
+        """
+        today = self._find_latest_trading_date()
+        snap = self._get_daily_snapshot(today)
+        if snap is None or snap.empty:
+            print(f"⚠️ {today} 장중 스냅샷 없음 → 일반 모드로 실행")
+            return False
+        self._intraday_date = today
+        self._intraday_snapshot = snap
+        self._history_cache.clear()
+        print(f"⏱️ 장중 모드: {today} 전종목 스냅샷 {len(snap)}종목 (잠정 봉)")
+        return True
+
+    @property
+    def intraday(self):
+        return self._intraday_snapshot is not None
+
+    def _splice_intraday_bar(self, code, df):
+        """당일 봉을 스냅샷 잠정 봉으로 교체 (미거래/스냅샷 미포함 종목은 그대로)"""
+        snap = self._intraday_snapshot
+        if code not in snap.index:
+            return df
+        day = pd.Timestamp(self._intraday_date)
+        confirmed = df[df.index < day]
+        row = snap.loc[code]
+        if not row['Volume'] > 0:
+            return confirmed
+        bar = pd.DataFrame([row[['Open', 'High', 'Low', 'Close', 'Volume']].astype(float)],
+                           index=pd.DatetimeIndex([day], name=df.index.name))
+        return pd.concat([confirmed.astype(float), bar])
+
+    # ================================================================
+    # 전종목 일별 스냅샷 → 날짜×종목 패널
+    # ================================================================
+    SNAPSHOT_COLUMNS = {
+        '시가': 'Open', '고가': 'High', '저가': 'Low',
+        '종가': 'Close', '거래량': 'Volume', '등락률': 'Change',
+    }
+
+    # 원시 종가 변화율과 KRX 등락률 괴리가 이보다 크면 권리락/분할로 보고 수정
+    CORPORATE_ACTION_THRESHOLD = 0.02
+
+    def get_history_panel(self, codes, period='1y'):
+        """여러 종목 OHLCV 패널 (일자별 전종목 스냅샷 기반)
+
+        종목당 1회 조회 대신 영업일당 1회 전종목 조회 후 디스크 캐시,
+        growth/value 실행과 장중 cron 슬롯이 같은 스냅샷을 재사용
+
+        Returns:
+            DataFrame: index=날짜, columns=MultiIndex (필드, 종목코드)
+                       필드: Open, High, Low, Close, Volume (수정주가)
+                       거래정지일은 NaN
+        """
+        codes = list(dict.fromkeys(codes))
+        if not PYKRX_AVAILABLE or not codes:
+            return pd.DataFrame()
+
+        days = self.PERIOD_DAYS.get(period, 365)
+        end_date = datetime.now()
+        start_str = (end_date - timedelta(days=days)).strftime('%Y%m%d')
+        end_str = end_date.strftime('%Y%m%d')
+
+        frames = {}
+        for date_str in self._get_trading_dates(start_str, end_str):
+            snap = self._get_daily_snapshot(date_str)
+            if snap is None or snap.empty:
+                continue
+            frames[pd.Timestamp(date_str)] = snap.reindex(codes)
+
+        if not frames:
             return pd.DataFrame()
 
+        long_df = pd.concat(frames, names=['날짜', '티커'])
+        panel = long_df.unstack('티커')
+
+        # 거래정지일(거래량 0) → NaN (get_history의 0 거래량 제거와 동일)
+        halted = panel['Volume'].fillna(0) <= 0
+        for field in ['Open', 'High', 'Low', 'Close', 'Volume', 'Change']:
+            panel[field] = panel[field].mask(halted)
+
+        return self._adjust_panel_prices(panel)
+
+    @staticmethod
+    def slice_history_panel(panel, code):
+        """패널에서 단일 종목 OHLCV 추출 (get_history와 동일 형식)"""
+        cols = ['Open', 'High', 'Low', 'Close', 'Volume']
+        if panel is None or panel.empty or code not in panel.columns.get_level_values(1):
+            return pd.DataFrame(columns=cols)
+        df = panel.xs(code, axis=1, level=1)[cols].dropna(subset=['Close'])
+        df.columns.name = None
+        return df
+
+    def get_multi_horizon_history(self, code, period='3y'):
+        """1회 조회한 일봉 히스토리 → 일/주/월봉 {horizon: DataFrame}"""
+        daily = self.get_history(code, period=period)
+        horizons = {'daily': daily}
+        for horizon, rule in self.HORIZON_RULES.items():
+            horizons[horizon] = self.resample_ohlcv(daily, rule)
+        return horizons
+
+    @classmethod
+    def resample_ohlcv(cls, df, rule):
+        """일봉 → 주/월봉 리샘플링 (단일 종목 DataFrame / 패널 공통, 종목 축 일괄 연산)
+
+        기간 라벨(Period)로 groupby 후 필드별 집계, 인덱스는 기간 내 마지막 거래일
+        거래정지(NaN) 봉은 집계에서 제외 (first/last/max/min 모두 NaN 무시)
+
+        Args:
+            df: get_history 결과 또는 get_history_panel 결과 (MultiIndex 컬럼)
+            rule: pandas Period 빈도 ('W-FRI', 'M' 등)
+        """
+        if df is None or df.empty:
+            return df
+        labels = df.index.to_period(rule)
+        fields = [f for f in cls.RESAMPLE_AGG if f in df.columns.get_level_values(0)]
+        resampled = {}
+        for field in fields:
+            grouped = df[field].groupby(labels)
+            how = cls.RESAMPLE_AGG[field]
+            resampled[field] = grouped.sum(min_count=1) if how == 'sum' else getattr(grouped, how)()
+        out = pd.concat(resampled, axis=1)
+        last_dates = pd.Series(df.index, index=labels).groupby(level=0).max()
+        out.index = pd.DatetimeIndex(last_dates.loc[out.index].values, name=df.index.name)
+        return out
+
+    def _adjust_panel_prices(self, panel):
+        """스냅샷(원시가격)을 수정주가로 변환
+
+        KRX 등락률은 권리락/분할 기준가 대비로 산출되므로,
+        원시 종가 변화율과 차이가 큰 날을 기업행위로 보고 과거 가격에 누적 반영
+        """
+        close = panel['Close']
+        prev_close = close.ffill().shift(1)
+        expected = prev_close * (1 + panel['Change'] / 100)
+        step = close / expected
+        step = step.where((step - 1).abs() > self.CORPORATE_ACTION_THRESHOLD, 1.0).fillna(1.0)
+
+        # factor_t = Π_{k>t} step_k (최신일 = 1)
+        factor = step.iloc[::-1].cumprod().iloc[::-1].shift(-1).fillna(1.0)
+
+        adjusted = {}
+        for field in ['Open', 'High', 'Low', 'Close']:
+            adjusted[field] = panel[field] * factor
+        adjusted['Volume'] = panel['Volume']
+        return pd.concat(adjusted, axis=1)
+
+    def _get_trading_dates(self, start_str, end_str):
+        """기간 내 영업일 목록 (거래일 캘린더 기준)"""
+        self.calendar.refresh()
+        return self.calendar.sessions(start_str, end_str)
+
+    def _get_daily_snapshot(self, date_str):
+        """전종목 일별 OHLCV 스냅샷 (메모리 → 디스크 → KRX)
+
+        확정된 일자만 디스크에 저장 (장중 당일 스냅샷은 메모리만)
+        거래일인데 빈 스냅샷(KRX 미게시/차단)은 이번 실행 메모리에만 두고 다음 실행에서 재조회
+        """
+        if date_str in self._snapshot_cache:
+            return self._snapshot_cache[date_str]
+
+        snap = self._snapshot_store.read(date_str)
+        if snap is None:
+            try:
+                raw = self._call_source('krx_bulk', krx.get_market_ohlcv, date_str, market='ALL')
+            except Exception as e:
+                print(f"⚠️ {date_str} 전종목 스냅샷 로드 실패: {e}")
+                return None
+            if raw is None:
+                return None
+            snap = raw.rename(columns=self.SNAPSHOT_COLUMNS)
+            snap = snap[[c for c in self.SNAPSHOT_COLUMNS.values() if c in snap.columns]]
+            if 'Change' not in snap.columns:
+                snap['Change'] = np.nan
+            # 휴장일: 모든 가격 0 → 빈 스냅샷 (거래일 캘린더로 휴장 확인된 경우만 기록)
+            if not snap.empty and (snap[['Open', 'High', 'Low', 'Close']] == 0).all(axis=None):
+                snap = snap.iloc[0:0]
+            snap = snap.astype(float)
+
+            final_at = KST.localize(
+                datetime.strptime(date_str, '%Y%m%d').replace(hour=self.DAILY_BAR_FINAL_HOUR))
+            if datetime.now(KST) >= final_at:
+                if not snap.empty or not self.calendar.is_trading_day(date_str):
+                    self._snapshot_store.write(date_str, snap)
+                else:
+                    print(f"⚠️ {date_str} 거래일 스냅샷 비어 있음 → 다음 실행에서 재조회")
+
+        self._snapshot_cache[date_str] = snap
+        return snap
+
     # ================================================================
-    # 시장 지수 (KOSPI)
+    # 시장 지수 (KOSPI/KOSDAQ/업종)
     # ================================================================
-    def get_market_index(self, period='1y'):
-        """KOSPI 지수 OHLCV (시장 레짐 감지용)
+    def get_market_index(self, period='1y', index_code='1001'):
+        """KRX 지수 OHLCV (KOSPI=1001, KOSDAQ=2001, 업종 지수=KRX_SECTOR_INDICES)
+
+        메모리 → 디스크(확정된 최근 거래일까지 저장된 경우) → pykrx → yfinance(대표 지수만)
 
         Returns:
             DataFrame with columns: Open, High, Low, Close, Volume
         """
+        key = (index_code, period)
+        if key in self._index_cache:
+            return self._index_cache[key]
+
+        latest = self._find_latest_trading_date()
+        store_key = f"{index_code}_{period}"
+        stored = self._index_store.read(store_key)
+        if stored is not None and not stored.empty and \
+                stored.index[-1].strftime('%Y%m%d') == latest:
+            self._index_cache[key] = stored
+            return stored
+
+        df = self._fetch_market_index(period, index_code)
+        if df.empty and stored is not None and not stored.empty:
+            df = stored  # 조회 실패 시 이전 저장본 사용
+        elif not df.empty and df.index[-1].strftime('%Y%m%d') == latest:
+            final_at = KST.localize(
+                datetime.strptime(latest, '%Y%m%d').replace(hour=self.DAILY_BAR_FINAL_HOUR))
+            if datetime.now(KST) >= final_at:
+                self._index_store.write(store_key, df)
+        self._index_cache[key] = df
+        return df
+
+    def get_market_indices(self, index_codes, period='1y'):
+        """여러 지수 OHLCV 일괄 로드 {index_code: DataFrame} (실행당 지수별 1회 조회)"""
+        return {code: self.get_market_index(period, code) for code in dict.fromkeys(index_codes)}
+
+    def _fetch_market_index(self, period, index_code):
+        name = self.INDEX_NAMES.get(index_code) or self.KRX_SECTOR_INDICES.get(index_code, index_code)
+
         # 방법 1: pykrx (KRX API)
         if PYKRX_AVAILABLE:
             end_date = datetime.now()
-            period_map = {'6mo': 180, '1y': 365, '2y': 730}
-            days = period_map.get(period, 365)
+            days = self.PERIOD_DAYS.get(period, 365)
             start_date = end_date - timedelta(days=days)
             start_str = start_date.strftime('%Y%m%d')
             end_str = end_date.strftime('%Y%m%d')
             try:
-                df = krx.get_index_ohlcv(start_str, end_str, '1001')
+                df = self._call_source('krx_bulk', krx.get_index_ohlcv, start_str, end_str, index_code)
                 if df is not None and not df.empty:
                     df = df.rename(columns={
                         '시가': 'Open', '고가': 'High',
@@ -930,11 +1633,11 @@ class KRDataProvider:
             except Exception:
                 pass
 
-        # 방법 2: yfinance fallback (^KS11)
-        if YF_AVAILABLE:
+        # 방법 2: yfinance fallback (^KS11 / ^KQ11)
+        yf_ticker = self.INDEX_YF_TICKERS.get(index_code)
+        if YF_AVAILABLE and yf_ticker:
             try:
-                kospi = yf.Ticker('^KS11')
-                df = kospi.history(period=period)
+                df = yf.Ticker(yf_ticker).history(period=period)
                 if df is not None and not df.empty:
                     # yfinance 컬럼: Open, High, Low, Close, Volume, Dividends, Stock Splits
                     cols = ['Open', 'High', 'Low', 'Close', 'Volume']
@@ -945,11 +1648,24 @@ class KRDataProvider:
                         df.index = df.index.tz_localize(None)
                     return df
             except Exception as e:
-                print(f"⚠️ KOSPI 지수 yfinance 로드 실패: {e}")
+                print(f"⚠️ {name} 지수 yfinance 로드 실패: {e}")
 
-        print(f"⚠️ KOSPI 지수 로드 실패 (pykrx + yfinance 모두 실패)")
+        fallback = " + yfinance" if yf_ticker else ""
+        print(f"⚠️ {name} 지수 로드 실패 (pykrx{fallback} 모두 실패)")
         return pd.DataFrame()
 
+    def get_stock_category(self, code):
+        """종목 소속 시장('KOSPI'/'KOSDAQ')과 섹터명 (섹터 미확인 시 '')"""
+        date_str = self._find_latest_trading_date()
+        self._get_bulk_market_cap(date_str)
+        market = self._market_membership.get(date_str, {}).get(code, 'KOSPI')
+        return market, self._build_sector_map().get(code, '')
+
+    def get_benchmark_indices(self, code):
+        """종목 RS 벤치마크 (소속 시장 지수 코드, KRX 업종 지수 코드 또는 None)"""
+        market, sector = self.get_stock_category(code)
+        return self.MARKET_INDICES[market], self.SECTOR_INDEX_CODES.get(sector)
+
 
 # ================================================================
 # 테스트
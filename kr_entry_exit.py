@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+KR Entry/Exit - 스윙매매 진입/청산 가격 일괄 계산
+
+기존: 종목마다 Tier 분기 + 스윙 레벨 리스트 컴프리헨션 (_calculate_smart_entry_exit)
+변경: 전 종목 입력 배열 → Tier별 마스크 + NaN 패딩 레벨 행렬로 1회 계산
+      (매수가/목표가/손절가/전략명 배열, 종목별 계산과 동일한 결과)
+
+Tier 1: 역발상 매수 (contrarian_adj > 0)
+Tier 2: 조정 대기 (contrarian_adj < 0)
+Tier 3: 일반 종목 — 3A 추세추종 / 3B 풀백매수 / 3C 박스권하단 / 3D 반등대기
+"""
+
+import numpy as np
+
+# 진입/청산 계산 최소 일봉 수
+MIN_BARS = 20
+
+STRATEGY_CONTRARIAN = "🎯 역발상매수(기술적지지)"
+STRATEGY_WAIT_PULLBACK = "⚠️ 조정대기(진입조건가)"
+STRATEGY_TREND = "📈 추세추종(MA20↑)"
+STRATEGY_PULLBACK = "📊 풀백매수({})"
+STRATEGY_BOX = "📦 박스권하단({})"
+STRATEGY_REBOUND = "🔄 반등대기({})"
+STRATEGY_NO_DATA = "데이터 부족"
+
+
+# ================================================================
+# 레벨 행렬 (종목 × 레벨, NaN 패딩)
+# ================================================================
+def pad_levels(level_lists):
+    """종목별 레벨 목록 → (종목수, 최대 레벨수) 행렬 (빈칸 NaN)"""
+    width = max((len(levels) for levels in level_lists), default=0)
+    out = np.full((len(level_lists), max(width, 1)), np.nan)
+    for i, levels in enumerate(level_lists):
+        out[i, :len(levels)] = levels
+    return out
+
+
+def nearest_below(levels, price):
+    """행별 price 미만 레벨 중 최대값 (없으면 NaN)"""
+    with np.errstate(invalid='ignore'):
+        below = np.where(levels < price[:, None], levels, -np.inf)
+    best = below.max(axis=1)
+    return np.where(np.isfinite(best), best, np.nan)
+
+
+def nearest_above(levels, price):
+    """행별 price 초과 레벨 중 최소값 (없으면 NaN)"""
+    with np.errstate(invalid='ignore'):
+        above = np.where(levels > price[:, None], levels, np.inf)
+    best = above.min(axis=1)
+    return np.where(np.isfinite(best), best, np.nan)
+
+
+def _first_max(candidates, labels):
+    """후보 (값, 유효 마스크) 중 최대값과 라벨 (동률은 앞선 후보, 후보 없으면 NaN)"""
+    values = np.stack([np.where(valid, value, -np.inf) for value, valid in candidates], axis=1)
+    best = values.argmax(axis=1)
+    rows = np.arange(len(values))
+    chosen = values[rows, best]
+    found = np.isfinite(chosen)
+    return np.where(found, chosen, np.nan), np.asarray(labels, dtype=object)[best], found
+
+
+def _pick(conditions, choices, default):
+    """np.select (앞선 조건 우선)"""
+    return np.select(conditions, choices, default)
+
+
+def _max(a, b):
+    """Python max(a, b)와 동일 (b가 더 클 때만 b)"""
+    return np.where(b > a, b, a)
+
+
+# ================================================================
+# 손익비 검증 (R:R >= 2.0, 최대 손절 7%)
+# ================================================================
+def validate_risk_reward(buy, target, stop, atr, swing_highs):
+    stop = np.where(stop < buy * 0.93, buy * 0.93, stop)
+    risk = buy - stop
+    reward = target - buy
+    with np.errstate(divide='ignore', invalid='ignore'):
+        widen = (risk > 0) & (reward / risk < 2.0)
+    farther = nearest_above(swing_highs, target)
+    widened = _pick([~np.isnan(farther), atr > 0],
+                    [farther, buy + (3.0 * atr)], buy * 1.12)
+    return np.where(widen, widened, target), stop
+
+
+# ================================================================
+# 일괄 계산
+# ================================================================
+def entry_exit_batch(price, contrarian_adj, ma20, ma60, ma120, bb_upper, bb_lower, atr, rsi,
+                     swing_lows, swing_highs, bars=None):
+    """전 종목 진입/청산 가격 일괄 계산
+
+    Args:
+        price ~ rsi: (종목수,) 배열 (tech_breakdown 값, 결측은 0)
+        swing_lows / swing_highs: pad_levels 행렬 (일봉 스윙 저점/고점)
+        bars: 종목별 일봉 수 (MIN_BARS 미만 → 데이터 부족)
+
+    Returns:
+        (buy, target, stop, strategy): 가격 배열 (미산출 NaN), 전략명 object 배열
+    """
+    p, c = np.asarray(price, dtype=float), np.asarray(contrarian_adj, dtype=float)
+    ma20, ma60, ma120 = (np.asarray(x, dtype=float) for x in (ma20, ma60, ma120))
+    bb_upper, bb_lower = np.asarray(bb_upper, dtype=float), np.asarray(bb_lower, dtype=float)
+    atr, rsi = np.asarray(atr, dtype=float), np.asarray(rsi, dtype=float)
+    n = len(p)
+    has_atr = atr > 0
+
+    ns = nearest_below(swing_lows, p)
+    nr = nearest_above(swing_highs, p)
+    has_ns = ~np.isnan(ns) & (ns != 0)
+    has_nr = ~np.isnan(nr) & (nr != 0)
+
+    buy = np.full(n, np.nan)
+    target = np.full(n, np.nan)
+    stop = np.full(n, np.nan)
+    strategy = np.full(n, STRATEGY_NO_DATA, dtype=object)
+
+    def _assign(mask, b, t, s, label):
+        t, s = validate_risk_reward(b, t, s, atr, swing_highs)
+        buy[mask], target[mask], stop[mask] = b[mask], t[mask], s[mask]
+        strategy[mask] = label[mask] if isinstance(label, np.ndarray) else label
+
+    # ========== Tier 1: 역발상 매수 (과매도 우량주) ==========
+    b = np.where((bb_lower > 0) & (bb_lower >= p * 0.97), bb_lower, p)
+    t = _pick([has_nr & (nr > b * 1.03), (bb_upper > 0) & (bb_upper > b * 1.03)],
+              [nr, bb_upper], np.where(has_atr, b + (1.5 * atr), b * 1.08))
+    atr_stop = np.where(has_atr, b - (2.0 * atr), b * 0.95)
+    s = _max(atr_stop, np.where(has_ns, ns * 0.99, atr_stop))
+    s = np.where(s > b * 0.98, b * 0.98, s)
+    s = np.where(s >= b, b * 0.95, s)
+    _assign(c > 0, b, t, s, STRATEGY_CONTRARIAN)
+
+    # ========== Tier 2: 조정대기 (과열주) ==========
+    b, _, found = _first_max([(ma20, (ma20 > 0) & (ma20 < p)),
+                              (ns, has_ns & (ns < p)),
+                              (p - (2.0 * atr), has_atr)], ['', '', ''])
+    b = np.where(found, b, p * 0.95)
+    t = _pick([has_nr & (nr > b * 1.03), bb_upper > 0], [nr, bb_upper], b * 1.08)
+    atr_stop = np.where(has_atr, b - (2.0 * atr), b * 0.95)
+    s = _max(atr_stop, np.where(has_ns, ns * 0.99, atr_stop))
+    s = np.where(s >= b, b * 0.95, s)
+    _assign(c < 0, b, t, s, STRATEGY_WAIT_PULLBACK)
+
+    # ========== Tier 3: 세분화 전략 (일반종목) ==========
+    with np.errstate(divide='ignore', invalid='ignore'):
+        uptrend = (ma20 > 0) & (ma60 > 0) & (ma20 > ma60)
+        above_ma20 = (ma20 > 0) & (p > ma20)
+        sideways = (ma20 > 0) & (ma60 > 0) & (np.abs(ma20 - ma60) / ma60 < 0.02)
+        weak = ((ma60 > 0) & (p < ma60)) | (rsi < 40)
+    tier3 = c == 0
+    tier_3a = tier3 & uptrend & above_ma20 & (rsi >= 50)
+    tier_3b = tier3 & ~tier_3a & uptrend & ~above_ma20
+    tier_3c = tier3 & ~tier_3a & ~tier_3b & (sideways | (~uptrend & ~weak))
+    tier_3d = tier3 & ~tier_3a & ~tier_3b & ~tier_3c
+
+    # --- Tier 3A: 추세추종 ---
+    t = _pick([has_nr & (nr > p * 1.02), (bb_upper > 0) & (bb_upper > p * 1.02)],
+              [nr, bb_upper], np.where(has_atr, p + (2.0 * atr), p * 1.08))
+    atr_stop = np.where(has_atr, p - (2.0 * atr), p * 0.95)
+    s = _max(atr_stop, np.where(ma20 > 0, ma20 * 0.99, atr_stop))
+    s = np.where(s > p * 0.98, p * 0.98, s)
+    s = np.where(s >= p, p * 0.95, s)
+    _assign(tier_3a, p, t, s, STRATEGY_TREND)
+
+    def _support_stop(b, atr_mult, cap):
+        below = nearest_below(swing_lows, b)
+        struct_stop = np.where(np.isnan(below), b * 0.95, below * 0.99)
+        atr_stop = np.where(has_atr, b - (atr_mult * atr), b * 0.95)
+        s = _max(atr_stop, struct_stop)
+        s = np.where(s > b * cap, b * cap, s)
+        return np.where(s >= b, b * 0.95, s)
+
+    def _labels(template, suffix):
+        return np.array([template.format(x) for x in suffix], dtype=object)
+
+    # --- Tier 3B: 풀백매수 ---
+    b, suffix, found = _first_max([(ma20, (ma20 > 0) & (ma20 < p * 1.03)),
+                                   (bb_lower, (bb_lower > 0) & (bb_lower < p)),
+                                   (ns, has_ns & (ns < p))], ['MA20', 'BB하단', '스윙저점'])
+    b = np.where(found, b, np.where(ma20 > 0, ma20, p))
+    suffix = np.where(found, suffix, 'MA20')
+    t = _pick([has_nr & (nr > p), (bb_upper > 0) & (bb_upper > p)],
+              [nr, bb_upper], np.where(has_atr, b + (2.0 * atr), b * 1.08))
+    _assign(tier_3b, b, t, _support_stop(b, 2.0, 0.98), _labels(STRATEGY_PULLBACK, suffix))
+
+    # --- Tier 3C: 박스권하단 ---
+    b, suffix, found = _first_max([(bb_lower, (bb_lower > 0) & (bb_lower < p)),
+                                   (ns, has_ns & (ns < p)),
+                                   (ma60, (ma60 > 0) & (ma60 < p))], ['BB하단', '스윙저점', 'MA60'])
+    b = np.where(found, b, p * 0.97)
+    suffix = np.where(found, suffix, '지지선')
+    t = _pick([has_nr & (nr > p), (bb_upper > 0) & (bb_upper > p)],
+              [nr, bb_upper], np.where(has_atr, b + (1.5 * atr), b * 1.06))
+    _assign(tier_3c, b, t, _support_stop(b, 2.0, 0.98), _labels(STRATEGY_BOX, suffix))
+
+    # --- Tier 3D: 반등대기 ---
+    b, suffix, found = _first_max([(ns, has_ns & (ns < p)),
+                                   (ma120, (ma120 > 0) & (ma120 < p)),
+                                   (bb_lower, (bb_lower > 0) & (bb_lower < p))], ['스윙저점', 'MA120', 'BB하단'])
+    b = np.where(found, b, p * 0.95)
+    suffix = np.where(found, suffix, '지지확인')
+    t = _pick([(ma60 > 0) & (ma60 > p), has_nr & (nr > p)],
+              [ma60, nr], np.where(has_atr, b + (1.5 * atr), b * 1.06))
+    _assign(tier_3d, b, t, _support_stop(b, 1.5, 0.97), _labels(STRATEGY_REBOUND, suffix))
+
+    if bars is not None:
+        short = np.asarray(bars) < MIN_BARS
+        buy[short] = target[short] = stop[short] = np.nan
+        strategy[short] = STRATEGY_NO_DATA
+    return buy, target, stop, strategy
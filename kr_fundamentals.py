@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+KR Fundamentals - 펀더멘털 점수 일괄 계산 (테이블 기반 벡터 스코어러)
+
+기존: 종목마다 _get_sector_threshold 부분 문자열 매칭 + _calc_gradient_score 스칼라 분기
+변경: 유니버스 info 목록 → 지표별 배열, 섹터 임계값은 고유 섹터당 1회 해석 후 배열로 확장,
+      구간 점수는 np.select 로 전 종목 한 번에 계산 (종목별 계산과 동일한 점수/breakdown/코멘트)
+"""
+
+import numpy as np
+
+
+# ================================================================
+# 구간 점수 (벡터)
+# ================================================================
+def gradient_score(value, excellent, good, max_pts):
+    """선형 보간 점수 계산 (높을수록 좋은 지표)
+    - value > excellent*1.3: max_pts (만점)
+    - excellent ~ excellent*1.3: 80%~100% 보간
+    - good ~ excellent: 40%~80% 보간
+    - good*0.5 ~ good: 5%~40% 보간
+    - < good*0.5 또는 value <= 0 / 결측: 0점
+    """
+    value, excellent, good = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (value, excellent, good)))
+    fair = good * 0.5
+    top = excellent * 1.3
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        top_ratio = np.where(top > excellent, (value - excellent) / (top - excellent), 1)
+        excellent_ratio = np.where(excellent > good, (value - good) / (excellent - good), 1)
+        good_ratio = np.where(good > fair, (value - fair) / (good - fair), 1)
+        pts = np.select(
+            [value >= top, value >= excellent, value >= good, value >= fair],
+            [max_pts, max_pts * (0.8 + 0.2 * top_ratio), max_pts * (0.4 + 0.4 * excellent_ratio),
+             max_pts * (0.05 + 0.35 * good_ratio)], 0)
+        valid = (value > 0) & ~((excellent == 0) & (good == 0))
+    return np.where(valid, np.rint(pts), 0).astype(int)
+
+
+def inverse_gradient_score(value, good_upper, fair_upper, max_pts):
+    """역방향 선형 보간 (낮을수록 좋은 지표: PER, 부채비율)
+
+    구간별 점수:
+    - value <= good_upper * 0.6: max_pts (만점)
+    - good_upper*0.6 ~ good_upper: 80%~100%
+    - good_upper ~ fair_upper: 40%~80%
+    - fair_upper ~ fair_upper*1.5: 5%~40%
+    - > fair_upper*1.5 또는 value <= 0 / 결측: 0
+    """
+    value, good_upper, fair_upper = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (value, good_upper, fair_upper)))
+    excellent = good_upper * 0.6
+    poor = fair_upper * 1.5
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        good_ratio = np.where(good_upper > excellent, (good_upper - value) / (good_upper - excellent), 1)
+        fair_ratio = np.where(fair_upper > good_upper, (fair_upper - value) / (fair_upper - good_upper), 1)
+        poor_ratio = np.where(poor > fair_upper, (poor - value) / (poor - fair_upper), 1)
+        pts = np.select(
+            [value <= excellent, value <= good_upper, value <= fair_upper, value <= poor],
+            [max_pts, max_pts * (0.8 + 0.2 * good_ratio), max_pts * (0.4 + 0.4 * fair_ratio),
+             max_pts * (0.05 + 0.35 * poor_ratio)], 0)
+        valid = value > 0
+    return np.where(valid, np.rint(pts), 0).astype(int)
+
+
+# ================================================================
+# 섹터 임계값 (고유 섹터당 1회 해석)
+# ================================================================
+def match_threshold(sector, threshold_dict, default):
+    """섹터명으로 임계값 찾기 (부분 매칭)"""
+    if not sector:
+        return default
+    for key, val in threshold_dict.items():
+        if key in sector or sector in key:
+            return val
+    return default
+
+
+def resolve_by_sector(sectors, resolve):
+    """섹터별 값 → 종목 배열 (resolve 는 고유 섹터마다 1회 호출)"""
+    cache = {sector: resolve(sector) for sector in set(sectors)}
+    return [cache[sector] for sector in sectors]
+
+
+def sector_thresholds(sectors, threshold_dict, default):
+    """종목별 섹터 → (상위 기준 배열, 하위 기준 배열)"""
+    pairs = resolve_by_sector(sectors, lambda s: match_threshold(s, threshold_dict, default))
+    upper, lower = np.array(pairs, dtype=float).reshape(-1, 2).T
+    return upper, lower
+
+
+# ================================================================
+# info 열 / 점수표
+# ================================================================
+class InfoColumns:
+    """info 딕셔너리 목록 → 키별 (값 배열, 존재 마스크)
+
+    존재 = info 값이 None 아님 (NaN 도 존재), truthy = Python 진리값과 동일 (존재 and != 0)
+    """
+
+    def __init__(self, infos):
+        self.infos = infos
+        self._columns = {}
+
+    def __len__(self):
+        return len(self.infos)
+
+    def get(self, key, default=None):
+        if (key, default) not in self._columns:
+            raw = [info.get(key, default) for info in self.infos]
+            present = np.array([x is not None for x in raw], dtype=bool)
+            values = np.array([np.nan if x is None else x for x in raw], dtype=float)
+            self._columns[(key, default)] = (values, present)
+        return self._columns[(key, default)]
+
+    def values(self, key, default=None):
+        return self.get(key, default)[0]
+
+    def present(self, key, default=None):
+        return self.get(key, default)[1]
+
+    def truthy(self, key, default=None):
+        values, present = self.get(key, default)
+        return present & (values != 0)
+
+    def first_truthy(self, *keys):
+        """`a or b or c` 와 동일 → (값 배열, truthy 마스크)"""
+        values, present = self.get(keys[-1])
+        truthy = present & (values != 0)
+        for key in reversed(keys[:-1]):
+            take = self.truthy(key)
+            values = np.where(take, self.values(key), values)
+            truthy = take | truthy
+        return values, truthy
+
+    def strings(self, key):
+        return [info.get(key, '') or '' for info in self.infos]
+
+    def raw(self, key, i):
+        return self.infos[i].get(key)
+
+
+class ScoreSheet:
+    """종목별 점수/코멘트/breakdown 누적 (규칙 적용 순서 = 코멘트 순서)"""
+
+    def __init__(self, n, template):
+        self.score = np.zeros(n, dtype=int)
+        self.comments = [[] for _ in range(n)]
+        self.breakdowns = [dict(template) for _ in range(n)]
+
+    def add(self, points, mask=None):
+        points = np.broadcast_to(np.asarray(points, dtype=int), self.score.shape)
+        self.score += points if mask is None else np.where(mask, points, 0)
+
+    def set(self, key, mask, value):
+        """mask 종목 breakdown[key] = value(i) (value: 배열 또는 i → 값 함수)"""
+        for i in np.flatnonzero(mask):
+            self.breakdowns[i][key] = value(i) if callable(value) else _scalar(value[i])
+
+    def comment(self, mask, text):
+        """mask 종목에 코멘트 추가 (text: i → 문자열 함수 또는 고정 문자열)"""
+        for i in np.flatnonzero(mask):
+            self.comments[i].append(text(i) if callable(text) else text)
+
+    def rows(self):
+        return [(int(score), comments, breakdown)
+                for score, comments, breakdown in zip(self.score, self.comments, self.breakdowns)]
+
+
+def _scalar(x):
+    if isinstance(x, np.integer):
+        return int(x)
+    if isinstance(x, np.floating):
+        return float(x)
+    return x
@@ -0,0 +1,865 @@
+# -*- coding: utf-8 -*-
+"""
+KR Indicators - NumPy 기술적 지표 엔진
+
+기존: 종목마다 ta 지표 객체 ~8개 생성 (MACD, ADX, RSI, Stochastic, MFI,
+      Bollinger, ATR, OBV) → 전체 시계열 계산 후 마지막 값만 사용, ATR 중복 계산
+변경: 고가/저가/종가/거래량 배열에서 전 지표를 1회에 계산
+      (True Range, 롤링 윈도우, EMA 공유), ta 0.11 계산식과 동일한 결과
+
+배열 규약: 시간축 = axis 0, 1차원 (n,) 또는 2차원 (n, 종목수) 모두 지원
+재귀 지표(EMA/Wilder)는 행 단위 반복 — 1차원은 Python float, 2차원은 행 벡터 연산
+장중 반복 실행은 IndicatorState(종목별 누적 상태)로 새 봉만 반영
+Titan 점수와 ML 피처는 IndicatorCache(종목·히스토리 버전별 시계열)로 같은 계산을 공유
+(같은 SHARED_HISTORY_PERIOD 히스토리 → Titan은 마지막 값, ML은 전체 시계열 사용)
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from kr_store import JSONStore
+
+# 52주 고/저가 기준 거래일 수
+TRADING_DAYS_52W = 252
+
+# 지표 시계열 공유 기준 히스토리 기간 (ML 학습 데이터 = Titan ML 연동 모드 점수 지표)
+SHARED_HISTORY_PERIOD = '2y'
+
+
+# ================================================================
+# 기본 연산 (시간축 = axis 0)
+# ================================================================
+def _as_float(x):
+    return np.asarray(x, dtype=float)
+
+
+def _nan_like(x):
+    return np.full(x.shape, np.nan)
+
+
+def shift(x, periods=1):
+    """시간축 이동 (앞쪽 NaN 채움)"""
+    x = _as_float(x)
+    out = _nan_like(x)
+    if periods < len(x):
+        out[periods:] = x[:len(x) - periods]
+    return out
+
+
+def _rolling(x, window, reducer):
+    x = _as_float(x)
+    out = _nan_like(x)
+    if window <= len(x):
+        windows = sliding_window_view(x, window, axis=0)
+        out[window - 1:] = reducer(windows, axis=-1)
+    return out
+
+
+def rolling_mean(x, window):
+    """단순이동평균 (min_periods=window)"""
+    return _rolling(x, window, np.mean)
+
+
+def rolling_sum(x, window):
+    return _rolling(x, window, np.sum)
+
+
+def rolling_max(x, window):
+    return _rolling(x, window, np.max)
+
+
+def rolling_min(x, window):
+    return _rolling(x, window, np.min)
+
+
+def rolling_std(x, window):
+    """이동표준편차 (모표준편차, ddof=0)"""
+    return _rolling(x, window, np.std)
+
+
+def _rows(x):
+    """재귀 계산용 행 목록 (1차원: Python float, 2차원: 행 벡터)"""
+    return x.tolist() if x.ndim == 1 else list(x)
+
+
+def ema(x, span=None, alpha=None, min_periods=0):
+    """지수이동평균 (pandas ewm(adjust=False) 동일)
+
+    첫 유효값(2차원은 어느 열이든 유효한 첫 행)에서 시작, min_periods 이전 구간은 NaN
+    """
+    x = _as_float(x)
+    out = _nan_like(x)
+    if alpha is None:
+        alpha = 2.0 / (span + 1.0)
+    valid = ~np.isnan(x.reshape(len(x), -1)).all(axis=1)
+    if not valid.any():
+        return out
+    start = int(np.argmax(valid))
+
+    old_wt = 1.0 - alpha
+    denom = old_wt + alpha
+    rows = _rows(x[start:])
+    weighted = rows[0]
+    result = [weighted]
+    for cur in rows[1:]:
+        weighted = (old_wt * weighted + alpha * cur) / denom
+        result.append(weighted)
+    out[start:] = np.asarray(result)
+    out[:start + max(min_periods, 1) - 1] = np.nan
+    return out
+
+
+def true_range(high, low, close):
+    """True Range (첫 봉은 고가-저가)"""
+    high, low, close = _as_float(high), _as_float(low), _as_float(close)
+    prev_close = shift(close)
+    tr = np.fmax(np.fmax(high - low, np.abs(high - prev_close)), np.abs(low - prev_close))
+    return tr
+
+
+# ================================================================
+# 개별 지표 (ta 0.11 계산식)
+# ================================================================
+def macd(close, fast=12, slow=26, signal=9):
+    """(MACD, 시그널)"""
+    close = _as_float(close)
+    line = ema(close, span=fast, min_periods=fast) - ema(close, span=slow, min_periods=slow)
+    return line, ema(line, span=signal, min_periods=signal)
+
+
+def rsi(close, window=14):
+    """RSI (Wilder EMA, 하락폭 0이면 100)"""
+    close = _as_float(close)
+    diff = close - shift(close)
+    up = np.where(diff > 0, diff, 0.0)
+    down = -np.where(diff < 0, diff, 0.0)
+    ema_up = ema(up, alpha=1.0 / window, min_periods=window)
+    ema_down = ema(down, alpha=1.0 / window, min_periods=window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        value = 100 - (100 / (1 + ema_up / ema_down))
+    return np.where(ema_down == 0, 100.0, value)
+
+
+def stochastic(high, low, close, window=14, smooth_window=3):
+    """(%K, %D)"""
+    high, low, close = _as_float(high), _as_float(low), _as_float(close)
+    lowest = rolling_min(low, window)
+    highest = rolling_max(high, window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        k = 100 * (close - lowest) / (highest - lowest)
+    return k, rolling_mean(k, smooth_window)
+
+
+def mfi(high, low, close, volume, window=14):
+    """Money Flow Index"""
+    high, low, close, volume = _as_float(high), _as_float(low), _as_float(close), _as_float(volume)
+    typical = (high + low + close) / 3.0
+    prev = shift(typical)
+    up_down = np.where(typical > prev, 1, np.where(typical < prev, -1, 0))
+    flow = typical * volume * up_down
+    positive = rolling_sum(np.where(flow >= 0.0, flow, 0.0), window)
+    negative = np.abs(rolling_sum(np.where(flow < 0.0, flow, 0.0), window))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100 - (100 / (1 + positive / negative))
+
+
+def bollinger(close, window=20, window_dev=2):
+    """(상단, 하단, 중심선)"""
+    close = _as_float(close)
+    mid = rolling_mean(close, window)
+    std = rolling_std(close, window)
+    return mid + window_dev * std, mid - window_dev * std, mid
+
+
+def atr(high, low, close, window=14, tr=None):
+    """Average True Range (Wilder, window-1 이전 구간은 0)"""
+    if tr is None:
+        tr = true_range(high, low, close)
+    out = np.zeros(tr.shape)
+    if len(tr) < window:
+        return out
+    rows = _rows(tr)
+    value = np.mean(tr[:window], axis=0)
+    value = value.item() if np.ndim(value) == 0 else value
+    result = [value]
+    for cur in rows[window:]:
+        value = (value * (window - 1) + cur) / float(window)
+        result.append(value)
+    out[window - 1:] = np.asarray(result)
+    return out
+
+
+def _wilder_sum(values, window):
+    """ta ADX 누적합 (첫 값 = 유효값 window개 합, 마지막 원소는 0)"""
+    size = len(values) - (window - 1)
+    out = np.zeros((size,) + values.shape[1:])
+    out[0] = np.sum(values[1:window + 1], axis=0)
+    rows = _rows(values)
+    prev = out[0].item() if out.ndim == 1 else out[0]
+    result = []
+    for i in range(1, size - 1):
+        prev = prev - (prev / float(window)) + rows[window + i]
+        result.append(prev)
+    if result:
+        out[1:size - 1] = np.asarray(result)
+    return out
+
+
+def adx(high, low, close, window=14):
+    """Average Directional Index (ta ADXIndicator.adx 동일, window-1 이전 구간은 0)"""
+    return directional_movement(high, low, close, window)[0]
+
+
+def directional_movement(high, low, close, window=14):
+    """(ADX, +DI, -DI) — ta ADXIndicator adx/adx_pos/adx_neg 와 같은 정렬 (앞 구간 0)"""
+    high, low, close = _as_float(high), _as_float(low), _as_float(close)
+    out = np.zeros(close.shape)
+    out_pos = np.zeros(close.shape)
+    out_neg = np.zeros(close.shape)
+    if len(close) < 2 * window:
+        return out, out_pos, out_neg
+    prev_close = shift(close)
+    directional = np.maximum(high, prev_close) - np.minimum(low, prev_close)
+
+    diff_up = high - shift(high)
+    diff_down = shift(low) - low
+    with np.errstate(invalid='ignore'):
+        pos = np.abs(((diff_up > diff_down) & (diff_up > 0)) * diff_up)
+        neg = np.abs(((diff_down > diff_up) & (diff_down > 0)) * diff_down)
+
+    trs = _wilder_sum(directional, window)
+    dip = _wilder_sum(pos, window)
+    din = _wilder_sum(neg, window)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        di_pos = np.where(trs != 0, 100 * (dip / trs), 0.0)
+        di_neg = np.where(trs != 0, 100 * (din / trs), 0.0)
+        di_sum = di_pos + di_neg
+        dx = np.where(di_sum != 0, 100 * np.abs((di_pos - di_neg) / di_sum), 0.0)
+
+    size = len(trs)
+    series = np.zeros(trs.shape)
+    value = np.mean(dx[0:window], axis=0)
+    value = value.item() if np.ndim(value) == 0 else value
+    rows = _rows(dx)
+    result = [value]
+    for i in range(window + 1, size):
+        value = ((value * (window - 1)) + rows[i - 1]) / float(window)
+        result.append(value)
+    series[window:] = np.asarray(result)
+    out[window - 1:] = series
+    # ta adx_pos/adx_neg: i번째 누적값 → (i + window)행 (첫/마지막 누적값 제외)
+    out_pos[window + 1:] = di_pos[1:size - 1]
+    out_neg[window + 1:] = di_neg[1:size - 1]
+    return out, out_pos, out_neg
+
+
+def obv(close, volume):
+    """On-Balance Volume"""
+    close, volume = _as_float(close), _as_float(volume)
+    signed = np.where(close < shift(close), -volume, volume)
+    return np.cumsum(signed, axis=0)
+
+
+# ================================================================
+# 기술적 점수용 지표 일괄 계산
+# ================================================================
+def technical_indicators(high, low, close, volume, extended=False):
+    """_get_technical_score에 필요한 전 지표 시계열 (1회 계산)
+
+    extended: ML 피처용 지표 추가 (ma10/ma50, ema12/ema26, adx_pos/adx_neg, high_max20/low_min20)
+
+    Returns:
+        dict: {지표명: ndarray (입력과 같은 shape)}
+    """
+    high, low, close, volume = _as_float(high), _as_float(low), _as_float(close), _as_float(volume)
+    tr = true_range(high, low, close)
+
+    # MACD (12/26/9) — 구성 EMA는 ML 피처와 공유
+    ema_fast = ema(close, span=12, min_periods=12)
+    ema_slow = ema(close, span=26, min_periods=26)
+    macd_line = ema_fast - ema_slow
+    macd_signal = ema(macd_line, span=9, min_periods=9)
+    adx_values, di_pos, di_neg = directional_movement(high, low, close)
+    stoch_k, stoch_d = stochastic(high, low, close)
+    bb_upper, bb_lower, bb_mid = bollinger(close)
+    atr_values = atr(high, low, close, tr=tr)
+    obv_values = obv(close, volume)
+
+    tenkan = (rolling_max(high, 9) + rolling_min(low, 9)) / 2
+    kijun = (rolling_max(high, 26) + rolling_min(low, 26)) / 2
+    window_52w = min(TRADING_DAYS_52W, len(close))
+
+    indicators = {
+        'ma5': rolling_mean(close, 5),
+        'ma20': rolling_mean(close, 20),
+        'ma60': rolling_mean(close, 60),
+        'ma120': rolling_mean(close, 120),
+        'macd': macd_line,
+        'macd_signal': macd_signal,
+        'ichimoku_tenkan': tenkan,
+        'ichimoku_kijun': kijun,
+        'ichimoku_span_a': (tenkan + kijun) / 2,
+        'ichimoku_span_b': (rolling_max(high, 52) + rolling_min(low, 52)) / 2,
+        'adx': adx_values,
+        'rsi': rsi(close),
+        'stoch_k': stoch_k,
+        'stoch_d': stoch_d,
+        'mfi': mfi(high, low, close, volume),
+        'volume_ma20': rolling_mean(volume, 20),
+        'obv': obv_values,
+        'obv_ma20': rolling_mean(obv_values, 20),
+        'bb_upper': bb_upper,
+        'bb_lower': bb_lower,
+        'bb_mid': bb_mid,
+        'atr': atr_values,
+        'atr_ma14': rolling_mean(atr_values, 14),
+        'high_52w': rolling_max(close, window_52w),
+        'low_52w': rolling_min(close, window_52w),
+    }
+    if extended:
+        indicators.update({
+            'ma10': rolling_mean(close, 10),
+            'ma50': rolling_mean(close, 50),
+            'ema12': ema_fast,
+            'ema26': ema_slow,
+            'adx_pos': di_pos,
+            'adx_neg': di_neg,
+            'high_max20': rolling_max(high, 20),
+            'low_min20': rolling_min(low, 20),
+        })
+    return indicators
+
+
+# ================================================================
+# 스윙 포인트 (지지/저항 레벨)
+# ================================================================
+# 시간대별 (봉 묶음 크기, 조회 봉 수, 좌우 비교 봉 수)
+SWING_TIMEFRAMES = {
+    'daily': (1, 60, 5),
+    'weekly': (5, 52, 2),
+    'monthly': (21, 24, 2),
+}
+
+
+def swing_points(values, order=5, mode='low'):
+    """국소 극값 마스크 (좌우 order개 봉 이하/이상 — 중심 롤링 min/max와 같은 값)
+
+    양 끝 order개 봉과 NaN이 포함된 윈도우는 False
+    """
+    values = _as_float(values)
+    mask = np.zeros(values.shape, dtype=bool)
+    width = 2 * order + 1
+    if len(values) < width:
+        return mask
+    windows = sliding_window_view(values, width, axis=0)
+    extreme = windows.min(axis=-1) if mode == 'low' else windows.max(axis=-1)
+    mask[order:len(values) - order] = values[order:len(values) - order] == extreme
+    return mask
+
+
+def swing_levels(values, lookback=60, order=5, mode='low'):
+    """최근 lookback 봉의 스윙 저점(mode='low') / 고점(mode='high') 레벨 (오름차순, 중복 제거)"""
+    recent = _as_float(values)[-lookback:]
+    return sorted(set(recent[swing_points(recent, order, mode)].tolist()))
+
+
+def _resample_bars(high, low, size):
+    """최근 봉부터 size개씩 묶은 고가(max)/저가(min) (앞쪽 자투리 봉은 버림)"""
+    count = len(high) // size
+    if size == 1 or count == 0:
+        return high[len(high) - count * size:], low[len(low) - count * size:]
+    start = len(high) - count * size
+    return (high[start:].reshape(count, size).max(axis=1),
+            low[start:].reshape(count, size).min(axis=1))
+
+
+def support_resistance(high, low, timeframes=None):
+    """시간대별 스윙 저점(지지)/고점(저항) 레벨
+
+    Returns:
+        dict: {시간대: (지지 레벨 목록, 저항 레벨 목록)}
+    """
+    high, low = _as_float(high), _as_float(low)
+    levels = {}
+    for name, (size, lookback, order) in (timeframes or SWING_TIMEFRAMES).items():
+        bar_high, bar_low = _resample_bars(high, low, size)
+        levels[name] = (swing_levels(bar_low, lookback, order, 'low'),
+                        swing_levels(bar_high, lookback, order, 'high'))
+    return levels
+
+
+# ================================================================
+# 날짜×종목 패널 (2차원 일괄 계산)
+# ================================================================
+def _compact(mask, arrays, top):
+    """열마다 유효 행(mask=True)만 모아 위(top=True) 또는 아래로 정렬 (시간 순서 유지)"""
+    key = ~mask if top else mask
+    order = np.argsort(key, axis=0, kind='stable')
+    return [np.take_along_axis(np.where(mask, _as_float(a), np.nan), order, axis=0)
+            for a in arrays]
+
+
+def right_align(mask, *arrays):
+    """열마다 유효 행을 아래쪽으로 모음 (마지막 행 = 종목별 최근 봉)
+
+    거래정지일을 제거한 종목별 히스토리(get_history)와 같은 봉 순서를 만들기 위함
+
+    Returns:
+        (정렬된 배열 목록, 열별 유효 행 수)
+    """
+    return _compact(mask, arrays, top=False), mask.sum(axis=0)
+
+
+def panel_technical_indicators(high, low, close, volume):
+    """날짜×종목 패널에서 전 종목 지표를 2차원 연산으로 일괄 계산
+
+    종목별 유효 봉을 위쪽으로 모아(첫 봉 = 0행) 모든 종목의 재귀 지표 시작점을
+    맞춘 뒤 단일 블록으로 계산하고, 결과는 아래 정렬로 되돌림
+
+    Args:
+        high, low, close, volume: (n일, 종목수) 배열, 결측(거래정지/미상장)은 NaN
+
+    Returns:
+        (dict, counts): 지표명 → (n, 종목수) 배열 (종목별 유효 봉을 아래 정렬,
+                        마지막 행 = 각 종목 최근 봉), 열별 유효 봉 수
+        열 j의 [n - counts[j]:] 구간은 해당 종목 히스토리로 technical_indicators를
+        호출한 결과와 동일
+    """
+    high, low, close, volume = _as_float(high), _as_float(low), _as_float(close), _as_float(volume)
+    mask = ~(np.isnan(high) | np.isnan(low) | np.isnan(close) | np.isnan(volume))
+    counts = mask.sum(axis=0)
+    n = close.shape[0]
+    top = technical_indicators(*_compact(mask, (high, low, close, volume), top=True))
+
+    # 위 정렬 → 아래 정렬: 아래 정렬 r행 = 위 정렬 (r - (n - count))행
+    source = np.arange(n)[:, None] - (n - counts)[None, :]
+    valid = source >= 0
+    source = np.clip(source, 0, None)
+    result = {key: np.where(valid, np.take_along_axis(values, source, axis=0), np.nan)
+              for key, values in top.items()}
+
+    # 1차원 계산과 길이 의존 규칙 맞춤 (봉 수 부족 종목)
+    aligned_close = _compact(mask, (close,), top=False)[0]
+    short_atr = counts < 14
+    short_adx = counts < 2 * 14
+    for key, short in (('atr', short_atr), ('adx', short_adx)):
+        result[key][:, short] = np.where(valid[:, short], 0.0, np.nan)
+    short_52w = (counts < TRADING_DAYS_52W) & (counts > 0)
+    if short_52w.any():
+        for key, reducer in (('high_52w', np.nanmax), ('low_52w', np.nanmin)):
+            result[key][:, short_52w] = np.nan
+            result[key][-1, short_52w] = reducer(aligned_close[:, short_52w], axis=0)
+    return result, counts
+
+
+def panel_column(indicators, counts, j):
+    """패널 지표에서 j번째 종목의 1차원 지표 dict (유효 봉 구간만)"""
+    start = len(next(iter(indicators.values()))) - int(counts[j]) if indicators else 0
+    return {key: values[start:, j] for key, values in indicators.items()}
+
+
+# ================================================================
+# 증분(스트리밍) 지표 상태
+# ================================================================
+class IndicatorState:
+    """technical_indicators 마지막 값을 봉 단위로 갱신하는 종목별 상태
+
+    EMA/Wilder 누적값(MACD, RSI, ATR, ADX), OBV 누적합, 롤링 윈도우 버퍼를 보관 →
+    새 봉 추가(update) / 진행 중인 당일 봉 교체(replace_last)가 종목당 O(1)
+
+    재귀 지표는 시작 시점에 따라 초기값 영향이 남지만 (ewm 가중치 감쇠)
+    250봉 이후 상대오차 1e-8 미만, 롤링/누적 지표는 배치 계산과 동일
+    """
+
+    VERSION = 1
+    FAST, SLOW, SIGNAL = 12, 26, 9
+    WINDOW = 14               # RSI / Stochastic / MFI / ATR / ADX
+    # 버퍼 길이 = 최대 윈도우 + 1 (replace_last 시 마지막 봉 제거 후에도 윈도우 유지)
+    BUFFERS = {
+        'high': TRADING_DAYS_52W + 1, 'low': TRADING_DAYS_52W + 1,
+        'close': TRADING_DAYS_52W + 1, 'volume': 21,
+        'tr': WINDOW + 1, 'directional': WINDOW + 1, 'pos': WINDOW + 1, 'neg': WINDOW + 1,
+        'dx': WINDOW + 1, 'flow': WINDOW + 1, 'stoch_k': 4, 'obv': 21, 'atr': WINDOW + 1,
+    }
+
+    def __init__(self):
+        self.last_date = None
+        self._scalars = {
+            'n': 0, 'ema_fast': 0.0, 'ema_slow': 0.0, 'signal': 0.0,
+            'ema_up': 0.0, 'ema_down': 0.0, 'atr': 0.0, 'obv': 0.0,
+            'trs': 0.0, 'dip': 0.0, 'din': 0.0, 'adx': 0.0,
+        }
+        self._prev = None
+        self._prev_date = None
+        self._buffers = {key: [] for key in self.BUFFERS}
+
+    @classmethod
+    def from_history(cls, high, low, close, volume, dates=None):
+        """과거 봉 전체를 순서대로 반영한 상태 (최초 1회)"""
+        state = cls()
+        dates = [None] * len(close) if dates is None else list(dates)
+        for row in zip(_as_float(high).tolist(), _as_float(low).tolist(),
+                       _as_float(close).tolist(), _as_float(volume).tolist(), dates):
+            state.update(*row)
+        return state
+
+    @property
+    def n(self):
+        return self._scalars['n']
+
+    # ================================================================
+    # 갱신
+    # ================================================================
+    def _push(self, key, value):
+        buf = self._buffers[key]
+        buf.append(value)
+        if len(buf) > self.BUFFERS[key]:
+            del buf[0]
+
+    def _tail(self, key, window):
+        return np.asarray(self._buffers[key][-window:], dtype=float)
+
+    @staticmethod
+    def _ewm(old, cur, alpha):
+        old_wt = 1.0 - alpha
+        return (old_wt * old + alpha * cur) / (old_wt + alpha)
+
+    def update(self, high, low, close, volume, date=None):
+        """새 봉 1개 반영"""
+        self._prev = dict(self._scalars)
+        self._prev_date = self.last_date
+        s = self._scalars
+        i = s['n']
+        w = self.WINDOW
+        high, low, close, volume = float(high), float(low), float(close), float(volume)
+
+        prev_close = self._buffers['close'][-1] if i else np.nan
+        prev_high = self._buffers['high'][-1] if i else np.nan
+        prev_low = self._buffers['low'][-1] if i else np.nan
+        prev_typical = (prev_high + prev_low + prev_close) / 3.0
+
+        for key, value in (('high', high), ('low', low), ('close', close), ('volume', volume)):
+            self._push(key, value)
+
+        # MACD (종가 EMA 12/26 → MACD 라인 EMA 9, 라인은 26봉부터 유효)
+        if i == 0:
+            s['ema_fast'] = s['ema_slow'] = close
+        else:
+            s['ema_fast'] = self._ewm(s['ema_fast'], close, 2.0 / (self.FAST + 1.0))
+            s['ema_slow'] = self._ewm(s['ema_slow'], close, 2.0 / (self.SLOW + 1.0))
+        if i >= self.SLOW - 1:
+            line = s['ema_fast'] - s['ema_slow']
+            s['signal'] = line if i == self.SLOW - 1 else \
+                self._ewm(s['signal'], line, 2.0 / (self.SIGNAL + 1.0))
+
+        # RSI (Wilder EMA, 첫 봉 상승/하락폭 0)
+        diff = close - prev_close if i else 0.0
+        up = diff if diff > 0 else 0.0
+        down = -diff if diff < 0 else 0.0
+        if i == 0:
+            s['ema_up'], s['ema_down'] = up, down
+        else:
+            s['ema_up'] = self._ewm(s['ema_up'], up, 1.0 / w)
+            s['ema_down'] = self._ewm(s['ema_down'], down, 1.0 / w)
+
+        # ATR (첫 window개 TR 평균 → Wilder 평활, 이전 구간 0)
+        tr = high - low if i == 0 else \
+            max(high - low, abs(high - prev_close), abs(low - prev_close))
+        self._push('tr', tr)
+        if i == w - 1:
+            s['atr'] = float(np.mean(self._tail('tr', w)))
+        elif i >= w:
+            s['atr'] = (s['atr'] * (w - 1) + tr) / float(w)
+        self._push('atr', s['atr'] if i >= w - 1 else 0.0)
+
+        # ADX (ta 누적합: window 봉에서 1~window 합으로 시작, DX window개 평균 후 평활)
+        if i >= 1:
+            directional = max(high, prev_close) - min(low, prev_close)
+            diff_up = high - prev_high
+            diff_down = prev_low - low
+            pos = diff_up if (diff_up > diff_down and diff_up > 0) else 0.0
+            neg = diff_down if (diff_down > diff_up and diff_down > 0) else 0.0
+            for key, value in (('directional', directional), ('pos', pos), ('neg', neg)):
+                self._push(key, value)
+            if i == w:
+                s['trs'] = float(np.sum(self._tail('directional', w)))
+                s['dip'] = float(np.sum(self._tail('pos', w)))
+                s['din'] = float(np.sum(self._tail('neg', w)))
+            elif i > w:
+                s['trs'] = s['trs'] - (s['trs'] / float(w)) + directional
+                s['dip'] = s['dip'] - (s['dip'] / float(w)) + pos
+                s['din'] = s['din'] - (s['din'] / float(w)) + neg
+        if i >= w:
+            di_pos = 100 * (s['dip'] / s['trs']) if s['trs'] != 0 else 0.0
+            di_neg = 100 * (s['din'] / s['trs']) if s['trs'] != 0 else 0.0
+            di_sum = di_pos + di_neg
+            dx = 100 * abs((di_pos - di_neg) / di_sum) if di_sum != 0 else 0.0
+            self._push('dx', dx)
+            if i == 2 * w - 1:
+                s['adx'] = float(np.mean(self._tail('dx', w)))
+            elif i > 2 * w - 1:
+                s['adx'] = ((s['adx'] * (w - 1)) + dx) / float(w)
+
+        # MFI (대표가격 등락 방향 × 거래대금)
+        typical = (high + low + close) / 3.0
+        direction = 1 if typical > prev_typical else (-1 if typical < prev_typical else 0)
+        self._push('flow', typical * volume * direction)
+
+        # Stochastic %K
+        if i >= w - 1:
+            lowest = float(np.min(self._tail('low', w)))
+            highest = float(np.max(self._tail('high', w)))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                k = float(100 * np.float64(close - lowest) / np.float64(highest - lowest))
+        else:
+            k = np.nan
+        self._push('stoch_k', k)
+
+        # OBV
+        s['obv'] += -volume if close < prev_close else volume
+        self._push('obv', s['obv'])
+
+        s['n'] = i + 1
+        self.last_date = date
+
+    def replace_last(self, high, low, close, volume, date=None):
+        """마지막 봉 교체 (장중 진행 중인 당일 봉 갱신)"""
+        if self._prev is None:
+            raise ValueError("교체할 이전 상태 없음")
+        self._scalars = self._prev
+        self.last_date = self._prev_date
+        n = self._scalars['n']
+        for key, buf in self._buffers.items():
+            # 봉마다 1개씩 쌓이지 않는 버퍼 (ADX는 2봉째부터, DX는 window봉째부터)
+            if key in ('directional', 'pos', 'neg') and n < 1:
+                continue
+            if key == 'dx' and n < self.WINDOW:
+                continue
+            if buf:
+                buf.pop()
+        self.update(high, low, close, volume, date)
+
+    # ================================================================
+    # 조회
+    # ================================================================
+    def _mean(self, key, window):
+        return float(np.mean(self._tail(key, window))) if self.n >= window else np.nan
+
+    def _channel(self, window):
+        if self.n < window:
+            return np.nan
+        return (float(np.max(self._tail('high', window)))
+                + float(np.min(self._tail('low', window)))) / 2
+
+    def indicators(self, max_bars=None):
+        """technical_indicators와 같은 키의 마지막 값 dict (값은 길이 1 배열)
+
+        max_bars: 배치 계산 입력 길이 (52주 고/저가 윈도우 = min(252, max_bars))
+        """
+        s = self._scalars
+        n = self.n
+        w = self.WINDOW
+        nan = np.nan
+
+        macd_line = s['ema_fast'] - s['ema_slow'] if n >= self.SLOW else nan
+        signal = s['signal'] if n >= self.SLOW + self.SIGNAL - 1 else nan
+
+        if n >= w:
+            rsi_value = 100.0 if s['ema_down'] == 0 else \
+                100 - (100 / (1 + s['ema_up'] / s['ema_down']))
+            flows = self._tail('flow', w)
+            positive = np.sum(np.where(flows >= 0.0, flows, 0.0))
+            negative = np.abs(np.sum(np.where(flows < 0.0, flows, 0.0)))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                mfi_value = float(100 - (100 / (1 + positive / negative)))
+        else:
+            rsi_value = mfi_value = nan
+
+        stoch_d = float(np.mean(self._tail('stoch_k', 3))) if n >= 3 else nan
+
+        tenkan, kijun = self._channel(9), self._channel(26)
+        window_52w = min(TRADING_DAYS_52W, n if max_bars is None else min(n, max_bars))
+        closes_52w = self._tail('close', window_52w)
+
+        if n >= 20:
+            closes_20 = self._tail('close', 20)
+            bb_mid = float(np.mean(closes_20))
+            bb_std = float(np.std(closes_20))
+        else:
+            bb_mid = bb_std = nan
+
+        values = {
+            'ma5': self._mean('close', 5),
+            'ma20': self._mean('close', 20),
+            'ma60': self._mean('close', 60),
+            'ma120': self._mean('close', 120),
+            'macd': macd_line,
+            'macd_signal': signal,
+            'ichimoku_tenkan': tenkan,
+            'ichimoku_kijun': kijun,
+            'ichimoku_span_a': (tenkan + kijun) / 2,
+            'ichimoku_span_b': self._channel(52),
+            'adx': s['adx'] if n >= 2 * w else 0.0,
+            'rsi': rsi_value,
+            'stoch_k': self._buffers['stoch_k'][-1] if n else nan,
+            'stoch_d': stoch_d,
+            'mfi': mfi_value,
+            'volume_ma20': self._mean('volume', 20),
+            'obv': s['obv'],
+            'obv_ma20': self._mean('obv', 20),
+            'bb_upper': bb_mid + 2 * bb_std,
+            'bb_lower': bb_mid - 2 * bb_std,
+            'bb_mid': bb_mid,
+            'atr': self._buffers['atr'][-1] if n else nan,
+            'atr_ma14': self._mean('atr', w),
+            'high_52w': float(np.max(closes_52w)) if window_52w else nan,
+            'low_52w': float(np.min(closes_52w)) if window_52w else nan,
+        }
+        return {key: np.array([value], dtype=float) for key, value in values.items()}
+
+    # ================================================================
+    # 직렬화
+    # ================================================================
+    def to_dict(self):
+        return {
+            'version': self.VERSION,
+            'last_date': self.last_date,
+            'prev_date': self._prev_date,
+            'scalars': self._scalars,
+            'prev': self._prev,
+            'buffers': self._buffers,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """저장된 상태 복원 (버전/형식 불일치 시 None)"""
+        if not data or data.get('version') != cls.VERSION:
+            return None
+        state = cls()
+        try:
+            state.last_date = data['last_date']
+            state._prev_date = data.get('prev_date')
+            state._scalars = dict(data['scalars'])
+            state._prev = dict(data['prev']) if data.get('prev') else None
+            for key in cls.BUFFERS:
+                state._buffers[key] = [float(v) for v in data['buffers'][key]]
+        except (KeyError, TypeError, ValueError):
+            return None
+        return state
+
+
+class IndicatorStateCache:
+    """종목별 IndicatorState 디스크 캐시 (일봉 DataFrame과 동기화)
+
+    저장 위치: {KR_CACHE_DIR 또는 ./.kr_cache}/indicator_state/{code}.json
+    동기화: 저장된 마지막 봉이 최근 SYNC_BARS 안에 있고 직전 봉(일자/종가)이 일치하면
+            마지막 봉 교체 + 이후 봉 추가, 아니면 (최초/수정주가/장기 미실행) 전체 재구성
+    """
+
+    SYNC_BARS = 10
+
+    def __init__(self, root=None):
+        self._store = JSONStore(root, 'indicator_state')
+        self._states = {}
+
+    def _load(self, code):
+        state = self._states.get(code)
+        if state is None:
+            state = IndicatorState.from_dict(self._store.read(code))
+        return state
+
+    def _sync(self, state, high, low, close, volume, index):
+        if state is None or state.last_date is None:
+            return None
+        tail = list(index[-self.SYNC_BARS:].strftime('%Y%m%d'))
+        if state.last_date not in tail:
+            return None
+        pos = len(index) - len(tail) + tail.index(state.last_date)
+        if pos >= 1:
+            prev_date = index[pos - 1].strftime('%Y%m%d')
+            if state._prev_date != prev_date or state._buffers['close'][-2] != float(close[pos - 1]):
+                return None
+        state.replace_last(high[pos], low[pos], close[pos], volume[pos], tail[pos - len(index)])
+        for j in range(pos + 1, len(index)):
+            state.update(high[j], low[j], close[j], volume[j], tail[j - len(index)])
+        return state
+
+    def indicators(self, code, hist):
+        """hist 마지막 봉 기준 지표 (technical_indicators 키, 값은 길이 1 배열)"""
+        high, low = hist['High'].values, hist['Low'].values
+        close, volume = hist['Close'].values, hist['Volume'].values
+        state = self._sync(self._load(code), high, low, close, volume, hist.index)
+        if state is None:
+            state = IndicatorState.from_history(high, low, close, volume,
+                                                hist.index.strftime('%Y%m%d'))
+        self._states[code] = state
+        self._store.write(code, state.to_dict())
+        return state.indicators(max_bars=len(hist))
+
+
+# ================================================================
+# 지표 시계열 공유 캐시 (Titan 점수 / ML 피처)
+# ================================================================
+class IndicatorCache:
+    """종목·히스토리 버전별 technical_indicators(extended=True) 시계열 메모리 캐시
+
+    같은 프로세스에서 같은 히스토리를 다시 요청하면 (growth/value 중복 종목, 풀링 학습 후
+    예측, 주/월봉 추세 등) 재계산 없이 반환. 새 봉/장중 갱신/수정주가로 히스토리가 바뀌면
+    버전이 달라져 재계산. 전체 MAX_ENTRIES 개까지 보관 (오래 안 쓴 항목부터 제거)
+    """
+
+    MAX_ENTRIES = 256
+
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries or self.MAX_ENTRIES
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def history_version(hist):
+        """히스토리 버전 (봉 수, 첫/마지막 일자, 마지막 봉, 종가/거래량 합계)"""
+        if hist.empty:
+            return (0,)
+        last = hist.iloc[-1]
+        return (len(hist), hist.index[0], hist.index[-1],
+                float(last['High']), float(last['Low']), float(last['Close']), float(last['Volume']),
+                float(hist['Close'].sum()), float(hist['Volume'].sum()))
+
+    def series(self, key, hist):
+        """key(종목코드 등) 히스토리의 지표 시계열 dict (반환 배열은 공유 — 수정 금지)"""
+        entry_key = (key, self.history_version(hist))
+        with self._lock:
+            indicators = self._entries.get(entry_key)
+            if indicators is not None:
+                self._entries.move_to_end(entry_key)
+                self.hits += 1
+                return indicators
+            self.misses += 1
+
+        indicators = technical_indicators(hist['High'].values, hist['Low'].values,
+                                          hist['Close'].values, hist['Volume'].values, extended=True)
+        for values in indicators.values():
+            values.flags.writeable = False
+        with self._lock:
+            self._entries[entry_key] = indicators
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return indicators
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_shared_cache = IndicatorCache()
+
+
+def shared_indicator_cache():
+    """프로세스 공용 IndicatorCache (TitanKRAnalyzer 와 ml_predictor 가 같은 인스턴스 사용)"""
+    return _shared_cache
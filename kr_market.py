@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+KR Market - 실행 단위 공유 시장 컨텍스트
+
+기존: 종목마다 KOSPI 3개월 수익률 재계산, 시장 레짐 감지/RS용 KOSPI 지수를 각각 조회
+변경: 실행당 1회 지수 조회 → 기간별 수익률, 레짐(이평/추세/ADX), 섹터 ETF 모멘텀을
+      MarketContext 1개로 계산해 전 종목 점수 계산에 공유, 결과와 함께 JSON 저장
+      RS 벤치마크(KOSDAQ, KRX 업종 지수)도 같은 시점에 일괄 로드 → 종목별 추가 조회 없음
+"""
+
+import json
+
+from kr_indicators import adx
+
+
+class MarketContext:
+    """지수 히스토리 기반 시장 컨텍스트 (실행당 1회 생성)"""
+
+    # 기간별 수익률 (거래일 수, 히스토리가 짧으면 첫 봉 기준)
+    HORIZONS = {'1w': 5, '1m': 21, '3m': 63, '6m': 126, '1y': 252}
+    MIN_REGIME_BARS = 120
+    MIN_BENCHMARK_BARS = 60    # RS 계산 최소 지수 봉 수
+
+    def __init__(self, index_hist, sector_rotation=None, index_name='KOSPI', index_code='1001',
+                 benchmarks=None):
+        self.index_name = index_name
+        self.index_code = index_code
+        self.index_hist = index_hist
+        self.sector_rotation = sector_rotation or {}
+        self.close = self._closes(index_hist)
+        self.bars = 0 if self.close is None else len(self.close)
+        self.returns = {name: self.period_return(days) for name, days in self.HORIZONS.items()}
+
+        # 벤치마크 지수별 기간 수익률 {index_code: {horizon: return}}
+        self.benchmark_returns = {index_code: self.returns} if self.bars >= self.MIN_BENCHMARK_BARS else {}
+        for code, hist in (benchmarks or {}).items():
+            close = self._closes(hist)
+            if code != index_code and close is not None and len(close) >= self.MIN_BENCHMARK_BARS:
+                self.benchmark_returns[code] = {
+                    name: self._period_return(close, days) for name, days in self.HORIZONS.items()}
+        self.adx = None
+        self.regime, self.regime_details, self.regime_description = self._detect_regime()
+
+    @staticmethod
+    def _closes(hist):
+        return hist['Close'].values if hist is not None and not hist.empty else None
+
+    @staticmethod
+    def _period_return(close, days):
+        base = close[-days] if len(close) >= days else close[0]
+        return float(close[-1] / base - 1)
+
+    @property
+    def available(self):
+        return self.bars > 0
+
+    def period_return(self, days):
+        """최근 days 거래일 수익률 (히스토리 부족 시 첫 봉 대비, 데이터 없으면 None)"""
+        if not self.available:
+            return None
+        return self._period_return(self.close, days)
+
+    def benchmark_return(self, index_code=None, horizon='3m'):
+        """벤치마크 지수 기간 수익률 (index_code 없으면 기준 지수, 미로드/봉 부족 시 None)"""
+        return self.benchmark_returns.get(index_code or self.index_code, {}).get(horizon)
+
+    # ================================================================
+    # 시장 레짐 (이평 배열 + 3/6개월 추세 + ADX)
+    # ================================================================
+    def _detect_regime(self):
+        try:
+            if self.bars < self.MIN_REGIME_BARS:
+                return 'neutral', {}, "데이터 부족"
+
+            hist = self.index_hist
+            close = self.close
+            current_price = float(close[-1])
+            ma60 = float(close[-60:].mean())
+            ma120 = float(close[-120:].mean())
+            trend_3m = self.returns['3m']
+            trend_6m = self.returns['6m']
+            self.adx = adx_value = float(adx(hist['High'].values, hist['Low'].values, close)[-1])
+
+            bull_signals = 0
+            bear_signals = 0
+
+            if current_price > ma120:
+                bull_signals += 1
+            else:
+                bear_signals += 1
+            if ma60 > ma120:
+                bull_signals += 1
+            else:
+                bear_signals += 1
+            if trend_3m > 0.05:
+                bull_signals += 1
+            elif trend_3m < -0.05:
+                bear_signals += 1
+            if trend_6m > 0.10:
+                bull_signals += 1
+            elif trend_6m < -0.10:
+                bear_signals += 1
+
+            if adx_value < 20:
+                regime, regime_kr, regime_emoji = 'sideways', '횡보장', '↔️'
+            elif bull_signals >= 3:
+                regime, regime_kr, regime_emoji = 'bull', '상승장', '📈'
+            elif bear_signals >= 3:
+                regime, regime_kr, regime_emoji = 'bear', '하락장', '📉'
+            else:
+                regime, regime_kr, regime_emoji = 'neutral', '중립', '➡️'
+
+            details = {
+                'current': current_price,
+                'ma60': ma60,
+                'ma120': ma120,
+                'trend_3m': trend_3m * 100,
+                'trend_6m': trend_6m * 100,
+                'adx': adx_value,
+                'bull_signals': bull_signals,
+                'bear_signals': bear_signals
+            }
+
+            description = (f"{regime_emoji} {regime_kr} ({self.index_name}: {current_price:,.0f}, "
+                           f"3개월: {trend_3m*100:+.1f}%, ADX: {adx_value:.0f})")
+            return regime, details, description
+
+        except Exception as e:
+            print(f"Market regime detection error: {e}")
+            return 'neutral', {}, "감지 실패"
+
+    # ================================================================
+    # 직렬화
+    # ================================================================
+    def to_dict(self):
+        as_of = self.index_hist.index[-1].strftime('%Y-%m-%d') if self.available else None
+        return {
+            'index': self.index_name,
+            'as_of': as_of,
+            'close': float(self.close[-1]) if self.available else None,
+            'returns': {name: (round(value * 100, 2) if value is not None else None)
+                        for name, value in self.returns.items()},
+            'adx': self.adx,
+            'regime': self.regime,
+            'regime_description': self.regime_description,
+            'regime_details': self.regime_details,
+            'sector_rotation': self.sector_rotation,
+            'benchmark_returns': {
+                code: {name: round(value * 100, 2) for name, value in returns.items()}
+                for code, returns in self.benchmark_returns.items()},
+        }
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False, default=float)
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+KR Rate Limit - 데이터 소스별 호출 제어
+
+토큰 버킷(초당 호출 수 제한) + 서킷 브레이커(연속 실패 시 일시 차단,
+쿨다운 후 half-open 재시도)로 KRX / yfinance / DART / NAVER 호출 보호
+
+기존: 고정 sleep(0.3) + 실패 카운터로 프로세스 종료까지 영구 비활성화
+변경: 쿨다운 후 단일 probe 호출로 자동 복구, 소스별 메트릭 수집
+"""
+
+import time
+import threading
+
+
+class SourceUnavailable(Exception):
+    """서킷 브레이커가 열려 있어 호출이 거부됨"""
+
+
+class TokenBucket:
+    """스레드 안전 토큰 버킷 (부족분은 대기 시간으로 예약)"""
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = float(max(burst, 1))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """토큰 1개 소비, 필요 시 대기
+
+        Returns:
+            float: 대기한 시간 (초)
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class CircuitBreaker:
+    """연속 실패 기반 서킷 브레이커 (closed → open → half_open → closed)"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, cooldown=60.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_count = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """호출 허용 여부 (open 상태에서 쿨다운 경과 시 probe 1건만 허용)"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at >= self.cooldown:
+                    self.state = self.HALF_OPEN
+                    self._probe_in_flight = True
+                    return True
+                return False
+            # half_open: probe 결과 대기 중에는 추가 호출 거부
+            if not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        """성공 기록
+
+        Returns:
+            bool: half_open → closed 복구 여부
+        """
+        with self._lock:
+            recovered = self.state != self.CLOSED
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+            return recovered
+
+    def record_failure(self):
+        """실패 기록
+
+        Returns:
+            bool: 이번 실패로 open 전환 여부
+        """
+        with self._lock:
+            self.consecutive_failures += 1
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or (
+                    self.state == self.CLOSED
+                    and self.consecutive_failures >= self.failure_threshold):
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                self.opened_count += 1
+                return True
+            return False
+
+
+class SourceGuard:
+    """데이터 소스 1개의 호출 제어 (토큰 버킷 + 서킷 브레이커 + 메트릭)"""
+
+    def __init__(self, name, rate, burst=1, failure_threshold=5, cooldown=60.0):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(failure_threshold, cooldown)
+        self._lock = threading.Lock()
+        self._metrics = {
+            'calls': 0,
+            'successes': 0,
+            'failures': 0,
+            'rejected': 0,
+            'wait_seconds': 0.0,
+        }
+
+    def _count(self, key, value=1):
+        with self._lock:
+            self._metrics[key] += value
+
+    def acquire(self):
+        """호출 슬롯 획득 (서킷 open 시 False, 아니면 토큰 대기 후 True)"""
+        if not self.breaker.allow():
+            self._count('rejected')
+            return False
+        waited = self.bucket.acquire()
+        self._count('calls')
+        if waited:
+            self._count('wait_seconds', waited)
+        return True
+
+    def record_success(self):
+        self._count('successes')
+        if self.breaker.record_success():
+            print(f"   ✅ {self.name} 복구 (half-open 재시도 성공)", flush=True)
+
+    def record_failure(self):
+        self._count('failures')
+        if self.breaker.record_failure():
+            print(f"   ⏸️ {self.name} 일시 차단 (연속 {self.breaker.consecutive_failures}회 실패, "
+                  f"{self.breaker.cooldown:.0f}초 후 재시도)", flush=True)
+
+    def call(self, fn, *args, **kwargs):
+        """fn 호출 (예외 = 실패 기록 후 재전파, 차단 시 SourceUnavailable)"""
+        if not self.acquire():
+            raise SourceUnavailable(self.name)
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+    def metrics(self):
+        with self._lock:
+            snapshot = dict(self._metrics)
+        snapshot['wait_seconds'] = round(snapshot['wait_seconds'], 2)
+        snapshot['state'] = self.breaker.state
+        snapshot['opened'] = self.breaker.opened_count
+        return snapshot
@@ -0,0 +1,358 @@
+# -*- coding: utf-8 -*-
+"""
+KR Store - 로컬 디스크 캐시 레이어
+
+cron 실행(평일 8회)마다 1년치 일봉을 재다운로드하지 않도록
+종목별 OHLCV를 디스크에 보관하고 누락된 최근 구간만 증분 추가
+
+저장 형식: Parquet (pyarrow 미설치 시 pickle fallback), 재무지표는 SQLite,
+          ML 모델은 버전 디렉토리 (ModelRegistry)
+저장 위치: 환경변수 KR_CACHE_DIR 또는 ./.kr_cache
+"""
+
+import os
+import json
+import shutil
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime, timedelta
+import pandas as pd
+
+# pyarrow (Parquet 컬럼 저장)
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+
+DEFAULT_CACHE_DIR = os.environ.get('KR_CACHE_DIR') or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '.kr_cache')
+
+
+def _atomic_write(path, write_fn):
+    """임시 파일에 쓴 뒤 교체 (동시 실행/중단 시 파일 손상 방지)"""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        write_fn(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+
+class FrameStore:
+    """키 → DataFrame 디스크 저장소 (네임스페이스별 디렉토리)"""
+
+    def __init__(self, root=None, namespace='default'):
+        self.dir = os.path.join(root or DEFAULT_CACHE_DIR, namespace)
+        os.makedirs(self.dir, exist_ok=True)
+        self._ext = '.parquet' if PARQUET_AVAILABLE else '.pkl'
+
+    def _path(self, key):
+        return os.path.join(self.dir, f"{key}{self._ext}")
+
+    def exists(self, key):
+        return os.path.exists(self._path(key))
+
+    def read(self, key):
+        """저장된 DataFrame (없거나 손상 시 None)"""
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            if PARQUET_AVAILABLE:
+                return pd.read_parquet(path)
+            return pd.read_pickle(path)
+        except Exception:
+            return None
+
+    def write(self, key, df):
+        if PARQUET_AVAILABLE:
+            _atomic_write(self._path(key), lambda p: df.to_parquet(p))
+        else:
+            _atomic_write(self._path(key), lambda p: df.to_pickle(p))
+
+    def delete(self, key):
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def keys(self):
+        return sorted(
+            name[:-len(self._ext)] for name in os.listdir(self.dir)
+            if name.endswith(self._ext)
+        )
+
+
+class JSONStore:
+    """키 → dict 디스크 저장소 (네임스페이스별 디렉토리, JSON 파일)"""
+
+    def __init__(self, root=None, namespace='default'):
+        self.dir = os.path.join(root or DEFAULT_CACHE_DIR, namespace)
+        os.makedirs(self.dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.dir, f"{key}.json")
+
+    def read(self, key):
+        """저장된 dict (없거나 손상 시 None)"""
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def write(self, key, payload):
+        data = json.dumps(payload, ensure_ascii=False)
+
+        def _write(path):
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(data)
+
+        _atomic_write(self._path(key), _write)
+
+    def delete(self, key):
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+class OHLCVStore:
+    """종목별 일봉 OHLCV 저장소
+
+    메타데이터 (_meta.json):
+        {code: {'covered_from': 'YYYYMMDD',   # 요청 기준 수집 시작일
+                'last_date': 'YYYYMMDD',      # 저장된 마지막 봉 날짜
+                'synced_at': ISO datetime}}   # 마지막 동기화 시각 (KST)
+    """
+
+    def __init__(self, root=None):
+        self._frames = FrameStore(root, 'ohlcv')
+        self._meta_path = os.path.join(self._frames.dir, '_meta.json')
+        self._lock = threading.Lock()
+        self._meta = self._load_meta()
+
+    def _load_meta(self):
+        try:
+            with open(self._meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_meta(self):
+        payload = json.dumps(self._meta, ensure_ascii=False, indent=1, sort_keys=True)
+
+        def _write(path):
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(payload)
+
+        _atomic_write(self._meta_path, _write)
+
+    def load(self, code):
+        """(DataFrame or None, meta dict)"""
+        with self._lock:
+            meta = dict(self._meta.get(code, {}))
+        if not meta:
+            return None, {}
+        df = self._frames.read(code)
+        if df is None:
+            return None, {}
+        return df, meta
+
+    def save(self, code, df, covered_from, synced_at):
+        """전체 히스토리 저장 (인덱스 정렬 + 중복 제거 후)"""
+        df = df[~df.index.duplicated(keep='last')].sort_index()
+        self._frames.write(code, df)
+        last_date = df.index[-1].strftime('%Y%m%d') if len(df) else covered_from
+        with self._lock:
+            self._meta[code] = {
+                'covered_from': covered_from,
+                'last_date': last_date,
+                'synced_at': synced_at,
+            }
+            self._save_meta()
+        return df
+
+    def append(self, code, stored, delta, covered_from, synced_at):
+        """증분 구간 병합 (겹치는 날짜는 새 데이터로 교체)"""
+        if delta is None or delta.empty:
+            merged = stored
+        else:
+            merged = pd.concat([stored[~stored.index.isin(delta.index)], delta])
+        return self.save(code, merged, covered_from, synced_at)
+
+    def clear(self, code=None):
+        """저장소 초기화 (code=None이면 전체)"""
+        with self._lock:
+            codes = [code] if code else list(self._meta.keys())
+            for c in codes:
+                self._frames.delete(c)
+                self._meta.pop(c, None)
+            self._save_meta()
+
+
+class FundamentalsStore:
+    """재무지표 캐시 (SQLite, 프로세스/cron 슬롯 간 공유)
+
+    키: (code, fiscal_year, reprt_code, source)
+    값: JSON payload (None = 조회했으나 보고서/데이터 없음)
+    만료: expires_at (공시 일정 기준, 호출 측에서 결정)
+    """
+
+    def __init__(self, root=None):
+        base = root or DEFAULT_CACHE_DIR
+        os.makedirs(base, exist_ok=True)
+        self.path = os.path.join(base, 'fundamentals.sqlite3')
+        with closing(self._connect()) as conn, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS fundamentals (
+                    code TEXT NOT NULL,
+                    fiscal_year INTEGER NOT NULL,
+                    reprt_code TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    payload TEXT,
+                    fetched_at TEXT NOT NULL,
+                    expires_at TEXT NOT NULL,
+                    PRIMARY KEY (code, fiscal_year, reprt_code, source)
+                )
+            """)
+
+    def _connect(self):
+        # 호출마다 연결 (스레드 간 connection 공유 금지), WAL로 동시 읽기 허용
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+
+    def get(self, code, fiscal_year, reprt_code, source, now):
+        """(hit, payload) — 만료/미존재 시 (False, None)"""
+        try:
+            with closing(self._connect()) as conn:
+                row = conn.execute(
+                    "SELECT payload, expires_at FROM fundamentals "
+                    "WHERE code=? AND fiscal_year=? AND reprt_code=? AND source=?",
+                    (code, int(fiscal_year), reprt_code, source)).fetchone()
+        except sqlite3.Error:
+            return False, None
+        if row is None or row[1] <= now.isoformat():
+            return False, None
+        return True, (json.loads(row[0]) if row[0] is not None else None)
+
+    def put(self, code, fiscal_year, reprt_code, source, payload, now, expires_at):
+        data = json.dumps(payload, ensure_ascii=False, default=str) if payload is not None else None
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO fundamentals VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (code, int(fiscal_year), reprt_code, source, data,
+                     now.isoformat(), expires_at.isoformat()))
+        except sqlite3.Error:
+            pass
+
+    def purge_expired(self, now):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM fundamentals WHERE expires_at <= ?", (now.isoformat(),))
+
+    def clear(self, code=None):
+        with closing(self._connect()) as conn, conn:
+            if code:
+                conn.execute("DELETE FROM fundamentals WHERE code=?", (code,))
+            else:
+                conn.execute("DELETE FROM fundamentals")
+
+
+class ModelRegistry:
+    """학습 모델 버전 저장소
+
+    구조: {root}/models/{mode}/{key}/{version}/   (mode: growth/value, key: 종목코드 또는 'pooled')
+          아티팩트 파일 (XGBoost/LSTM/ONNX 등) + meta.json
+    버전 디렉토리는 임시 디렉토리에 모두 기록 후 rename → meta.json 있는 버전만 유효
+    """
+
+    META_FILE = 'meta.json'
+    KEEP_VERSIONS = 3
+
+    def __init__(self, root=None, keep=None):
+        self.dir = os.path.join(root or DEFAULT_CACHE_DIR, 'models')
+        self.keep = keep or self.KEEP_VERSIONS
+
+    def _key_dir(self, mode, key):
+        return os.path.join(self.dir, mode, str(key))
+
+    def versions(self, mode, key):
+        """유효 버전 목록 (오래된 순)"""
+        key_dir = self._key_dir(mode, key)
+        try:
+            names = sorted(os.listdir(key_dir))
+        except FileNotFoundError:
+            return []
+        return [name for name in names
+                if not name.startswith('.') and os.path.exists(os.path.join(key_dir, name, self.META_FILE))]
+
+    def latest(self, mode, key):
+        """최신 버전 (디렉토리 경로, meta dict) — 없거나 손상 시 None"""
+        for version in reversed(self.versions(mode, key)):
+            path = os.path.join(self._key_dir(mode, key), version)
+            try:
+                with open(os.path.join(path, self.META_FILE), 'r', encoding='utf-8') as f:
+                    return path, json.load(f)
+            except (OSError, json.JSONDecodeError):
+                continue
+        return None
+
+    def load_fresh(self, mode, key, max_age_days, now=None):
+        """학습 후 max_age_days 이내인 최신 버전 (경로, meta) 또는 None"""
+        if not max_age_days:
+            return None
+        found = self.latest(mode, key)
+        if found is None:
+            return None
+        now = now or datetime.now()
+        try:
+            trained_at = datetime.fromisoformat(found[1]['trained_at'])
+        except (KeyError, TypeError, ValueError):
+            return None
+        if now - trained_at > timedelta(days=max_age_days):
+            return None
+        return found
+
+    def save(self, mode, key, write_artifacts, meta, now=None):
+        """write_artifacts(dir)로 아티팩트 기록 → meta.json → 버전 확정 (오래된 버전 정리)
+
+        Returns: 버전 문자열
+        """
+        now = now or datetime.now()
+        key_dir = self._key_dir(mode, key)
+        os.makedirs(key_dir, exist_ok=True)
+        # 버전명: 시각(마이크로초) + 같은 시각 내 순번 (고정폭 → 정렬 순서 = 저장 순서)
+        base = now.strftime('%Y%m%dT%H%M%S_%f')
+        seq = 0
+        for name in os.listdir(key_dir):
+            if name.startswith(f"{base}_") and name[len(base) + 1:].isdigit():
+                seq = max(seq, int(name[len(base) + 1:]) + 1)
+        version = f"{base}_{seq:03d}"
+
+        tmp_dir = os.path.join(key_dir, f".{version}.{os.getpid()}.tmp")
+        os.makedirs(tmp_dir)
+        try:
+            write_artifacts(tmp_dir)
+            payload = dict(meta, mode=mode, key=str(key), version=version,
+                           trained_at=meta.get('trained_at') or now.isoformat(timespec='seconds'))
+            with open(os.path.join(tmp_dir, self.META_FILE), 'w', encoding='utf-8') as f:
+                json.dump(payload, f, ensure_ascii=False, indent=2, default=str)
+            os.replace(tmp_dir, os.path.join(key_dir, version))
+        finally:
+            if os.path.exists(tmp_dir):
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        for old in self.versions(mode, key)[:-self.keep]:
+            if old == version:
+                continue
+            shutil.rmtree(os.path.join(key_dir, old), ignore_errors=True)
+        return version
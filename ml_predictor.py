@@ -9,13 +9,16 @@ US 버전에서 3곳 수정:
 3. 가격 출력: $ → ₩, 소수점 → 정수
 """
 
+import os
 import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
 from kr_data_provider import KRDataProvider
+from kr_store import ModelRegistry
 
 # CPU: XGBoost
 try:
@@ -29,7 +32,7 @@ except ImportError:
 try:
     import torch
     import torch.nn as nn
-    from torch.utils.data import DataLoader, TensorDataset
+    from torch.utils.data import DataLoader, BatchSampler, RandomSampler, SequentialSampler
     PYTORCH_AVAILABLE = True
     TORCH_DEVICE = torch.device('cpu')
 
@@ -62,11 +65,18 @@ except ImportError:
     ONNX_PROVIDERS = []
     print("⚠️ ONNX Runtime 미설치: pip install onnxruntime-directml")
 
-# 기술 지표 라이브러리
-from ta.trend import MACD, ADXIndicator, SMAIndicator, EMAIndicator
-from ta.momentum import RSIIndicator, StochasticOscillator
-from ta.volatility import BollingerBands, AverageTrueRange
-from ta.volume import OnBalanceVolumeIndicator
+# 기술 지표 엔진 (ta 계산식과 동일한 NumPy 구현, Titan 점수와 지표 시계열 공유)
+from kr_indicators import (shift, technical_indicators, shared_indicator_cache, TRADING_DAYS_52W,
+                           SHARED_HISTORY_PERIOD)
+
+
+# 모델 재사용 기준 (학습 후 N일 이내 저장 모델은 재학습 없이 예측, 0이면 항상 재학습)
+MODEL_MAX_AGE_DAYS = float(os.environ.get('KR_MODEL_MAX_AGE_DAYS', '7'))
+
+# 모델 레지스트리 아티팩트 파일명
+ARTIFACT_XGBOOST = 'xgboost.json'
+ARTIFACT_LSTM = 'lstm.pt'
+ARTIFACT_ONNX = 'lstm.onnx'
 
 
 # 글로벌 KRDataProvider 인스턴스
@@ -87,129 +97,141 @@ class FeatureEngineer:
     """기술 지표 + 가치투자 피처 생성"""
 
     @staticmethod
-    def create_features(df, ticker_info=None, value_mode=False):
-        features = pd.DataFrame(index=df.index)
-
-        close = df['Close']
-        high = df['High']
-        low = df['Low']
-        volume = df['Volume']
-
-        # 1. 가격 기반 피처
-        features['return_1d'] = close.pct_change(1)
-        features['return_5d'] = close.pct_change(5)
-        features['return_10d'] = close.pct_change(10)
-        features['return_20d'] = close.pct_change(20)
-
-        # 2. 이동평균
-        features['sma_5'] = SMAIndicator(close, window=5).sma_indicator() / close - 1
-        features['sma_10'] = SMAIndicator(close, window=10).sma_indicator() / close - 1
-        features['sma_20'] = SMAIndicator(close, window=20).sma_indicator() / close - 1
-        features['sma_50'] = SMAIndicator(close, window=50).sma_indicator() / close - 1
-        features['ema_12'] = EMAIndicator(close, window=12).ema_indicator() / close - 1
-        features['ema_26'] = EMAIndicator(close, window=26).ema_indicator() / close - 1
-
-        # 3. 모멘텀 지표
-        features['rsi'] = RSIIndicator(close, window=14).rsi() / 100
-        stoch = StochasticOscillator(high, low, close)
-        features['stoch_k'] = stoch.stoch() / 100
-        features['stoch_d'] = stoch.stoch_signal() / 100
-
-        # 4. MACD
-        macd = MACD(close)
-        features['macd'] = macd.macd() / close
-        features['macd_signal'] = macd.macd_signal() / close
-        features['macd_hist'] = macd.macd_diff() / close
-
-        # 5. 볼린저 밴드
-        bb = BollingerBands(close)
-        features['bb_high'] = bb.bollinger_hband() / close - 1
-        features['bb_low'] = bb.bollinger_lband() / close - 1
-        features['bb_width'] = (bb.bollinger_hband() - bb.bollinger_lband()) / close
-
-        # 6. ATR
-        atr = AverageTrueRange(high, low, close)
-        features['atr'] = atr.average_true_range() / close
-
-        # 7. ADX
-        adx = ADXIndicator(high, low, close)
-        features['adx'] = adx.adx() / 100
-        features['adx_pos'] = adx.adx_pos() / 100
-        features['adx_neg'] = adx.adx_neg() / 100
-
-        # 8. 거래량 지표
-        features['volume_change'] = volume.pct_change(1)
-        features['volume_ma_ratio'] = volume / volume.rolling(20).mean()
-        obv = OnBalanceVolumeIndicator(close, volume)
-        features['obv_change'] = obv.on_balance_volume().pct_change(5)
-
-        # 9. 가격 위치
-        features['high_low_ratio'] = (close - low) / (high - low + 1e-10)
-        features['close_to_high'] = close / high.rolling(20).max() - 1
-        features['close_to_low'] = close / low.rolling(20).min() - 1
-
-        # 10. 52주 가격 위치
-        features['price_52w_high'] = close / close.rolling(252).max() - 1
-        features['price_52w_low'] = close / close.rolling(252).min() - 1
-        features['price_52w_position'] = (close - close.rolling(252).min()) / \
-                                         (close.rolling(252).max() - close.rolling(252).min() + 1e-10)
-
-        # ===== 가치투자 피처 (value_mode) =====
-        if value_mode and ticker_info:
-            div_yield = ticker_info.get('dividendYield', 0) or 0
-            features['dividend_yield'] = div_yield
-
-            if div_yield >= 0.03:
-                features['dividend_attractive'] = 1.0
-            elif div_yield >= 0.02:
-                features['dividend_attractive'] = 0.5
-            else:
-                features['dividend_attractive'] = 0.0
-
-            pe_ratio = ticker_info.get('trailingPE', 0) or ticker_info.get('forwardPE', 0) or 30
-            features['pe_ratio'] = min(pe_ratio / 100, 1.0)
-            features['pe_attractive'] = max(0, 1 - pe_ratio / 30) if pe_ratio > 0 else 0
-
-            pb_ratio = ticker_info.get('priceToBook', 0) or 3
-            features['pb_ratio'] = min(pb_ratio / 10, 1.0)
-            features['pb_attractive'] = max(0, 1 - pb_ratio / 3) if pb_ratio > 0 else 0
-
-            payout = ticker_info.get('payoutRatio', 0) or 0
-            features['payout_ratio'] = min(payout, 1.0)
-            if 0.3 <= payout <= 0.6:
-                features['payout_healthy'] = 1.0
-            elif 0.2 <= payout < 0.3 or 0.6 < payout <= 0.8:
-                features['payout_healthy'] = 0.5
+    def create_features(df, ticker_info=None, value_mode=False, indicators=None):
+        """indicators: technical_indicators(extended=True) 시계열 (IndicatorCache 공유분, 없으면 계산)"""
+        technical = FeatureEngineer.technical_features(df, indicators)
+        return FeatureEngineer.join_value_features(technical, ticker_info, value_mode)
+
+    @staticmethod
+    def technical_features(df, indicators=None):
+        """가격/거래량 기술 지표 피처 (kr_indicators 엔진, ta 계산식과 동일)
+
+        지표 시계열은 Titan 기술적 점수와 같은 technical_indicators 결과를 사용
+        """
+        close = df['Close'].values.astype(float)
+        high = df['High'].values.astype(float)
+        low = df['Low'].values.astype(float)
+        volume = df['Volume'].values.astype(float)
+        ind = indicators
+        if ind is None:
+            ind = technical_indicators(high, low, close, volume, extended=True)
+        features = {}
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # 1. 가격 기반 피처
+            for periods in (1, 5, 10, 20):
+                features[f'return_{periods}d'] = close / shift(close, periods) - 1
+
+            # 2. 이동평균
+            for window in (5, 10, 20, 50):
+                features[f'sma_{window}'] = ind[f'ma{window}'] / close - 1
+            for span in (12, 26):
+                features[f'ema_{span}'] = ind[f'ema{span}'] / close - 1
+
+            # 3. 모멘텀 지표
+            features['rsi'] = ind['rsi'] / 100
+            features['stoch_k'] = ind['stoch_k'] / 100
+            features['stoch_d'] = ind['stoch_d'] / 100
+
+            # 4. MACD
+            features['macd'] = ind['macd'] / close
+            features['macd_signal'] = ind['macd_signal'] / close
+            features['macd_hist'] = (ind['macd'] - ind['macd_signal']) / close
+
+            # 5. 볼린저 밴드
+            features['bb_high'] = ind['bb_upper'] / close - 1
+            features['bb_low'] = ind['bb_lower'] / close - 1
+            features['bb_width'] = (ind['bb_upper'] - ind['bb_lower']) / close
+
+            # 6. ATR
+            features['atr'] = ind['atr'] / close
+
+            # 7. ADX
+            features['adx'] = ind['adx'] / 100
+            features['adx_pos'] = ind['adx_pos'] / 100
+            features['adx_neg'] = ind['adx_neg'] / 100
+
+            # 8. 거래량 지표
+            features['volume_change'] = volume / shift(volume) - 1
+            features['volume_ma_ratio'] = volume / ind['volume_ma20']
+            features['obv_change'] = ind['obv'] / shift(ind['obv'], 5) - 1
+
+            # 9. 가격 위치
+            features['high_low_ratio'] = (close - low) / (high - low + 1e-10)
+            features['close_to_high'] = close / ind['high_max20'] - 1
+            features['close_to_low'] = close / ind['low_min20'] - 1
+
+            # 10. 52주 가격 위치 (252봉 미만 히스토리는 전 구간 결측 → 0)
+            if len(close) >= TRADING_DAYS_52W:
+                high_52w, low_52w = ind['high_52w'], ind['low_52w']
             else:
-                features['payout_healthy'] = 0.0
-
-            roe = ticker_info.get('returnOnEquity', 0) or 0
-            features['roe'] = min(max(roe, 0), 0.5)
-            features['roe_attractive'] = 1.0 if roe >= 0.15 else (roe / 0.15 if roe > 0 else 0)
-
-            debt_equity = ticker_info.get('debtToEquity', 0) or 0
-            features['debt_equity'] = min(debt_equity / 200, 1.0)
-            features['low_debt'] = 1.0 if debt_equity < 50 else max(0, 1 - debt_equity / 150)
-
-            fcf = ticker_info.get('freeCashflow', 0) or 0
-            market_cap = ticker_info.get('marketCap', 1) or 1
-            fcf_yield = fcf / market_cap if market_cap > 0 else 0
-            features['fcf_yield'] = max(min(fcf_yield, 0.2), -0.1)
-
-            features['value_score'] = (
-                features['dividend_attractive'] * 0.10 +
-                features['pe_attractive'] * 0.30 +
-                features['pb_attractive'] * 0.15 +
-                features['roe_attractive'] * 0.25 +
-                features['low_debt'] * 0.10 +
-                features['payout_healthy'] * 0.10
-            )
+                high_52w = low_52w = np.full(len(close), np.nan)
+            features['price_52w_high'] = close / high_52w - 1
+            features['price_52w_low'] = close / low_52w - 1
+            features['price_52w_position'] = (close - low_52w) / (high_52w - low_52w + 1e-10)
 
-        # NaN 처리
-        features = features.replace([np.inf, -np.inf], np.nan)
-        features = features.fillna(0)
+        # NaN/inf 처리
+        return pd.DataFrame({key: np.where(np.isfinite(values), values, 0.0)
+                             for key, values in features.items()}, index=df.index)
 
-        return features
+    @staticmethod
+    def join_value_features(features, ticker_info=None, value_mode=False):
+        """가치투자 피처 결합 (value_mode, 종목 정보 기준 상수 열 — 기술 지표와 별도 계산)"""
+        if not (value_mode and ticker_info):
+            return features
+        values = {}
+        div_yield = ticker_info.get('dividendYield', 0) or 0
+        values['dividend_yield'] = div_yield
+
+        if div_yield >= 0.03:
+            values['dividend_attractive'] = 1.0
+        elif div_yield >= 0.02:
+            values['dividend_attractive'] = 0.5
+        else:
+            values['dividend_attractive'] = 0.0
+
+        pe_ratio = ticker_info.get('trailingPE', 0) or ticker_info.get('forwardPE', 0) or 30
+        values['pe_ratio'] = min(pe_ratio / 100, 1.0)
+        values['pe_attractive'] = max(0, 1 - pe_ratio / 30) if pe_ratio > 0 else 0
+
+        pb_ratio = ticker_info.get('priceToBook', 0) or 3
+        values['pb_ratio'] = min(pb_ratio / 10, 1.0)
+        values['pb_attractive'] = max(0, 1 - pb_ratio / 3) if pb_ratio > 0 else 0
+
+        payout = ticker_info.get('payoutRatio', 0) or 0
+        values['payout_ratio'] = min(payout, 1.0)
+        if 0.3 <= payout <= 0.6:
+            values['payout_healthy'] = 1.0
+        elif 0.2 <= payout < 0.3 or 0.6 < payout <= 0.8:
+            values['payout_healthy'] = 0.5
+        else:
+            values['payout_healthy'] = 0.0
+
+        roe = ticker_info.get('returnOnEquity', 0) or 0
+        values['roe'] = min(max(roe, 0), 0.5)
+        values['roe_attractive'] = 1.0 if roe >= 0.15 else (roe / 0.15 if roe > 0 else 0)
+
+        debt_equity = ticker_info.get('debtToEquity', 0) or 0
+        values['debt_equity'] = min(debt_equity / 200, 1.0)
+        values['low_debt'] = 1.0 if debt_equity < 50 else max(0, 1 - debt_equity / 150)
+
+        fcf = ticker_info.get('freeCashflow', 0) or 0
+        market_cap = ticker_info.get('marketCap', 1) or 1
+        fcf_yield = fcf / market_cap if market_cap > 0 else 0
+        values['fcf_yield'] = max(min(fcf_yield, 0.2), -0.1)
+
+        values['value_score'] = (
+            values['dividend_attractive'] * 0.10 +
+            values['pe_attractive'] * 0.30 +
+            values['pb_attractive'] * 0.15 +
+            values['roe_attractive'] * 0.25 +
+            values['low_debt'] * 0.10 +
+            values['payout_healthy'] * 0.10
+        )
+
+        # NaN/inf 처리
+        values = {key: value if np.isfinite(value) else 0.0 for key, value in values.items()}
+        return pd.concat([features, pd.DataFrame(values, index=features.index)], axis=1)
 
     @staticmethod
     def create_target(df, horizon=5, threshold=0.02):
@@ -250,6 +272,32 @@ class LSTMModel(nn.Module):
         return out
 
 
+class SequenceBatches:
+    """LSTM 학습용 윈도우 데이터셋 (DataLoader 배치 단위로만 윈도우 복사)
+
+    windows: _create_sequences 읽기 전용 뷰, starts: 사용할 윈도우 위치, targets: 윈도우별 타깃
+    BatchSampler 와 함께 사용 → __getitem__ 이 배치 인덱스 목록을 받아 (X, y) 텐서 반환
+    """
+
+    def __init__(self, windows, starts, targets, device='cpu'):
+        self.windows = windows
+        self.starts = starts
+        self.targets = np.asarray(targets, dtype=np.int64)
+        self.device = device
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, batch):
+        X = torch.from_numpy(self.windows[self.starts[batch]])
+        y = torch.from_numpy(self.targets[batch])
+        return X.to(self.device), y.to(self.device)
+
+    def loader(self, batch_size, shuffle=False):
+        sampler = RandomSampler(self) if shuffle else SequentialSampler(self)
+        return DataLoader(self, sampler=BatchSampler(sampler, batch_size, drop_last=False), batch_size=None)
+
+
 class EnsemblePredictor:
     def __init__(self, sequence_length=20, value_mode=False):
         self.sequence_length = sequence_length
@@ -260,8 +308,16 @@ class EnsemblePredictor:
         self.feature_engineer = FeatureEngineer()
         self.feature_columns = None
         self.ticker_info = None
+        self.metrics = {}
 
-    def prepare_data(self, code, period='2y'):
+    def reset_models(self):
+        """종목별 학습 전 이전 종목 모델 제거 (레지스트리 로드/학습 결과 혼용 방지)"""
+        self.xgb_model = None
+        self.lstm_model = None
+        self.onnx_session = None
+        self.metrics = {}
+
+    def prepare_data(self, code, period=SHARED_HISTORY_PERIOD):
         """데이터 준비 (한국장: KRDataProvider 사용)"""
         print(f"📥 {code} 데이터 다운로드 중...")
 
@@ -285,7 +341,8 @@ class EnsemblePredictor:
             except Exception as e:
                 print(f"   ⚠️ 펀더멘털 정보 로드 실패: {str(e)[:30]}")
 
-        features = self.feature_engineer.create_features(df, ticker_info, self.value_mode)
+        indicators = shared_indicator_cache().series(code, df)
+        features = self.feature_engineer.create_features(df, ticker_info, self.value_mode, indicators)
         target = self.feature_engineer.create_target(df, horizon=5, threshold=0.02)
 
         valid_idx = ~(features.isna().any(axis=1) | target.isna())
@@ -303,7 +360,6 @@ class EnsemblePredictor:
 
         print("🔧 XGBoost 학습 중 (CPU)...")
 
-        import os
         n_jobs = os.cpu_count()
 
         self.xgb_model = xgb.XGBClassifier(
@@ -326,29 +382,26 @@ class EnsemblePredictor:
 
         val_acc = (self.xgb_model.predict(X_val) == y_val).mean()
         print(f"   XGBoost 검증 정확도: {val_acc:.2%}")
+        self.metrics['xgboost_val_acc'] = float(val_acc)
 
         return self.xgb_model
 
-    def train_lstm(self, X_train, y_train, X_val, y_val, epochs=50, batch_size=32):
+    def train_lstm(self, X_train, y_train, X_val, y_val, epochs=50, batch_size=32,
+                   groups_train=None, groups_val=None):
+        """groups_*: 행별 종목코드 (풀링 학습 시 종목 경계를 넘는 시퀀스 제외)"""
         if not PYTORCH_AVAILABLE:
             return None
 
         print(f"🔧 LSTM 학습 중 ({TORCH_DEVICE})...")
 
-        X_train_seq = self._create_sequences(X_train)
-        X_val_seq = self._create_sequences(X_val)
-        y_train_seq = y_train[self.sequence_length-1:]
-        y_val_seq = y_val[self.sequence_length-1:]
-
-        X_train_t = torch.FloatTensor(X_train_seq).to(TORCH_DEVICE)
-        y_train_t = torch.LongTensor(y_train_seq.values).to(TORCH_DEVICE)
-        X_val_t = torch.FloatTensor(X_val_seq).to(TORCH_DEVICE)
-        y_val_t = torch.LongTensor(y_val_seq.values).to(TORCH_DEVICE)
-
-        train_dataset = TensorDataset(X_train_t, y_train_t)
-        train_loader = DataLoader(train_dataset, batch_size=batch_size, shuffle=True)
+        train_dataset = SequenceBatches(*self._create_labeled_sequences(X_train, y_train, groups_train),
+                                        device=TORCH_DEVICE)
+        val_dataset = SequenceBatches(*self._create_labeled_sequences(X_val, y_val, groups_val),
+                                      device=TORCH_DEVICE)
+        train_loader = train_dataset.loader(batch_size, shuffle=True)
+        val_loader = val_dataset.loader(max(batch_size, 1024))
 
-        input_size = X_train_seq.shape[2]
+        input_size = train_dataset.windows.shape[2]
         self.lstm_model = LSTMModel(input_size=input_size).to(TORCH_DEVICE)
 
         criterion = nn.CrossEntropyLoss()
@@ -375,10 +428,12 @@ class EnsemblePredictor:
             scheduler.step()
 
             self.lstm_model.eval()
+            correct = 0
             with torch.no_grad():
-                val_outputs = self.lstm_model(X_val_t)
-                val_pred = val_outputs.argmax(dim=1)
-                val_acc = (val_pred == y_val_t).float().mean().item()
+                for X_batch, y_batch in val_loader:
+                    val_pred = self.lstm_model(X_batch).argmax(dim=1)
+                    correct += (val_pred == y_batch).sum().item()
+            val_acc = correct / len(val_dataset) if len(val_dataset) else 0.0
 
             if val_acc > best_val_acc:
                 best_val_acc = val_acc
@@ -397,13 +452,15 @@ class EnsemblePredictor:
         if best_model_state:
             self.lstm_model.load_state_dict(best_model_state)
         print(f"   LSTM 최고 검증 정확도: {best_val_acc:.2%}")
+        self.metrics['lstm_val_acc'] = float(best_val_acc)
 
         if ONNX_AVAILABLE:
-            self._export_to_onnx(X_train_seq.shape[2])
+            self._export_to_onnx(input_size)
 
         return self.lstm_model
 
-    def _export_to_onnx(self, input_size):
+    def _export_to_onnx(self, input_size, path=None):
+        """LSTM → ONNX 변환 + 추론 세션 (path 지정 시 파일 보존, 없으면 임시 파일 삭제)"""
         try:
             print("🔄 ONNX 변환 중 (DirectML 가속 준비)...")
             self.lstm_model.eval()
@@ -412,15 +469,16 @@ class EnsemblePredictor:
             dummy_input = torch.randn(1, self.sequence_length, input_size)
 
             import tempfile
-            import os
 
-            with tempfile.NamedTemporaryFile(suffix='.onnx', delete=False) as f:
-                temp_path = f.name
+            keep_file = path is not None
+            if not keep_file:
+                with tempfile.NamedTemporaryFile(suffix='.onnx', delete=False) as f:
+                    path = f.name
 
             torch.onnx.export(
                 self.lstm_model,
                 dummy_input,
-                temp_path,
+                path,
                 input_names=['input'],
                 output_names=['output'],
                 dynamic_axes={
@@ -431,14 +489,15 @@ class EnsemblePredictor:
             )
 
             self.onnx_session = ort.InferenceSession(
-                temp_path,
+                path,
                 providers=ONNX_PROVIDERS
             )
 
-            try:
-                os.unlink(temp_path)
-            except:
-                pass
+            if not keep_file:
+                try:
+                    os.unlink(path)
+                except:
+                    pass
 
             provider_used = self.onnx_session.get_providers()[0]
             if 'Dml' in provider_used:
@@ -452,12 +511,135 @@ class EnsemblePredictor:
             print(f"   ⚠️ ONNX 변환 실패 (PyTorch 추론 사용): {e}")
             self.onnx_session = None
 
+    # ================================================================
+    # 모델 레지스트리 (저장/재사용)
+    # ================================================================
+    def save_artifacts(self, path):
+        """학습된 모델 파일 기록 → 기록한 아티팩트 파일명 목록"""
+        artifacts = []
+        if self.xgb_model is not None:
+            self.xgb_model.save_model(os.path.join(path, ARTIFACT_XGBOOST))
+            artifacts.append(ARTIFACT_XGBOOST)
+        if self.lstm_model is not None:
+            torch.save(self.lstm_model.state_dict(), os.path.join(path, ARTIFACT_LSTM))
+            artifacts.append(ARTIFACT_LSTM)
+            if self.onnx_session is not None:
+                self._export_to_onnx(len(self.feature_columns), path=os.path.join(path, ARTIFACT_ONNX))
+                if self.onnx_session is not None:
+                    artifacts.append(ARTIFACT_ONNX)
+        return artifacts
+
+    def load_artifacts(self, path, meta):
+        """저장된 모델 로드 (설치된 라이브러리 기준, 로드한 모델 없으면 False)"""
+        artifacts = set(meta.get('artifacts', []))
+        if ARTIFACT_XGBOOST in artifacts and XGBOOST_AVAILABLE:
+            self.xgb_model = xgb.XGBClassifier()
+            self.xgb_model.load_model(os.path.join(path, ARTIFACT_XGBOOST))
+        if ARTIFACT_LSTM in artifacts and PYTORCH_AVAILABLE:
+            self.lstm_model = LSTMModel(input_size=meta['input_size'])
+            self.lstm_model.load_state_dict(
+                torch.load(os.path.join(path, ARTIFACT_LSTM), map_location='cpu'))
+            self.lstm_model.eval()
+        if ARTIFACT_ONNX in artifacts and ONNX_AVAILABLE:
+            try:
+                self.onnx_session = ort.InferenceSession(
+                    os.path.join(path, ARTIFACT_ONNX), providers=ONNX_PROVIDERS)
+            except Exception as e:
+                print(f"   ⚠️ ONNX 모델 로드 실패 (PyTorch 추론 사용): {str(e)[:50]}")
+                self.onnx_session = None
+        return self.xgb_model is not None
+
+    def load_registered(self, registry, mode, key, max_age_days=MODEL_MAX_AGE_DAYS):
+        """레지스트리 최신 모델이 max_age_days 이내이고 피처 구성이 같으면 로드 (재학습 생략)"""
+        found = registry.load_fresh(mode, key, max_age_days) if registry is not None else None
+        if found is None:
+            return False
+        path, meta = found
+        if (meta.get('feature_columns') != self.feature_columns
+                or meta.get('sequence_length') != self.sequence_length):
+            return False
+        try:
+            loaded = self.load_artifacts(path, meta)
+        except Exception as e:
+            print(f"   ⚠️ 저장 모델 로드 실패 (재학습): {str(e)[:50]}")
+            loaded = False
+        if not loaded:
+            self.reset_models()
+            return False
+        self.metrics = dict(meta.get('metrics', {}))
+        print(f"♻️ 저장 모델 사용: {mode}/{key} v{meta['version']} (학습 {meta['trained_at']})")
+        return True
+
+    def save_registered(self, registry, mode, key, **extra):
+        """학습 결과를 레지스트리 새 버전으로 저장 (모델 + 피처 구성 + 학습 메타데이터)"""
+        if registry is None or self.xgb_model is None:
+            return None
+        meta = dict(extra,
+                    feature_columns=self.feature_columns,
+                    sequence_length=self.sequence_length,
+                    input_size=len(self.feature_columns),
+                    value_mode=self.value_mode,
+                    metrics=self.metrics,
+                    trained_at=datetime.now().isoformat(timespec='seconds'))
+        def _write(path):
+            meta['artifacts'] = self.save_artifacts(path)
+
+        try:
+            version = registry.save(mode, key, _write, meta)
+        except Exception as e:
+            print(f"   ⚠️ 모델 저장 실패: {str(e)[:50]}")
+            return None
+        print(f"💾 모델 저장: {mode}/{key} v{version} ({', '.join(meta['artifacts'])})")
+        return version
+
     def _create_sequences(self, X):
-        sequences = []
-        X_values = X.values if hasattr(X, 'values') else X
-        for i in range(len(X_values) - self.sequence_length + 1):
-            sequences.append(X_values[i:i+self.sequence_length])
-        return np.array(sequences)
+        """(행, 피처) → (윈도우수, sequence_length, 피처) 슬라이딩 윈도우
+
+        float32 원본 1벌 위의 읽기 전용 뷰 (윈도우 복사 없음, 복사는 배치/추론 시점에만)
+        """
+        X_values = np.asarray(X.values if hasattr(X, 'values') else X, dtype=np.float32)
+        if len(X_values) < self.sequence_length:
+            empty = np.empty((0, self.sequence_length, X_values.shape[1]), dtype=np.float32)
+            empty.flags.writeable = False
+            return empty
+        return sliding_window_view(X_values, self.sequence_length, axis=0).transpose(0, 2, 1)
+
+    def _create_labeled_sequences(self, X, y, groups=None):
+        """윈도우 뷰 + 사용할 윈도우 위치 + 마지막 시점 타깃
+
+        groups: 행별 종목코드 (종목별 연속 구간) → 종목 경계를 넘는 윈도우 제외
+        Returns: (windows, starts, targets) — i번째 시퀀스 = windows[starts[i]]
+        """
+        windows = self._create_sequences(X)
+        starts = np.arange(len(windows))
+        if groups is not None and len(starts):
+            groups = np.asarray(groups)
+            block = np.concatenate([[0], np.cumsum(groups[1:] != groups[:-1])])
+            starts = starts[block[starts] == block[starts + self.sequence_length - 1]]
+        return windows, starts, np.asarray(y)[starts + self.sequence_length - 1]
+
+    def _lstm_probabilities(self, X_seq):
+        """LSTM 추론 (ONNX 우선, 실패 시 PyTorch) → (pred, prob) 또는 None"""
+        if self.onnx_session is not None:
+            try:
+                onnx_input = {self.onnx_session.get_inputs()[0].name: X_seq.astype(np.float32)}
+                lstm_out = self.onnx_session.run(None, onnx_input)[0]
+                exp_out = np.exp(lstm_out - np.max(lstm_out, axis=1, keepdims=True))
+                lstm_prob = exp_out / np.sum(exp_out, axis=1, keepdims=True)
+                return lstm_out.argmax(axis=1), lstm_prob
+            except Exception as e:
+                print(f"   ⚠️ ONNX 추론 실패, PyTorch 사용: {str(e)[:50]}...")
+                self.onnx_session = None
+
+        if self.lstm_model is not None:
+            self.lstm_model.cpu()
+            X_t = torch.from_numpy(np.ascontiguousarray(X_seq, dtype=np.float32))
+            self.lstm_model.eval()
+            with torch.no_grad():
+                lstm_out = self.lstm_model(X_t)
+                lstm_prob = torch.softmax(lstm_out, dim=1).cpu().numpy()
+                return lstm_out.argmax(dim=1).cpu().numpy(), lstm_prob
+        return None
 
     def predict(self, X_new):
         predictions = {}
@@ -471,33 +653,9 @@ class EnsemblePredictor:
 
         if (self.onnx_session is not None or self.lstm_model is not None) and len(X_new) >= self.sequence_length:
             X_seq = self._create_sequences(X_new)
-            if len(X_seq) > 0:
-                lstm_out = None
-
-                if self.onnx_session is not None:
-                    try:
-                        onnx_input = {self.onnx_session.get_inputs()[0].name: X_seq.astype(np.float32)}
-                        lstm_out = self.onnx_session.run(None, onnx_input)[0]
-                        exp_out = np.exp(lstm_out - np.max(lstm_out, axis=1, keepdims=True))
-                        lstm_prob = exp_out / np.sum(exp_out, axis=1, keepdims=True)
-                        lstm_pred = lstm_out.argmax(axis=1)
-                    except Exception as e:
-                        print(f"   ⚠️ ONNX 추론 실패, PyTorch 사용: {str(e)[:50]}...")
-                        self.onnx_session = None
-                        lstm_out = None
-
-                if lstm_out is None and self.lstm_model is not None:
-                    self.lstm_model.cpu()
-                    X_t = torch.FloatTensor(X_seq)
-                    self.lstm_model.eval()
-                    with torch.no_grad():
-                        lstm_out = self.lstm_model(X_t)
-                        lstm_prob = torch.softmax(lstm_out, dim=1).cpu().numpy()
-                        lstm_pred = lstm_out.argmax(dim=1).cpu().numpy()
-
-                if lstm_out is not None:
-                    predictions['lstm'] = lstm_pred
-                    probabilities['lstm'] = lstm_prob
+            lstm = self._lstm_probabilities(X_seq) if len(X_seq) > 0 else None
+            if lstm is not None:
+                predictions['lstm'], probabilities['lstm'] = lstm
 
         if 'xgboost' in probabilities and 'lstm' in probabilities:
             offset = len(probabilities['xgboost']) - len(probabilities['lstm'])
@@ -509,6 +667,87 @@ class EnsemblePredictor:
 
         return predictions, probabilities
 
+    # ================================================================
+    # 풀링 모드: 전 종목 피처를 쌓아 단일 모델 학습/일괄 예측
+    # ================================================================
+    def prepare_pooled_data(self, codes, period=SHARED_HISTORY_PERIOD):
+        """종목별 피처 + 시장/섹터 원-핫 범주 피처
+
+        Returns:
+            (frames, infos): {code: (df, features, target)}, {code: ticker_info 또는 None}
+            (전 종목 피처 컬럼 통일, self.feature_columns 갱신)
+        """
+        provider = get_kr_provider()
+        frames, infos, categories = {}, {}, {}
+        for code in codes:
+            try:
+                self.ticker_info = None
+                df, features, target = self.prepare_data(code, period=period)
+                if df is None:
+                    continue
+                market, sector = provider.get_stock_category(code)
+            except Exception as e:
+                print(f"   ⚠️ {code} 데이터 준비 실패: {str(e)[:50]}")
+                continue
+            frames[code] = (df, features, target)
+            infos[code] = self.ticker_info
+            categories[code] = (f"market_{market}", f"sector_{sector or '기타'}")
+
+        if not frames:
+            return {}, {}
+
+        base_columns = list(dict.fromkeys(
+            col for _, features, _ in frames.values() for col in features.columns))
+        category_columns = sorted({col for pair in categories.values() for col in pair})
+        for code, (df, features, target) in frames.items():
+            features = features.reindex(columns=base_columns, fill_value=0.0)
+            for col in category_columns:
+                features[col] = 1.0 if col in categories[code] else 0.0
+            frames[code] = (df, features, target)
+
+        self.feature_columns = base_columns + category_columns
+        return frames, infos
+
+    @staticmethod
+    def pooled_split(frames, train_ratio=0.8):
+        """종목별 시간순 분할 후 연결 → (X, y, groups) 학습/검증 (미래 구간 누수 방지)"""
+        train, val = [], []
+        for code, (_, features, target) in frames.items():
+            split_idx = int(len(features) * train_ratio)
+            train.append((code, features.iloc[:split_idx], target.iloc[:split_idx]))
+            val.append((code, features.iloc[split_idx:], target.iloc[split_idx:]))
+
+        def _stack(parts):
+            X = pd.concat([features for _, features, _ in parts])
+            y = pd.concat([target for _, _, target in parts])
+            groups = np.concatenate([np.repeat(code, len(features)) for code, features, _ in parts])
+            return X, y, groups
+
+        return _stack(train), _stack(val)
+
+    def predict_latest(self, recent):
+        """종목별 최근 피처 {code: DataFrame} → {code: 최종 확률} (모델별 1회 배치 추론)
+
+        XGBoost+LSTM 모두 있으면 앙상블(0.4/0.6), XGBoost만 있으면 XGBoost 확률
+        """
+        codes = list(recent)
+        if not codes or self.xgb_model is None:
+            return {}
+
+        last_rows = pd.concat([recent[code][self.feature_columns].iloc[[-1]] for code in codes])
+        xgb_prob = self.xgb_model.predict_proba(last_rows)
+        probs = dict(zip(codes, xgb_prob))
+
+        seq_codes = [code for code in codes if len(recent[code]) >= self.sequence_length]
+        if seq_codes and (self.onnx_session is not None or self.lstm_model is not None):
+            X_seq = np.stack([recent[code][self.feature_columns].values[-self.sequence_length:]
+                              for code in seq_codes])
+            lstm = self._lstm_probabilities(X_seq)
+            if lstm is not None:
+                for code, lstm_prob in zip(seq_codes, lstm[1]):
+                    probs[code] = 0.4 * probs[code] + 0.6 * lstm_prob
+        return probs
+
     def get_signal(self, prob):
         if prob[2] > 0.5:
             return "🚀 Strong Buy", prob[2]
@@ -522,9 +761,113 @@ class EnsemblePredictor:
             return "➡️ Hold", max(prob)
 
 
-def train_and_predict(codes, save_models=True, value_mode=False):
-    """여러 종목에 대해 학습 및 예측 (한국장)"""
+def _build_result(predictor, code, df, features, latest_prob, ticker_info, value_mode):
+    """예측 확률 → 결과 딕셔너리 + 출력"""
+    signal, confidence = predictor.get_signal(latest_prob)
+
+    # 실시간 가격 (info에서 가져오기, 없으면 히스토리 마지막 종가)
+    try:
+        provider = get_kr_provider()
+        info = ticker_info if value_mode and ticker_info else provider.get_info(code)
+        current_price = info.get('currentPrice') or info.get('regularMarketPrice') or df['Close'].iloc[-1]
+    except Exception:
+        current_price = df['Close'].iloc[-1]
+
+    result = {
+        'ticker': code,
+        'price': current_price,
+        'signal': signal,
+        'confidence': confidence,
+        'prob_down': latest_prob[0],
+        'prob_neutral': latest_prob[1],
+        'prob_up': latest_prob[2]
+    }
+
+    if value_mode and ticker_info:
+        result['dividend_yield'] = ticker_info.get('dividendYield', 0) or 0
+        result['pe_ratio'] = ticker_info.get('trailingPE', 0) or 0
+        result['pb_ratio'] = ticker_info.get('priceToBook', 0) or 0
+        result['value_score'] = features['value_score'].iloc[-1] if 'value_score' in features.columns else 0
+
+    # 한국장: ₩, 정수 표시
+    print(f"\n🎯 {code} 예측 결과:")
+    print(f"   현재가: ₩{int(current_price):,}")
+    print(f"   신호: {signal} (신뢰도: {confidence:.1%})")
+    print(f"   확률 - 하락: {latest_prob[0]:.1%}, 보합: {latest_prob[1]:.1%}, 상승: {latest_prob[2]:.1%}")
+
+    if value_mode and ticker_info:
+        div_y = ticker_info.get('dividendYield', 0) or 0
+        print(f"   💰 가치점수: {result.get('value_score', 0):.2f} | 배당률: {div_y*100:.1f}%")
+
+    return result
+
+
+def _train_or_load(predictor, registry, key, X_train, y_train, X_val, y_val,
+                   save_models=True, max_model_age_days=MODEL_MAX_AGE_DAYS, lstm_kwargs=None, **meta):
+    """레지스트리 모델이 max_model_age_days 이내면 로드, 아니면 학습 후 (save_models 시) 새 버전 저장"""
+    mode = 'value' if predictor.value_mode else 'growth'
+    predictor.reset_models()
+    if predictor.load_registered(registry, mode, key, max_model_age_days):
+        return
+
+    predictor.train_xgboost(X_train, y_train, X_val, y_val)
+    predictor.train_lstm(X_train, y_train, X_val, y_val, **(lstm_kwargs or {'epochs': 50}))
+    if save_models:
+        predictor.save_registered(registry, mode, key, train_rows=len(X_train), val_rows=len(X_val), **meta)
+
+
+def train_and_predict_pooled(codes, value_mode=False, save_models=True,
+                             max_model_age_days=MODEL_MAX_AGE_DAYS):
+    """전 종목 피처를 쌓아 모델 1회 학습 → 전 종목 일괄 예측 (한국장)
+
+    종목당 ~400행으로 매번 새로 학습하던 방식 대비 학습 N회 → 1회,
+    시장/섹터 원-핫 범주 피처로 종목 특성 구분
+    """
+    predictor = EnsemblePredictor(sequence_length=20, value_mode=value_mode)
+    mode_str = "가치주" if value_mode else "성장주"
+    print(f"\n🔍 분석 모드: {mode_str} (풀링 학습)")
+
+    frames, infos = predictor.prepare_pooled_data(codes, period=SHARED_HISTORY_PERIOD)
+    if not frames:
+        return []
+
+    (X_train, y_train, groups_train), (X_val, y_val, groups_val) = predictor.pooled_split(frames)
+    print(f"\n🧠 풀링 학습: {len(frames)}개 종목, 학습 {len(X_train):,}행 / 검증 {len(X_val):,}행")
+    _train_or_load(predictor, ModelRegistry(), 'pooled', X_train, y_train, X_val, y_val,
+                   save_models=save_models, max_model_age_days=max_model_age_days,
+                   lstm_kwargs={'epochs': 50, 'batch_size': 256,
+                                'groups_train': groups_train, 'groups_val': groups_val},
+                   codes=list(frames))
+
+    probs = predictor.predict_latest(
+        {code: features.iloc[-30:] for code, (_, features, _) in frames.items()})
+
+    results = []
+    for code, (df, features, _) in frames.items():
+        if code not in probs:
+            continue
+        try:
+            results.append(_build_result(predictor, code, df, features, probs[code],
+                                         infos.get(code), value_mode))
+        except Exception as e:
+            print(f"❌ {code} 분석 실패: {e}")
+    return results
+
+
+def train_and_predict(codes, save_models=True, value_mode=False, pooled=False,
+                      max_model_age_days=MODEL_MAX_AGE_DAYS):
+    """여러 종목에 대해 학습 및 예측 (한국장)
+
+    pooled: True면 종목별 학습 대신 전 종목 단일 모델 (train_and_predict_pooled)
+    save_models: 학습 모델을 레지스트리에 저장 (.kr_cache/models/{growth|value}/{code|pooled})
+    max_model_age_days: 이 기간 내 저장 모델은 재학습 없이 예측만 (0이면 항상 재학습)
+    """
+    if pooled:
+        return train_and_predict_pooled(codes, value_mode=value_mode, save_models=save_models,
+                                        max_model_age_days=max_model_age_days)
+
     predictor = EnsemblePredictor(sequence_length=20, value_mode=value_mode)
+    registry = ModelRegistry()
     results = []
 
     mode_str = "가치주" if value_mode else "성장주"
@@ -536,7 +879,7 @@ def train_and_predict(codes, save_models=True, value_mode=False):
         print('='*50)
 
         try:
-            df, features, target = predictor.prepare_data(code, period='2y')
+            df, features, target = predictor.prepare_data(code, period=SHARED_HISTORY_PERIOD)
             if df is None:
                 continue
 
@@ -546,56 +889,22 @@ def train_and_predict(codes, save_models=True, value_mode=False):
             X_val = features.iloc[split_idx:]
             y_val = target.iloc[split_idx:]
 
-            predictor.train_xgboost(X_train, y_train, X_val, y_val)
-            predictor.train_lstm(X_train, y_train, X_val, y_val, epochs=50)
+            _train_or_load(predictor, registry, code, X_train, y_train, X_val, y_val,
+                           save_models=save_models, max_model_age_days=max_model_age_days)
 
             recent_features = features.iloc[-30:]
             predictions, probabilities = predictor.predict(recent_features)
 
             if 'ensemble' in probabilities:
                 latest_prob = probabilities['ensemble'][-1]
-                signal, confidence = predictor.get_signal(latest_prob)
             elif 'xgboost' in probabilities:
                 latest_prob = probabilities['xgboost'][-1]
-                signal, confidence = predictor.get_signal(latest_prob)
             else:
-                signal, confidence = "❓ Unknown", 0
+                print(f"❌ {code} 분석 실패: 예측 모델 없음")
+                continue
 
-            # 실시간 가격 (info에서 가져오기, 없으면 히스토리 마지막 종가)
-            try:
-                provider = get_kr_provider()
-                info = predictor.ticker_info if value_mode and predictor.ticker_info else provider.get_info(code)
-                current_price = info.get('currentPrice') or info.get('regularMarketPrice') or df['Close'].iloc[-1]
-            except Exception:
-                current_price = df['Close'].iloc[-1]
-
-            result = {
-                'ticker': code,
-                'price': current_price,
-                'signal': signal,
-                'confidence': confidence,
-                'prob_down': latest_prob[0],
-                'prob_neutral': latest_prob[1],
-                'prob_up': latest_prob[2]
-            }
-
-            if value_mode and predictor.ticker_info:
-                result['dividend_yield'] = predictor.ticker_info.get('dividendYield', 0) or 0
-                result['pe_ratio'] = predictor.ticker_info.get('trailingPE', 0) or 0
-                result['pb_ratio'] = predictor.ticker_info.get('priceToBook', 0) or 0
-                result['value_score'] = features['value_score'].iloc[-1] if 'value_score' in features.columns else 0
-
-            results.append(result)
-
-            # 한국장: ₩, 정수 표시
-            print(f"\n🎯 {code} 예측 결과:")
-            print(f"   현재가: ₩{int(current_price):,}")
-            print(f"   신호: {signal} (신뢰도: {confidence:.1%})")
-            print(f"   확률 - 하락: {latest_prob[0]:.1%}, 보합: {latest_prob[1]:.1%}, 상승: {latest_prob[2]:.1%}")
-
-            if value_mode and predictor.ticker_info:
-                div_y = predictor.ticker_info.get('dividendYield', 0) or 0
-                print(f"   💰 가치점수: {result.get('value_score', 0):.2f} | 배당률: {div_y*100:.1f}%")
+            results.append(_build_result(predictor, code, df, features, latest_prob,
+                                         predictor.ticker_info, value_mode))
 
         except Exception as e:
             print(f"❌ {code} 분석 실패: {e}")
@@ -604,14 +913,14 @@ def train_and_predict(codes, save_models=True, value_mode=False):
     return results
 
 
-def quick_predict(code):
-    """단일 종목 빠른 예측 (한국장)"""
+def quick_predict(code, max_model_age_days=MODEL_MAX_AGE_DAYS):
+    """단일 종목 빠른 예측 (한국장, 저장 모델이 신선하면 재학습 생략)"""
     predictor = EnsemblePredictor(sequence_length=20)
 
     print(f"\n🔮 {code} AI 예측 분석")
     print("="*50)
 
-    df, features, target = predictor.prepare_data(code, period='2y')
+    df, features, target = predictor.prepare_data(code, period=SHARED_HISTORY_PERIOD)
     if df is None:
         return None
 
@@ -621,8 +930,8 @@ def quick_predict(code):
     X_val = features.iloc[split_idx:]
     y_val = target.iloc[split_idx:]
 
-    predictor.train_xgboost(X_train, y_train, X_val, y_val)
-    predictor.train_lstm(X_train, y_train, X_val, y_val, epochs=50)
+    _train_or_load(predictor, ModelRegistry(), code, X_train, y_train, X_val, y_val,
+                   max_model_age_days=max_model_age_days)
 
     recent_features = features.iloc[-30:]
     predictions, probabilities = predictor.predict(recent_features)
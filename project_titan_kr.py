@@ -6,13 +6,24 @@ KOSPI 200 + KOSDAQ 시총 상위 종목 대상
 """
 
 import time
-from datetime import datetime
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from tabulate import tabulate
+import numpy as np
+import pandas as pd
 import pytz
 import os
 import sys
 
 from kr_data_provider import KRDataProvider
+from kr_market import MarketContext
+from kr_entry_exit import entry_exit_batch, pad_levels
+from kr_fundamentals import (gradient_score, inverse_gradient_score, resolve_by_sector,
+                             sector_thresholds, InfoColumns, ScoreSheet)
+from kr_indicators import (technical_indicators, panel_technical_indicators,
+                           panel_column, right_align, IndicatorStateCache,
+                           support_resistance, shared_indicator_cache,
+                           SHARED_HISTORY_PERIOD, TRADING_DAYS_52W)
 
 # ============================================================================
 # 한국장 종목코드 (6자리)
@@ -389,6 +400,29 @@ class TitanKRAnalyzer:
     # Beta 임계값 (가치주)
     VALUE_BETA_THRESHOLDS = (0.8, 1.2)
 
+    # 성장주 FCF 마진 기준 (섹터 키워드, (excellent, good))
+    GROWTH_FCF_MARGIN_THRESHOLDS = (
+        (('전기전자', '전자', '반도체'), (20, 8)),
+        (('바이오', '의약', '제약'), (15, 5)),
+        (('통신',), (20, 8)),
+    )
+    DEFAULT_GROWTH_FCF_MARGIN_THRESHOLD = (10, 3)
+
+    FINANCIAL_KEYWORDS = ('금융', '은행', '보험', '증권')
+    PB_SECTOR_KEYWORDS = ('화학', '철강', '금속', '소재')   # 금융 외 P/B 평가 섹터
+
+    # 섹터별 구간 점수 규칙 (백분율 지표)
+    # (breakdown 접두어, info 키, 임계값 테이블, 기본 임계값, 만점, 코멘트 기준점, 코멘트 형식)
+    GROWTH_GRADIENT_RULES = (
+        ('roe', 'returnOnEquity', 'SECTOR_ROE_THRESHOLDS', 'DEFAULT_ROE_THRESHOLD', 15, 8, "ROE:{:.1f}%"),
+        ('opm', 'operatingMargins', 'SECTOR_OPM_THRESHOLDS', 'DEFAULT_OPM_THRESHOLD', 10, 5, "OPM:{:.1f}%"),
+        ('revenue_growth', 'revenueGrowth', 'SECTOR_REVENUE_GROWTH_THRESHOLDS',
+         'DEFAULT_REVENUE_GROWTH_THRESHOLD', 10, None, None),
+    )
+    VALUE_GRADIENT_RULES = (
+        ('roe', 'returnOnEquity', 'SECTOR_ROE_THRESHOLDS', 'DEFAULT_ROE_THRESHOLD', 8, 4, "ROE:{:.1f}%"),
+    )
+
     # 한국 배당 귀족 (10년+ 연속 배당)
     KR_DIVIDEND_ARISTOCRATS = {
         '105560',  # KB금융
@@ -465,450 +499,324 @@ class TitanKRAnalyzer:
     SCORE_OVERSOLD_QUALITY_BONUS = 10
     SCORE_OVERBOUGHT_PENALTY = -8  # -5→-8 (US v2.0 동기화)
 
+    # 종목 데이터 병렬 수집 스레드 수 (소스별 호출 간격은 KRDataProvider가 제어)
+    PREFETCH_WORKERS = int(os.environ.get('KR_PREFETCH_WORKERS', '8'))
+
+    # 다중 시간대 모드: 종목당 1회 조회 기간 (일봉 점수는 최근 1년, 주/월봉은 전체 구간)
+    HORIZON_PERIOD = '3y'
+    WEEKLY_TREND_LABELS = {'up': '주봉↑확인', 'down': '주봉↓역행'}
+
+    # 점수 캐시와 함께 저장하는 시장 컨텍스트 파일
+    MARKET_CONTEXT_FILE = "titan_kr_market_context.json"
+
 
     def __init__(self, dart_api_key=None):
         self.results = []
         self.analysis_mode = 'growth'
         self.data_provider = KRDataProvider(dart_api_key=dart_api_key)
+        self.indicator_states = IndicatorStateCache()
+        self.indicator_series = shared_indicator_cache()   # ML 피처와 공유하는 지표 시계열
+        self.market_context = None
+        self.multi_horizon = False
+        self.horizon_history = {}      # {code: {'weekly': DataFrame, 'monthly': DataFrame}}
+        # ML 연동 모드: 점수 지표를 ML 학습과 같은 히스토리의 공유 시계열에서 (종목당 1회 계산)
+        self.share_ml_indicators = False
+        self.indicator_history = {}    # {code: SHARED_HISTORY_PERIOD 일봉 DataFrame}
 
     # ================================================================
     # 펀더멘털 점수 (50점 만점)
     # ================================================================
-    def _get_fundamental_score(self, info):
-        score = 0
-        comments = []
-        breakdown = {
-            'roe_score': 0, 'roe_value': None,
-            'opm_score': 0, 'opm_value': None,
-            'revenue_growth_score': 0, 'revenue_growth_value': None,
-            'sector_score': 0, 'sector_name': '',
-            'peg_value': None, 'peg_score': 0,
-            'fcf_margin_value': None, 'fcf_score': 0,
-            # 가치주 전용 필드
-            'dividend_yield_score': 0, 'dividend_yield_value': None,
-            'dividend_growth_score': 0,
-            'per_score': 0, 'per_value': None,
-            'valuation_method': 'PER',
-            'ev_ebitda_value': None,
-            'debt_equity_score': 0, 'debt_equity_value': None,
-            'fcf_yield_value': None,
-            'beta_value': None, 'beta_score': 0,
-        }
-
-        try:
-            sector = info.get('sector', '') or ''
-            industry = info.get('industry', '') or ''
-
-            # ===== 가치주 모드: 배당/저평가/안정성 중심 (50점) =====
-            if self.analysis_mode == 'value':
-                market_cap = info.get('marketCap', 0)
-                stock_code = info.get('_code', '')
-                is_aristocrat = stock_code in self.KR_DIVIDEND_ARISTOCRATS
-
-                # [우량주 프리미엄 산정]
-                premium_multiplier = 1.0
-                roe_pre = info.get('returnOnEquity')
-                if market_cap and market_cap >= 50_000_000_000_000:  # 50조원
-                    premium_multiplier += 0.2
-                if roe_pre and roe_pre >= 0.15:
-                    premium_multiplier += 0.2
-                if is_aristocrat:
-                    premium_multiplier += 0.1
-                premium_multiplier = min(premium_multiplier, 1.6)
-
-                # 1. 배당수익률 (10점, 12→10: 배당성장률 5점 신설로 재배분)
-                div_pct = None
-                div_rate = info.get('dividendRate')
-                price_now = info.get('currentPrice') or info.get('regularMarketPrice') or info.get('previousClose')
-                if div_rate and div_rate > 0 and price_now and price_now > 0:
-                    div_pct = div_rate / price_now * 100
-                else:
-                    div_yield = info.get('dividendYield') or info.get('trailingAnnualDividendYield')
-                    if div_yield and div_yield > 0:
-                        div_pct = div_yield if div_yield <= 15 else div_yield / 100
-
-                if div_pct and div_pct > 0:
-                    breakdown['dividend_yield_value'] = round(div_pct, 2)
-                    dy_exc, dy_good = self._get_sector_threshold(
-                        sector, self.VALUE_DIVIDEND_THRESHOLDS, self.DEFAULT_VALUE_DIVIDEND_THRESHOLD)
-                    dy_pts = self._calc_gradient_score(div_pct, dy_exc, dy_good, 10)
-
-                    # 배당귀족/메가캡 최소 보장
-                    if dy_pts < 4 and (is_aristocrat or (market_cap and market_cap >= 50_000_000_000_000)):
-                        dy_pts = 4
-
-                    # 배당성향 경고
-                    payout = info.get('payoutRatio')
-                    if payout and payout > 1.0:
-                        dy_pts = int(dy_pts * 0.7)
-                        comments.append(f"배당성향{payout*100:.0f}%⚠️")
-
-                    score += dy_pts
-                    breakdown['dividend_yield_score'] = dy_pts
-                    if dy_pts >= 5:
-                        comments.append(f"배당{div_pct:.1f}%")
-
-                # 1.5. 배당 성장률 (5점, 신규)
-                div_growth_pts = 0
-                five_yr_avg_yield = info.get('fiveYearAvgDividendYield')
-                earnings_growth = info.get('earningsGrowth')
-                payout_for_growth = info.get('payoutRatio')
-
-                if is_aristocrat:
-                    div_growth_pts = 5
-                elif div_pct and div_pct > 0:
-                    if five_yr_avg_yield and five_yr_avg_yield > 0:
-                        div_growth_pts += 2
-                    if payout_for_growth and 0 < payout_for_growth < 0.7:
-                        div_growth_pts += 1
-                    if earnings_growth and earnings_growth > 0.05:
-                        div_growth_pts += 1
-                    if earnings_growth and earnings_growth > 0.10 and payout_for_growth and 0 < payout_for_growth < 0.6:
-                        div_growth_pts += 1
-
-                div_growth_pts = min(div_growth_pts, 5)
-                score += div_growth_pts
-                breakdown['dividend_growth_score'] = div_growth_pts
-                if div_growth_pts >= 3:
-                    comments.append(f"배당성장력{div_growth_pts}점")
-
-                # 2. 밸류에이션 (12점): PER vs EV/EBITDA vs P/B 중 높은 쪽 채택
-                per = info.get('trailingPE')
-                ev_ebitda = info.get('enterpriseToEbitda')
-
-                per_pts = 0
-                if per and per > 0:
-                    breakdown['per_value'] = per
-                    per_good, per_fair = self._get_sector_threshold(
-                        sector, self.VALUE_PER_THRESHOLDS, self.DEFAULT_VALUE_PER_THRESHOLD)
-                    per_good *= premium_multiplier
-                    per_fair *= premium_multiplier
-                    per_pts = self._calc_inverse_gradient_score(per, per_good, per_fair, 12)
-
-                ev_pts = 0
-                is_financial = any(kw in (sector or '') for kw in ['금융', '은행', '보험', '증권'])
-                if ev_ebitda and ev_ebitda > 0 and not is_financial:
-                    breakdown['ev_ebitda_value'] = ev_ebitda
-                    ev_good, ev_fair = self._get_sector_threshold(
-                        sector, self.VALUE_EVEBITDA_THRESHOLDS, self.DEFAULT_VALUE_EVEBITDA_THRESHOLD)
-                    ev_good *= premium_multiplier
-                    ev_fair *= premium_multiplier
-                    ev_pts = self._calc_inverse_gradient_score(ev_ebitda, ev_good, ev_fair, 12)
-
-                pb_pts = 0
-                if is_financial or any(kw in (sector or '') for kw in ['화학', '철강', '금속', '소재']):
-                    pb = info.get('priceToBook')
-                    if pb and pb > 0:
-                        pb_good, pb_fair = self.VALUE_PB_THRESHOLDS.get(
-                            sector, self.VALUE_PB_THRESHOLDS.get('default', (2.5, 4.5)))
-                        # 섹터 부분 매칭
-                        for key, val in self.VALUE_PB_THRESHOLDS.items():
-                            if key != 'default' and (key in (sector or '') or (sector or '') in key):
-                                pb_good, pb_fair = val
-                                break
-                        pb_good *= premium_multiplier
-                        pb_fair *= premium_multiplier
-                        pb_pts = self._calc_inverse_gradient_score(pb, pb_good, pb_fair, 12)
-
-                val_pts = max(per_pts, ev_pts, pb_pts)
-                if val_pts == pb_pts and pb_pts > 0:
-                    breakdown['valuation_method'] = 'P/B'
-                elif val_pts == ev_pts and ev_pts > 0:
-                    breakdown['valuation_method'] = 'EV/EBITDA'
-                else:
-                    breakdown['valuation_method'] = 'PER'
-
-                score += val_pts
-                breakdown['per_score'] = val_pts
-                if val_pts >= 6:
-                    if ev_pts > per_pts and ev_ebitda:
-                        comments.append(f"EV/EBITDA:{ev_ebitda:.1f}x")
-                    elif per and per > 0:
-                        comments.append(f"PER:{per:.1f}")
-
-                # 3. ROE (8점, 가치주는 비중 축소)
-                roe = info.get('returnOnEquity')
-                roe_excellent, roe_good = self._get_sector_threshold(
-                    sector, self.SECTOR_ROE_THRESHOLDS, self.DEFAULT_ROE_THRESHOLD)
-                if roe is not None:
-                    roe_pct = roe * 100
-                    breakdown['roe_value'] = roe_pct
-                    roe_score = self._calc_gradient_score(roe_pct, roe_excellent, roe_good, 8)
-                    score += roe_score
-                    breakdown['roe_score'] = roe_score
-                    if roe_score >= 4:
-                        comments.append(f"ROE:{roe_pct:.1f}%")
-
-                # 4. 부채비율 D/E (8점, 역방향)
-                de = info.get('debtToEquity')
-                if de is not None and de >= 0:
-                    breakdown['debt_equity_value'] = de
-                    de_good, de_fair = self._get_sector_threshold(
-                        sector, self.VALUE_DE_THRESHOLDS, self.DEFAULT_VALUE_DE_THRESHOLD)
-                    de_good = int(de_good * premium_multiplier)
-                    de_fair = int(de_fair * premium_multiplier)
-                    de_pts = self._calc_inverse_gradient_score(de, de_good, de_fair, 8)
-                    score += de_pts
-                    breakdown['debt_equity_score'] = de_pts
-                    if de_pts >= 4:
-                        comments.append(f"D/E:{de:.0f}")
-                elif is_financial:
-                    de_pts = round(8 * 0.5)
-                    score += de_pts
-                    breakdown['debt_equity_score'] = de_pts
-
-                # FCF Yield (5점, 배당 지속가능성 검증)
-                fcf = info.get('freeCashflow')
-                if fcf and market_cap and market_cap > 0:
-                    fcf_yield = fcf / market_cap
-                    breakdown['fcf_yield_value'] = round(fcf_yield * 100, 1)
-                    if fcf_yield > 0.08:
-                        fcf_pts = 5
-                        comments.append("현금흐름최상위")
-                    elif fcf_yield > 0.05:
-                        fcf_pts = 4
-                        comments.append("현금흐름우수")
-                    elif fcf_yield > 0.03:
-                        fcf_pts = 2
-                    else:
-                        fcf_pts = 0
-                    score += fcf_pts
-                    breakdown['fcf_score'] = fcf_pts
-
-                # Beta (5점)
-                beta = info.get('beta')
-                if beta is not None:
-                    breakdown['beta_value'] = beta
-                    if beta <= 0.8:
-                        beta_pts = 5
-                        comments.append(f"LowBeta({beta:.2f})")
-                    elif beta <= 1.0:
-                        beta_pts = 4
-                    elif beta <= 1.2:
-                        beta_pts = 2
-                    else:
-                        beta_pts = 0
-                    score += beta_pts
-                    breakdown['beta_score'] = beta_pts
-
-                # 5. 섹터 (10점)
-                breakdown['sector_name'] = sector or industry or '기타'
-                sector_score, sector_name, sector_comment = self._get_value_sector_score(sector, industry)
-                score += sector_score
-                breakdown['sector_score'] = sector_score
-                breakdown['sector_name'] = sector_name
-                if sector_comment:
-                    comments.append(sector_comment)
-
-                # 배당 귀족 보너스 (+4점)
-                if is_aristocrat:
-                    score += 4
-                    breakdown['aristocrat_bonus'] = 4
-                    comments.append("배당귀족")
-
-                # 한국 정책 보너스
-                policy_bonus, policy_comment = self._get_kr_policy_bonus(
-                    sector, industry, info.get('shortName', ''))
-                if policy_bonus != 0:
-                    score += policy_bonus
-                    breakdown['policy_bonus'] = policy_bonus
-                    comments.append(policy_comment)
-
-            # ===== 성장주 모드: ROE/OPM/FCF/매출성장 중심 (50점) =====
-            else:
-                market_cap = info.get('marketCap', 0)
-
-                # 1. ROE (섹터별 차등, 15점)
-                roe = info.get('returnOnEquity')
-                roe_excellent, roe_good = self._get_sector_threshold(
-                    sector, self.SECTOR_ROE_THRESHOLDS, self.DEFAULT_ROE_THRESHOLD)
-                if roe is not None:
-                    roe_pct = roe * 100
-                    breakdown['roe_value'] = roe_pct
-                    roe_score = self._calc_gradient_score(roe_pct, roe_excellent, roe_good, 15)
-                    score += roe_score
-                    breakdown['roe_score'] = roe_score
-                    if roe_score >= 8:
-                        comments.append(f"ROE:{roe_pct:.1f}%")
-
-                # 2. OPM (섹터별 차등, 10점 — 15→10 축소, ROE와 중복 줄임)
-                opm = info.get('operatingMargins')
-                opm_excellent, opm_good = self._get_sector_threshold(
-                    sector, self.SECTOR_OPM_THRESHOLDS, self.DEFAULT_OPM_THRESHOLD)
-                if opm is not None:
-                    opm_pct = opm * 100
-                    breakdown['opm_value'] = opm_pct
-                    opm_score = self._calc_gradient_score(opm_pct, opm_excellent, opm_good, 10)
-                    score += opm_score
-                    breakdown['opm_score'] = opm_score
-                    if opm_score >= 5:
-                        comments.append(f"OPM:{opm_pct:.1f}%")
-
-                # 2.5. FCF Margin (10점, 신규: 현금창출력)
-                fcf = info.get('freeCashflow')
-                total_revenue = info.get('totalRevenue')
-                if fcf and total_revenue and total_revenue > 0:
-                    fcf_margin = fcf / total_revenue * 100
-                    breakdown['fcf_margin_value'] = round(fcf_margin, 1)
-                    # 한국 섹터별 FCF 기준
-                    if any(kw in (sector or '') for kw in ['전기전자', '전자', '반도체']):
-                        fcf_excellent, fcf_good = 20, 8
-                    elif any(kw in (sector or '') for kw in ['바이오', '의약', '제약']):
-                        fcf_excellent, fcf_good = 15, 5
-                    elif any(kw in (sector or '') for kw in ['통신']):
-                        fcf_excellent, fcf_good = 20, 8
-                    else:
-                        fcf_excellent, fcf_good = 10, 3
-                    fcf_pts = self._calc_gradient_score(fcf_margin, fcf_excellent, fcf_good, 10)
-                    score += fcf_pts
-                    breakdown['fcf_score'] = fcf_pts
-                    if fcf_pts >= 5:
-                        comments.append(f"FCF:{fcf_margin:.0f}%")
-                elif fcf and market_cap and market_cap > 0:
-                    # FCF Yield 폴백 (매출 데이터 없을 때)
-                    fcf_yield = fcf / market_cap * 100
-                    breakdown['fcf_margin_value'] = None
-                    breakdown['fcf_yield_value'] = round(fcf_yield, 1)
-                    if fcf_yield > 5:
-                        fcf_pts = 7
-                    elif fcf_yield > 3:
-                        fcf_pts = 4
-                    elif fcf_yield > 1:
-                        fcf_pts = 2
-                    else:
-                        fcf_pts = 0
-                    score += fcf_pts
-                    breakdown['fcf_score'] = fcf_pts
-
-                # 3. 매출성장률 (10점)
-                revenue_growth = info.get('revenueGrowth')
-                rg_high, rg_good = self._get_sector_threshold(
-                    sector, self.SECTOR_REVENUE_GROWTH_THRESHOLDS, self.DEFAULT_REVENUE_GROWTH_THRESHOLD)
-                if revenue_growth is not None:
-                    rg_pct = revenue_growth * 100
-                    breakdown['revenue_growth_value'] = rg_pct
-                    rg_score = self._calc_gradient_score(rg_pct, rg_high, rg_good, 10)
-                    score += rg_score
-                    breakdown['revenue_growth_score'] = rg_score
-
-                # PEG Ratio (GARP 전략, 5점 보너스)
-                peg = info.get('pegRatio')
-                if peg and peg > 0:
-                    breakdown['peg_value'] = peg
-                    if peg < 1.0:
-                        score += 5
-                        breakdown['peg_score'] = 5
-                        comments.append(f"PEG저평가({peg:.2f})")
-                    elif peg < 1.5:
-                        score += 3
-                        breakdown['peg_score'] = 3
-
-                # 3-1. 고성장 투자기업 보정
-                if revenue_growth is not None and revenue_growth > 0.30:
-                    roe_val = roe * 100 if roe else 0
-                    opm_val = opm * 100 if opm else 0
-                    if roe_val < 0 and breakdown['roe_score'] == 0:
-                        bonus = round(15 * 0.4)
-                        score += bonus
-                        breakdown['roe_score'] = bonus
-                        comments.append("성장투자")
-                    if opm_val < 0 and breakdown['opm_score'] == 0:
-                        bonus = round(10 * 0.4)
-                        score += bonus
-                        breakdown['opm_score'] = bonus
-
-                # 4. 섹터 (라벨링만, 점수 0 — 순환매 보너스가 동적으로 대체)
-                breakdown['sector_name'] = sector or industry or '기타'
-                sector_score, sector_name, sector_comment = self._get_growth_sector_score(sector, industry, info.get('shortName', ''))
-                breakdown['sector_score'] = 0  # 고정 섹터 점수 제거
-                breakdown['sector_name'] = sector_name
-                # sector_comment는 라벨링용으로 유지
-
-                # 한국 정책 보너스
-                policy_bonus, policy_comment = self._get_kr_policy_bonus(
-                    sector, industry, info.get('shortName', ''))
-                if policy_bonus != 0:
-                    score += policy_bonus
-                    breakdown['policy_bonus'] = policy_bonus
-                    comments.append(policy_comment)
+    FUNDAMENTAL_BREAKDOWN = {
+        'roe_score': 0, 'roe_value': None,
+        'opm_score': 0, 'opm_value': None,
+        'revenue_growth_score': 0, 'revenue_growth_value': None,
+        'sector_score': 0, 'sector_name': '',
+        'peg_value': None, 'peg_score': 0,
+        'fcf_margin_value': None, 'fcf_score': 0,
+        # 가치주 전용 필드
+        'dividend_yield_score': 0, 'dividend_yield_value': None,
+        'dividend_growth_score': 0,
+        'per_score': 0, 'per_value': None,
+        'valuation_method': 'PER',
+        'ev_ebitda_value': None,
+        'debt_equity_score': 0, 'debt_equity_value': None,
+        'fcf_yield_value': None,
+        'beta_value': None, 'beta_score': 0,
+    }
 
-        except Exception:
-            pass
+    def _get_fundamental_score(self, info):
+        return self._get_fundamental_scores([info])[0]
 
-        return score, comments, breakdown
+    def _get_fundamental_scores(self, infos):
+        """전 종목 펀더멘털 점수 일괄 계산 → [(score, comments, breakdown), ...]
 
-    @staticmethod
-    def _calc_gradient_score(value, excellent, good, max_pts):
-        """선형 보간 점수 계산
-        - value > excellent*1.3: max_pts (만점)
-        - excellent ~ excellent*1.3: 80%~100% 보간
-        - good ~ excellent: 40%~80% 보간
-        - good*0.5 ~ good: 5%~40% 보간
-        - < good*0.5: 0점
+        섹터 임계값은 고유 섹터당 1회 해석, 구간 점수는 종목 배열 단위 계산
+        (일괄 계산 실패 시 종목별 계산으로 재시도, 개별 실패 종목은 0점)
         """
-        if value is None or value <= 0:
-            return 0
-        if excellent == 0 and good == 0:
-            return 0
-
-        fair = good * 0.5
-        top = excellent * 1.3
-
-        if value >= top:
-            return max_pts
-        elif value >= excellent:
-            ratio = (value - excellent) / (top - excellent) if top > excellent else 1
-            pts = max_pts * (0.8 + 0.2 * ratio)
-        elif value >= good:
-            ratio = (value - good) / (excellent - good) if excellent > good else 1
-            pts = max_pts * (0.4 + 0.4 * ratio)
-        elif value >= fair:
-            ratio = (value - fair) / (good - fair) if good > fair else 1
-            pts = max_pts * (0.05 + 0.35 * ratio)
+        if not infos:
+            return []
+        try:
+            return self._score_fundamentals(infos)
+        except Exception:
+            if len(infos) == 1:
+                return [(0, [], dict(self.FUNDAMENTAL_BREAKDOWN))]
+            return [self._get_fundamental_scores([info])[0] for info in infos]
+
+    def _score_fundamentals(self, infos):
+        cols = InfoColumns(infos)
+        sheet = ScoreSheet(len(infos), self.FUNDAMENTAL_BREAKDOWN)
+        sectors = cols.strings('sector')
+        industries = cols.strings('industry')
+        names = cols.strings('shortName')
+
+        if self.analysis_mode == 'value':
+            self._score_value_fundamentals(sheet, cols, sectors, industries, names)
         else:
-            return 0
-
-        return round(pts)
-
-    @staticmethod
-    def _calc_inverse_gradient_score(value, good_upper, fair_upper, max_pts):
-        """역방향 선형 보간 (낮을수록 좋은 지표: PER, 부채비율)
-
-        구간별 점수:
-        - value <= good_upper * 0.6: max_pts (만점)
-        - good_upper*0.6 ~ good_upper: 80%~100%
-        - good_upper ~ fair_upper: 40%~80%
-        - fair_upper ~ fair_upper*1.5: 5%~40%
-        - > fair_upper*1.5: 0
-        """
-        if value is None or value <= 0:
-            return 0
-
-        excellent = good_upper * 0.6
-        poor = fair_upper * 1.5
-
-        if value <= excellent:
-            return max_pts
-        elif value <= good_upper:
-            ratio = (good_upper - value) / (good_upper - excellent) if good_upper > excellent else 1
-            return round(max_pts * (0.8 + 0.2 * ratio))
-        elif value <= fair_upper:
-            ratio = (fair_upper - value) / (fair_upper - good_upper) if fair_upper > good_upper else 1
-            return round(max_pts * (0.4 + 0.4 * ratio))
-        elif value <= poor:
-            ratio = (poor - value) / (poor - fair_upper) if poor > fair_upper else 1
-            return round(max_pts * (0.05 + 0.35 * ratio))
+            self._score_growth_fundamentals(sheet, cols, sectors, industries, names)
+
+        # 한국 정책 보너스
+        policy = resolve_by_sector(list(zip(sectors, industries, names)),
+                                   lambda key: self._get_kr_policy_bonus(*key))
+        policy_bonus = np.array([bonus for bonus, _ in policy], dtype=int)
+        has_policy = policy_bonus != 0
+        sheet.add(policy_bonus, has_policy)
+        sheet.set('policy_bonus', has_policy, policy_bonus)
+        sheet.comment(has_policy, lambda i: policy[i][1])
+        return sheet.rows()
+
+    def _apply_gradient_rules(self, sheet, cols, sectors, rules):
+        """섹터별 임계값 구간 점수 (백분율 지표, 값 있는 종목만)"""
+        for prefix, key, table, default, max_pts, comment_at, comment_format in rules:
+            present = cols.present(key)
+            pct = cols.values(key) * 100
+            excellent, good = sector_thresholds(sectors, getattr(self, table), getattr(self, default))
+            pts = gradient_score(pct, excellent, good, max_pts)
+            sheet.set(f'{prefix}_value', present, pct)
+            sheet.set(f'{prefix}_score', present, pts)
+            sheet.add(pts, present)
+            if comment_format:
+                sheet.comment(present & (pts >= comment_at), lambda i: comment_format.format(pct[i]))
+
+    def _sector_labels(self, sheet, sectors, industries, names=None):
+        """섹터 라벨/점수 (가치주: 점수 반영, 성장주: 라벨링만)"""
+        if names is None:
+            labels = resolve_by_sector(list(zip(sectors, industries)),
+                                       lambda key: self._get_value_sector_score(*key))
         else:
-            return 0
-
-    def _get_sector_threshold(self, sector, threshold_dict, default):
-        """섹터명으로 임계값 찾기 (부분 매칭)"""
-        if not sector:
-            return default
-        for key, val in threshold_dict.items():
-            if key in sector or sector in key:
+            labels = resolve_by_sector(list(zip(sectors, industries, names)),
+                                       lambda key: self._get_growth_sector_score(*key))
+        everyone = np.ones(len(labels), dtype=bool)
+        sheet.set('sector_name', everyone, lambda i: labels[i][1])
+        return labels, everyone
+
+    # ===== 가치주 모드: 배당/저평가/안정성 중심 (50점) =====
+    def _score_value_fundamentals(self, sheet, cols, sectors, industries, names):
+        market_cap = cols.values('marketCap', 0)
+        mega_cap = cols.truthy('marketCap', 0) & (market_cap >= 50_000_000_000_000)  # 50조원
+        is_aristocrat = np.array([info.get('_code', '') in self.KR_DIVIDEND_ARISTOCRATS
+                                  for info in cols.infos], dtype=bool)
+        is_financial = np.array(resolve_by_sector(
+            sectors, lambda s: any(kw in s for kw in self.FINANCIAL_KEYWORDS)), dtype=bool)
+
+        # [우량주 프리미엄 산정]
+        roe = cols.values('returnOnEquity')
+        premium = 1.0 + np.where(mega_cap, 0.2, 0)
+        premium = premium + np.where(cols.truthy('returnOnEquity') & (roe >= 0.15), 0.2, 0)
+        premium = premium + np.where(is_aristocrat, 0.1, 0)
+        premium = np.minimum(premium, 1.6)
+
+        # 1. 배당수익률 (10점, 12→10: 배당성장률 5점 신설로 재배분)
+        div_rate = cols.values('dividendRate')
+        price_now, has_price = cols.first_truthy('currentPrice', 'regularMarketPrice', 'previousClose')
+        div_yield, has_yield = cols.first_truthy('dividendYield', 'trailingAnnualDividendYield')
+        from_rate = cols.truthy('dividendRate') & (div_rate > 0) & has_price & (price_now > 0)
+        from_yield = ~from_rate & has_yield & (div_yield > 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            div_pct = np.select([from_rate, from_yield],
+                                [div_rate / price_now * 100,
+                                 np.where(div_yield <= 15, div_yield, div_yield / 100)], np.nan)
+        has_div = from_rate | from_yield
+
+        dy_exc, dy_good = sector_thresholds(
+            sectors, self.VALUE_DIVIDEND_THRESHOLDS, self.DEFAULT_VALUE_DIVIDEND_THRESHOLD)
+        dy_pts = gradient_score(div_pct, dy_exc, dy_good, 10)
+        # 배당귀족/메가캡 최소 보장
+        dy_pts = np.where((dy_pts < 4) & (is_aristocrat | mega_cap), 4, dy_pts)
+        # 배당성향 경고
+        payout = cols.values('payoutRatio')
+        has_payout = cols.truthy('payoutRatio')
+        high_payout = has_div & has_payout & (payout > 1.0)
+        dy_pts = np.where(high_payout, np.trunc(dy_pts * 0.7), dy_pts).astype(int)
+
+        sheet.set('dividend_yield_value', has_div, lambda i: round(float(div_pct[i]), 2))
+        sheet.comment(high_payout, lambda i: f"배당성향{payout[i]*100:.0f}%⚠️")
+        sheet.add(dy_pts, has_div)
+        sheet.set('dividend_yield_score', has_div, dy_pts)
+        sheet.comment(has_div & (dy_pts >= 5), lambda i: f"배당{div_pct[i]:.1f}%")
+
+        # 1.5. 배당 성장률 (5점)
+        five_yr_avg_yield = cols.values('fiveYearAvgDividendYield')
+        earnings_growth = cols.values('earningsGrowth')
+        has_earnings_growth = cols.truthy('earningsGrowth')
+        growth_pts = (np.where(cols.truthy('fiveYearAvgDividendYield') & (five_yr_avg_yield > 0), 2, 0)
+                      + np.where(has_payout & (payout > 0) & (payout < 0.7), 1, 0)
+                      + np.where(has_earnings_growth & (earnings_growth > 0.05), 1, 0)
+                      + np.where(has_earnings_growth & (earnings_growth > 0.10)
+                                 & has_payout & (payout > 0) & (payout < 0.6), 1, 0))
+        div_growth_pts = np.minimum(np.select([is_aristocrat, has_div], [5, growth_pts], 0), 5)
+        sheet.add(div_growth_pts)
+        sheet.set('dividend_growth_score', np.ones(len(cols), dtype=bool), div_growth_pts)
+        sheet.comment(div_growth_pts >= 3, lambda i: f"배당성장력{div_growth_pts[i]}점")
+
+        # 2. 밸류에이션 (12점): PER vs EV/EBITDA vs P/B 중 높은 쪽 채택
+        per = cols.values('trailingPE')
+        has_per = cols.truthy('trailingPE') & (per > 0)
+        per_good, per_fair = sector_thresholds(
+            sectors, self.VALUE_PER_THRESHOLDS, self.DEFAULT_VALUE_PER_THRESHOLD)
+        per_pts = np.where(has_per, inverse_gradient_score(per, per_good * premium, per_fair * premium, 12), 0)
+
+        ev_ebitda = cols.values('enterpriseToEbitda')
+        has_ev = cols.truthy('enterpriseToEbitda') & (ev_ebitda > 0) & ~is_financial
+        ev_good, ev_fair = sector_thresholds(
+            sectors, self.VALUE_EVEBITDA_THRESHOLDS, self.DEFAULT_VALUE_EVEBITDA_THRESHOLD)
+        ev_pts = np.where(has_ev, inverse_gradient_score(ev_ebitda, ev_good * premium, ev_fair * premium, 12), 0)
+
+        pb = cols.values('priceToBook')
+        pb_sector = is_financial | np.array(resolve_by_sector(
+            sectors, lambda s: any(kw in s for kw in self.PB_SECTOR_KEYWORDS)), dtype=bool)
+        has_pb = pb_sector & cols.truthy('priceToBook') & (pb > 0)
+        pb_good, pb_fair = np.array(resolve_by_sector(sectors, self._pb_threshold), dtype=float).reshape(-1, 2).T
+        pb_pts = np.where(has_pb, inverse_gradient_score(pb, pb_good * premium, pb_fair * premium, 12), 0)
+
+        val_pts = np.maximum.reduce([per_pts, ev_pts, pb_pts])
+        method = np.select([(val_pts == pb_pts) & (pb_pts > 0), (val_pts == ev_pts) & (ev_pts > 0)],
+                           ['P/B', 'EV/EBITDA'], 'PER')
+        sheet.set('per_value', has_per, lambda i: cols.raw('trailingPE', i))
+        sheet.set('ev_ebitda_value', has_ev, lambda i: cols.raw('enterpriseToEbitda', i))
+        sheet.set('valuation_method', np.ones(len(cols), dtype=bool), lambda i: str(method[i]))
+        sheet.add(val_pts)
+        sheet.set('per_score', np.ones(len(cols), dtype=bool), val_pts)
+        ev_comment = (ev_pts > per_pts) & cols.truthy('enterpriseToEbitda')
+        sheet.comment((val_pts >= 6) & (ev_comment | has_per),
+                      lambda i: f"EV/EBITDA:{ev_ebitda[i]:.1f}x" if ev_comment[i] else f"PER:{per[i]:.1f}")
+
+        # 3. ROE (8점, 가치주는 비중 축소)
+        self._apply_gradient_rules(sheet, cols, sectors, self.VALUE_GRADIENT_RULES)
+
+        # 4. 부채비율 D/E (8점, 역방향)
+        de = cols.values('debtToEquity')
+        has_de = cols.present('debtToEquity') & (de >= 0)
+        de_good, de_fair = sector_thresholds(sectors, self.VALUE_DE_THRESHOLDS, self.DEFAULT_VALUE_DE_THRESHOLD)
+        de_pts = inverse_gradient_score(de, np.trunc(de_good * premium), np.trunc(de_fair * premium), 8)
+        sheet.set('debt_equity_value', has_de, lambda i: cols.raw('debtToEquity', i))
+        sheet.add(de_pts, has_de)
+        sheet.set('debt_equity_score', has_de, de_pts)
+        sheet.comment(has_de & (de_pts >= 4), lambda i: f"D/E:{de[i]:.0f}")
+        financial_de = ~has_de & is_financial
+        sheet.add(round(8 * 0.5), financial_de)
+        sheet.set('debt_equity_score', financial_de, lambda i: round(8 * 0.5))
+
+        # FCF Yield (5점, 배당 지속가능성 검증)
+        fcf = cols.values('freeCashflow')
+        has_fcf = cols.truthy('freeCashflow') & cols.truthy('marketCap', 0) & (market_cap > 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fcf_yield = fcf / market_cap
+        fcf_pts = np.select([fcf_yield > 0.08, fcf_yield > 0.05, fcf_yield > 0.03], [5, 4, 2], 0)
+        sheet.set('fcf_yield_value', has_fcf, lambda i: round(float(fcf_yield[i] * 100), 1))
+        sheet.comment(has_fcf & (fcf_pts == 5), "현금흐름최상위")
+        sheet.comment(has_fcf & (fcf_pts == 4), "현금흐름우수")
+        sheet.add(fcf_pts, has_fcf)
+        sheet.set('fcf_score', has_fcf, fcf_pts)
+
+        # Beta (5점)
+        beta = cols.values('beta')
+        has_beta = cols.present('beta')
+        beta_pts = np.select([beta <= 0.8, beta <= 1.0, beta <= 1.2], [5, 4, 2], 0)
+        sheet.set('beta_value', has_beta, lambda i: cols.raw('beta', i))
+        sheet.comment(has_beta & (beta_pts == 5), lambda i: f"LowBeta({beta[i]:.2f})")
+        sheet.add(beta_pts, has_beta)
+        sheet.set('beta_score', has_beta, beta_pts)
+
+        # 5. 섹터 (10점)
+        labels, everyone = self._sector_labels(sheet, sectors, industries)
+        sector_pts = np.array([pts for pts, _, _ in labels], dtype=int)
+        sheet.add(sector_pts)
+        sheet.set('sector_score', everyone, sector_pts)
+        sheet.comment(np.array([bool(comment) for _, _, comment in labels], dtype=bool),
+                      lambda i: labels[i][2])
+
+        # 배당 귀족 보너스 (+4점)
+        sheet.add(4, is_aristocrat)
+        sheet.set('aristocrat_bonus', is_aristocrat, lambda i: 4)
+        sheet.comment(is_aristocrat, "배당귀족")
+
+    # ===== 성장주 모드: ROE/OPM/FCF/매출성장 중심 (50점) =====
+    def _score_growth_fundamentals(self, sheet, cols, sectors, industries, names):
+        market_cap = cols.values('marketCap', 0)
+
+        # 1. ROE (섹터별 차등, 15점) / 2. OPM (10점) / 3. 매출성장률 (10점)
+        self._apply_gradient_rules(sheet, cols, sectors, self.GROWTH_GRADIENT_RULES)
+
+        # 2.5. FCF Margin (10점, 현금창출력) — 매출 없으면 FCF Yield 폴백
+        fcf = cols.values('freeCashflow')
+        total_revenue = cols.values('totalRevenue')
+        has_fcf = cols.truthy('freeCashflow')
+        has_margin = has_fcf & cols.truthy('totalRevenue') & (total_revenue > 0)
+        has_yield = ~has_margin & has_fcf & cols.truthy('marketCap', 0) & (market_cap > 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fcf_margin = fcf / total_revenue * 100
+            fcf_yield = fcf / market_cap * 100
+        fcf_excellent, fcf_good = np.array(resolve_by_sector(sectors, self._fcf_margin_threshold),
+                                           dtype=float).reshape(-1, 2).T
+        margin_pts = gradient_score(fcf_margin, fcf_excellent, fcf_good, 10)
+        yield_pts = np.select([fcf_yield > 5, fcf_yield > 3, fcf_yield > 1], [7, 4, 2], 0)
+        fcf_pts = np.where(has_margin, margin_pts, yield_pts)
+
+        sheet.set('fcf_margin_value', has_margin, lambda i: round(float(fcf_margin[i]), 1))
+        sheet.set('fcf_yield_value', has_yield, lambda i: round(float(fcf_yield[i]), 1))
+        sheet.add(fcf_pts, has_margin | has_yield)
+        sheet.set('fcf_score', has_margin | has_yield, fcf_pts)
+        sheet.comment(has_margin & (margin_pts >= 5), lambda i: f"FCF:{fcf_margin[i]:.0f}%")
+
+        # PEG Ratio (GARP 전략, 5점 보너스)
+        peg = cols.values('pegRatio')
+        has_peg = cols.truthy('pegRatio') & (peg > 0)
+        peg_pts = np.select([peg < 1.0, peg < 1.5], [5, 3], 0)
+        sheet.set('peg_value', has_peg, lambda i: cols.raw('pegRatio', i))
+        sheet.add(peg_pts, has_peg)
+        sheet.set('peg_score', has_peg & (peg_pts > 0), peg_pts)
+        sheet.comment(has_peg & (peg_pts == 5), lambda i: f"PEG저평가({peg[i]:.2f})")
+
+        # 3-1. 고성장 투자기업 보정 (적자 ROE/OPM 0점 → 40% 부여)
+        high_growth = cols.present('revenueGrowth') & (cols.values('revenueGrowth') > 0.30)
+        for prefix, key, max_pts, comment in (('roe', 'returnOnEquity', 15, "성장투자"),
+                                              ('opm', 'operatingMargins', 10, None)):
+            value = np.where(cols.truthy(key), cols.values(key) * 100, 0)
+            zero_score = np.array([b[f'{prefix}_score'] == 0 for b in sheet.breakdowns], dtype=bool)
+            boost = high_growth & (value < 0) & zero_score
+            bonus = round(max_pts * 0.4)
+            sheet.add(bonus, boost)
+            sheet.set(f'{prefix}_score', boost, lambda i: bonus)
+            if comment:
+                sheet.comment(boost, comment)
+
+        # 4. 섹터 (라벨링만, 점수 0 — 순환매 보너스가 동적으로 대체)
+        self._sector_labels(sheet, sectors, industries, names)
+
+    def _pb_threshold(self, sector):
+        """P/B 임계값 (정확 일치 → 부분 매칭 → default)"""
+        pb_good, pb_fair = self.VALUE_PB_THRESHOLDS.get(
+            sector, self.VALUE_PB_THRESHOLDS.get('default', (2.5, 4.5)))
+        for key, val in self.VALUE_PB_THRESHOLDS.items():
+            if key != 'default' and (key in sector or sector in key):
                 return val
-        return default
+        return pb_good, pb_fair
+
+    def _fcf_margin_threshold(self, sector):
+        for keywords, threshold in self.GROWTH_FCF_MARGIN_THRESHOLDS:
+            if any(kw in sector for kw in keywords):
+                return threshold
+        return self.DEFAULT_GROWTH_FCF_MARGIN_THRESHOLD
 
     # ================================================================
     # 성장주 섹터 점수
@@ -1065,13 +973,15 @@ class TitanKRAnalyzer:
     # ================================================================
     # 기술적 분석 (50점, US와 동일 알고리즘)
     # ================================================================
-    def _get_technical_score(self, hist, current_price, kospi_hist=None):
-        """기술적 분석 (최대 ~53점) — US v2.0 동기화"""
-        from ta.trend import MACD, ADXIndicator
-        from ta.momentum import RSIIndicator, StochasticOscillator
-        from ta.volatility import BollingerBands, AverageTrueRange
-        from ta.volume import OnBalanceVolumeIndicator, MFIIndicator
-
+    def _get_technical_score(self, hist, current_price, market=None, indicators=None, benchmarks=None):
+        """기술적 분석 (최대 ~53점) — US v2.0 동기화
+
+        지표는 kr_indicators 엔진으로 1회 계산 (ta 계산식과 동일)
+        market: MarketContext (지수별 기간 수익률 공유, RS 계산용)
+        benchmarks: (소속 시장 지수 코드, 업종 지수 코드) — 없으면 KOSPI 기준
+        indicators: 패널 일괄 계산 결과 (panel_column), 증분 상태 값 (IndicatorStateCache)
+                    또는 ML 공유 시계열 (_scoring_indicators), 있으면 재계산 생략 — 마지막 값만 사용
+        """
         score = 0
         comments = []
         breakdown = {
@@ -1085,7 +995,7 @@ class TitanKRAnalyzer:
             'volatility_score': 0, 'bb_position': 0, 'bb_upper': 0, 'bb_lower': 0, 'bb_mid': 0,
             'atr_score': 0, 'atr_value': 0,
             'pattern_score': 0, 'price_position': 0,
-            'rs_score': 0, 'rs_ratio': 0,
+            'rs_score': 0, 'rs_ratio': 0, 'rs_benchmark': '', 'rs_sector_ratio': None,
         }
 
         try:
@@ -1094,13 +1004,17 @@ class TitanKRAnalyzer:
 
             close = hist['Close']
             volume = hist['Volume']
+            ind = indicators
+            if ind is None:
+                ind = technical_indicators(hist['High'].values, hist['Low'].values,
+                                           close.values, volume.values)
 
             # 1. 추세 분석 (20점)
             trend_score = 0
-            ma5 = close.rolling(window=5).mean().iloc[-1]
-            ma20 = close.rolling(window=20).mean().iloc[-1]
-            ma60 = close.rolling(window=60).mean().iloc[-1]
-            ma120 = close.rolling(window=120).mean().iloc[-1]
+            ma5 = ind['ma5'][-1]
+            ma20 = ind['ma20'][-1]
+            ma60 = ind['ma60'][-1]
+            ma120 = ind['ma120'][-1]
 
             breakdown['ma5'] = ma5
             breakdown['ma20'] = ma20
@@ -1118,9 +1032,8 @@ class TitanKRAnalyzer:
                 trend_score += self.SCORE_MA5
 
             # MACD
-            macd = MACD(close=close)
-            macd_line = macd.macd().iloc[-1]
-            macd_signal = macd.macd_signal().iloc[-1]
+            macd_line = ind['macd'][-1]
+            macd_signal = ind['macd_signal'][-1]
 
             if macd_line > macd_signal:
                 if macd_line > 0:
@@ -1133,18 +1046,10 @@ class TitanKRAnalyzer:
             # 일목균형표 (Ichimoku Cloud) - 3점
             ichimoku_score = 0
             try:
-                high_9 = hist['High'].rolling(9).max().iloc[-1]
-                low_9 = hist['Low'].rolling(9).min().iloc[-1]
-                tenkan = (high_9 + low_9) / 2
-
-                high_26 = hist['High'].rolling(26).max().iloc[-1]
-                low_26 = hist['Low'].rolling(26).min().iloc[-1]
-                kijun = (high_26 + low_26) / 2
-
-                high_52 = hist['High'].rolling(52).max().iloc[-1]
-                low_52 = hist['Low'].rolling(52).min().iloc[-1]
-                span_b = (high_52 + low_52) / 2
-                span_a = (tenkan + kijun) / 2
+                tenkan = ind['ichimoku_tenkan'][-1]
+                kijun = ind['ichimoku_kijun'][-1]
+                span_b = ind['ichimoku_span_b'][-1]
+                span_a = ind['ichimoku_span_a'][-1]
 
                 cloud_top = max(span_a, span_b)
                 if current_price > cloud_top:
@@ -1162,8 +1067,7 @@ class TitanKRAnalyzer:
                 pass
 
             # ADX
-            adx = ADXIndicator(high=hist['High'], low=hist['Low'], close=close)
-            adx_value = adx.adx().iloc[-1]
+            adx_value = ind['adx'][-1]
             breakdown['adx_value'] = adx_value
             if adx_value > 25:
                 trend_score += self.SCORE_ADX_STRONG
@@ -1177,8 +1081,7 @@ class TitanKRAnalyzer:
 
             # 2. 모멘텀 (10점)
             momentum_score = 0
-            rsi_ind = RSIIndicator(close=close, window=14)
-            rsi = rsi_ind.rsi().iloc[-1]
+            rsi = ind['rsi'][-1]
             breakdown['rsi_value'] = rsi
 
             if self.RSI_OPTIMAL_MIN <= rsi <= self.RSI_OPTIMAL_MAX:
@@ -1197,9 +1100,8 @@ class TitanKRAnalyzer:
                 else:
                     comments.append(f"RSI:{rsi:.0f}⚠")
 
-            stoch = StochasticOscillator(high=hist['High'], low=hist['Low'], close=close)
-            stoch_k = stoch.stoch().iloc[-1]
-            stoch_d = stoch.stoch_signal().iloc[-1]
+            stoch_k = ind['stoch_k'][-1]
+            stoch_d = ind['stoch_d'][-1]
             breakdown['stoch_k'] = stoch_k
             breakdown['stoch_d'] = stoch_d
 
@@ -1213,8 +1115,7 @@ class TitanKRAnalyzer:
 
             # MFI (Money Flow Index)
             try:
-                mfi = MFIIndicator(high=hist['High'], low=hist['Low'], close=close, volume=volume, window=14)
-                mfi_val = mfi.money_flow_index().iloc[-1]
+                mfi_val = ind['mfi'][-1]
                 breakdown['mfi_value'] = mfi_val
                 if mfi_val < 20:
                     momentum_score += 2
@@ -1229,7 +1130,7 @@ class TitanKRAnalyzer:
 
             # 3. 거래량 (8점)
             volume_score = 0
-            avg_volume = volume.rolling(window=20).mean().iloc[-1]
+            avg_volume = ind['volume_ma20'][-1]
             current_volume = volume.iloc[-1]
             volume_ratio = current_volume / avg_volume if avg_volume > 0 else 0
             breakdown['volume_ratio'] = volume_ratio
@@ -1245,10 +1146,9 @@ class TitanKRAnalyzer:
             elif volume_ratio >= 1.2:
                 volume_score += self.SCORE_VOLUME_NORMAL
 
-            obv = OnBalanceVolumeIndicator(close=close, volume=volume)
-            obv_values = obv.on_balance_volume()
-            obv_ma = obv_values.rolling(window=20).mean()
-            if len(obv_values) >= 20 and obv_values.iloc[-1] > obv_ma.iloc[-1]:
+            obv_values = ind['obv']
+            obv_ma = ind['obv_ma20']
+            if obv_values[-1] > obv_ma[-1]:
                 volume_score += self.SCORE_OBV_RISING
                 breakdown['obv_score'] = self.SCORE_OBV_RISING
                 comments.append("OBV↑")
@@ -1258,10 +1158,9 @@ class TitanKRAnalyzer:
 
             # 4. 변동성 (5점, 7→5 축소)
             volatility_score = 0
-            bb = BollingerBands(close=close)
-            bb_high = bb.bollinger_hband().iloc[-1]
-            bb_low = bb.bollinger_lband().iloc[-1]
-            bb_mid = bb.bollinger_mavg().iloc[-1]
+            bb_high = ind['bb_upper'][-1]
+            bb_low = ind['bb_lower'][-1]
+            bb_mid = ind['bb_mid'][-1]
             bb_position = (current_price - bb_low) / (bb_high - bb_low) if (bb_high - bb_low) > 0 else 0.5
             breakdown['bb_position'] = bb_position
             breakdown['bb_upper'] = float(bb_high)
@@ -1275,9 +1174,8 @@ class TitanKRAnalyzer:
                     volatility_score += 3
                     comments.append("BB하단")
 
-            atr = AverageTrueRange(high=hist['High'], low=hist['Low'], close=close)
-            atr_current = atr.average_true_range().iloc[-1]
-            atr_avg = atr.average_true_range().rolling(window=14).mean().iloc[-1]
+            atr_current = ind['atr'][-1]
+            atr_avg = ind['atr_ma14'][-1]
             if atr_current > atr_avg:
                 volatility_score += self.SCORE_ATR_EXPANSION
                 breakdown['atr_score'] = self.SCORE_ATR_EXPANSION
@@ -1288,8 +1186,8 @@ class TitanKRAnalyzer:
 
             # 5. 가격 패턴 (5점)
             pattern_score = 0
-            high_52w = close.rolling(window=252).max().iloc[-1] if len(close) >= 252 else close.max()
-            low_52w = close.rolling(window=252).min().iloc[-1] if len(close) >= 252 else close.min()
+            high_52w = ind['high_52w'][-1]
+            low_52w = ind['low_52w'][-1]
             price_position = (current_price - low_52w) / (high_52w - low_52w) if (high_52w - low_52w) > 0 else 0.5
             breakdown['price_position'] = price_position
 
@@ -1304,16 +1202,21 @@ class TitanKRAnalyzer:
             breakdown['pattern_score'] = pattern_score
             score += pattern_score
 
-            # 6. 상대강도 vs KOSPI (5점, 신규)
+            # 6. 상대강도 vs 소속 시장 지수 (5점) + 업종 지수 (참고)
             rs_score = 0
-            if kospi_hist is not None and len(kospi_hist) >= 60 and len(close) >= 60:
+            index_code, sector_index = benchmarks or (None, None)
+            index_return_3m = market.benchmark_return(index_code) if market is not None else None
+            if index_return_3m is not None and len(close) >= 60:
                 try:
-                    kospi_close = kospi_hist['Close']
                     stock_return_3m = (close.iloc[-1] / close.iloc[-63] - 1) if len(close) >= 63 else (close.iloc[-1] / close.iloc[0] - 1)
-                    kospi_return_3m = (kospi_close.iloc[-1] / kospi_close.iloc[-63] - 1) if len(kospi_close) >= 63 else (kospi_close.iloc[-1] / kospi_close.iloc[0] - 1)
-                    rs_ratio = stock_return_3m - kospi_return_3m
+                    rs_ratio = stock_return_3m - index_return_3m
 
                     breakdown['rs_ratio'] = round(rs_ratio * 100, 1)
+                    breakdown['rs_benchmark'] = index_code or market.index_code
+
+                    sector_return_3m = market.benchmark_return(sector_index) if sector_index else None
+                    if sector_return_3m is not None:
+                        breakdown['rs_sector_ratio'] = round((stock_return_3m - sector_return_3m) * 100, 1)
 
                     if rs_ratio > 0.15:
                         rs_score = self.SCORE_RS_STRONG
@@ -1459,85 +1362,20 @@ class TitanKRAnalyzer:
             return {}
 
     # ================================================================
-    # 시장 레짐 감지 (KOSPI 기반)
+    # 시장 컨텍스트 (KOSPI 기반, 실행당 1회)
     # ================================================================
-    def _detect_market_regime(self):
-        try:
-            from ta.trend import ADXIndicator
-
-            hist = self.data_provider.get_market_index(period='1y')
-            if len(hist) < 120:
-                return 'neutral', {}, "데이터 부족"
+    def build_market_context(self, period='1y', sector_rotation=True):
+        """KOSPI 지수 1회 조회 → 기간별 수익률/레짐/섹터 ETF 모멘텀 공유 컨텍스트
 
-            close = hist['Close']
-            current_price = close.iloc[-1]
-
-            ma60 = close.rolling(window=60).mean().iloc[-1]
-            ma120 = close.rolling(window=120).mean().iloc[-1]
-
-            price_3m_ago = close.iloc[-63] if len(close) >= 63 else close.iloc[0]
-            trend_3m = (current_price - price_3m_ago) / price_3m_ago
-
-            price_6m_ago = close.iloc[-126] if len(close) >= 126 else close.iloc[0]
-            trend_6m = (current_price - price_6m_ago) / price_6m_ago
-
-            adx = ADXIndicator(high=hist['High'], low=hist['Low'], close=close)
-            adx_value = adx.adx().iloc[-1]
-
-            bull_signals = 0
-            bear_signals = 0
-
-            if current_price > ma120:
-                bull_signals += 1
-            else:
-                bear_signals += 1
-            if ma60 > ma120:
-                bull_signals += 1
-            else:
-                bear_signals += 1
-            if trend_3m > 0.05:
-                bull_signals += 1
-            elif trend_3m < -0.05:
-                bear_signals += 1
-            if trend_6m > 0.10:
-                bull_signals += 1
-            elif trend_6m < -0.10:
-                bear_signals += 1
-
-            if adx_value < 20:
-                regime = 'sideways'
-                regime_kr = '횡보장'
-                regime_emoji = '↔️'
-            elif bull_signals >= 3:
-                regime = 'bull'
-                regime_kr = '상승장'
-                regime_emoji = '📈'
-            elif bear_signals >= 3:
-                regime = 'bear'
-                regime_kr = '하락장'
-                regime_emoji = '📉'
-            else:
-                regime = 'neutral'
-                regime_kr = '중립'
-                regime_emoji = '➡️'
-
-            details = {
-                'current': current_price,
-                'ma60': ma60,
-                'ma120': ma120,
-                'trend_3m': trend_3m * 100,
-                'trend_6m': trend_6m * 100,
-                'adx': adx_value,
-                'bull_signals': bull_signals,
-                'bear_signals': bear_signals
-            }
-
-            description = f"{regime_emoji} {regime_kr} (KOSPI: {current_price:,.0f}, 3개월: {trend_3m*100:+.1f}%, ADX: {adx_value:.0f})"
-            return regime, details, description
-
-        except Exception as e:
-            print(f"Market regime detection error: {e}")
-            return 'neutral', {}, "감지 실패"
+        RS 벤치마크 (KOSDAQ + KRX 업종 지수)도 함께 일괄 로드
+        """
+        provider = self.data_provider
+        index_hist = provider.get_market_index(period=period)
+        benchmark_codes = [provider.MARKET_INDICES['KOSDAQ']] + list(provider.KRX_SECTOR_INDICES)
+        benchmarks = provider.get_market_indices(benchmark_codes, period=period)
+        rotation = self._analyze_sector_rotation() if sector_rotation else {}
+        self.market_context = MarketContext(index_hist, rotation, benchmarks=benchmarks)
+        return self.market_context
 
     def _apply_regime_adjustment(self, tech_score, fund_score, regime, is_downtrend=False, tech_breakdown=None):
         # 하락추세 페널티 (펀더멘털 품질 차등)
@@ -1645,25 +1483,15 @@ class TitanKRAnalyzer:
     # ================================================================
     # 스윙 저점/고점 탐지 (US v2.0 동기화)
     # ================================================================
-    def _find_swing_lows(self, hist, lookback=60, order=5):
-        """최근 N일 로우에서 스윙 저점(지지선) 탐지"""
-        lows = hist['Low'].iloc[-lookback:]
-        swing_lows = []
-        for i in range(order, len(lows) - order):
-            if all(lows.iloc[i] <= lows.iloc[i - j] for j in range(1, order + 1)) and \
-               all(lows.iloc[i] <= lows.iloc[i + j] for j in range(1, order + 1)):
-                swing_lows.append(float(lows.iloc[i]))
-        return sorted(set(swing_lows))
-
-    def _find_swing_highs(self, hist, lookback=60, order=5):
-        """최근 N일 하이에서 스윙 고점(저항선) 탐지"""
-        highs = hist['High'].iloc[-lookback:]
-        swing_highs = []
-        for i in range(order, len(highs) - order):
-            if all(highs.iloc[i] >= highs.iloc[i - j] for j in range(1, order + 1)) and \
-               all(highs.iloc[i] >= highs.iloc[i + j] for j in range(1, order + 1)):
-                swing_highs.append(float(highs.iloc[i]))
-        return sorted(set(swing_highs))
+    def _get_support_levels(self, levels, current_price):
+        """시간대별 최근접 지지/저항 (일봉 외 주봉/월봉 스윙 레벨)"""
+        nearest = {}
+        for name, (lows, highs) in levels.items():
+            if name == 'daily':
+                continue
+            nearest[f'{name}_support'] = self._nearest_below(lows, current_price)
+            nearest[f'{name}_resistance'] = self._nearest_above(highs, current_price)
+        return nearest
 
     @staticmethod
     def _nearest_below(levels, price):
@@ -1677,233 +1505,88 @@ class TitanKRAnalyzer:
         candidates = [l for l in levels if l > price]
         return min(candidates) if candidates else None
 
-    def _validate_risk_reward(self, buy_price, target_price, stop_loss, atr, swing_highs):
-        """R:R >= 2.0 보장, 최대 손절 7%"""
-        max_stop = buy_price * 0.93
-        if stop_loss < max_stop:
-            stop_loss = max_stop
-
-        risk = buy_price - stop_loss
-        reward = target_price - buy_price
-        if risk > 0 and reward / risk < 2.0:
-            farther = [r for r in swing_highs if r > target_price]
-            if farther:
-                target_price = min(farther)
-            elif atr > 0:
-                target_price = buy_price + (3.0 * atr)
-            else:
-                target_price = buy_price * 1.12
+    # ================================================================
+    # 스마트 진입/청산 (kr_entry_exit 일괄 계산)
+    # ================================================================
+    @staticmethod
+    def _entry_exit_inputs(current_price, contrarian_adj, hist, tech_breakdown, levels):
+        """entry_exit_batch 종목 1행 입력"""
+        swing_lows, swing_highs = levels['daily']
+        return {
+            'price': current_price,
+            'contrarian_adj': contrarian_adj,
+            'ma20': tech_breakdown.get('ma20', 0),
+            'ma60': tech_breakdown.get('ma60', 0),
+            'ma120': tech_breakdown.get('ma120', 0),
+            'bb_upper': tech_breakdown.get('bb_upper', 0),
+            'bb_lower': tech_breakdown.get('bb_lower', 0),
+            'atr': tech_breakdown.get('atr_value', 0),
+            'rsi': tech_breakdown.get('rsi_value', 50),
+            'swing_lows': swing_lows,
+            'swing_highs': swing_highs,
+            'bars': len(hist),
+        }
 
-        return target_price, stop_loss
+    def _calculate_entry_exit_batch(self, inputs):
+        """종목별 입력 목록 → [(buy, target, stop, strategy), ...] (전 종목 1회 벡터 계산)
 
-    def _calculate_smart_entry_exit(self, current_price, contrarian_adj, hist, tech_breakdown):
-        """스윙매매 특화 진입/청산 전략 (기술적 레벨 기반, US v2.0 동기화)"""
+        입력이 None 인 종목(입력 구성 실패)과 일괄 계산 실패 시 종목별 재계산에서도
+        실패한 종목만 "계산 실패"
+        """
+        if not inputs:
+            return []
+        if any(row is None for row in inputs):
+            computed = iter(self._calculate_entry_exit_batch([row for row in inputs if row is not None]))
+            return [(None, None, None, "계산 실패") if row is None else next(computed) for row in inputs]
         try:
-            if len(hist) < 20:
-                return None, None, None, "데이터 부족"
-
-            ma20 = tech_breakdown.get('ma20', 0)
-            ma60 = tech_breakdown.get('ma60', 0)
-            bb_upper = tech_breakdown.get('bb_upper', 0)
-            bb_lower = tech_breakdown.get('bb_lower', 0)
-            atr = tech_breakdown.get('atr_value', 0)
-
-            swing_lows = self._find_swing_lows(hist)
-            swing_highs = self._find_swing_highs(hist)
-            nearest_support = self._nearest_below(swing_lows, current_price)
-            nearest_resistance = self._nearest_above(swing_highs, current_price)
-
-            # ========== Tier 1: 역발상 매수 (과매도 우량주) ==========
-            if contrarian_adj > 0:
-                if bb_lower > 0 and bb_lower >= current_price * 0.97:
-                    buy_price = bb_lower
-                else:
-                    buy_price = current_price
+            columns = {key: [row[key] for row in inputs] for key in
+                       ('price', 'contrarian_adj', 'ma20', 'ma60', 'ma120', 'bb_upper', 'bb_lower',
+                        'atr', 'rsi', 'bars')}
+            buy, target, stop, strategy = entry_exit_batch(
+                swing_lows=pad_levels([row['swing_lows'] for row in inputs]),
+                swing_highs=pad_levels([row['swing_highs'] for row in inputs]),
+                **columns)
+        except Exception:
+            if len(inputs) == 1:
+                return [(None, None, None, "계산 실패")]
+            return [row for single in inputs for row in self._calculate_entry_exit_batch([single])]
 
-                if nearest_resistance and nearest_resistance > buy_price * 1.03:
-                    target_price = nearest_resistance
-                elif bb_upper > 0 and bb_upper > buy_price * 1.03:
-                    target_price = bb_upper
-                else:
-                    target_price = buy_price + (1.5 * atr) if atr > 0 else buy_price * 1.08
-
-                atr_stop = buy_price - (2.0 * atr) if atr > 0 else buy_price * 0.95
-                struct_stop = nearest_support * 0.99 if nearest_support else atr_stop
-                stop_loss = max(atr_stop, struct_stop)
-                if stop_loss > buy_price * 0.98:
-                    stop_loss = buy_price * 0.98
-                if stop_loss >= buy_price:
-                    stop_loss = buy_price * 0.95
-
-                target_price, stop_loss = self._validate_risk_reward(
-                    buy_price, target_price, stop_loss, atr, swing_highs)
-                strategy = "🎯 역발상매수(기술적지지)"
-
-            # ========== Tier 2: 조정대기 (과열주) ==========
-            elif contrarian_adj < 0:
-                candidates = []
-                if ma20 > 0 and ma20 < current_price:
-                    candidates.append(ma20)
-                if nearest_support and nearest_support < current_price:
-                    candidates.append(nearest_support)
-                if atr > 0:
-                    candidates.append(current_price - (2.0 * atr))
-
-                buy_price = max(candidates) if candidates else current_price * 0.95
-
-                if nearest_resistance and nearest_resistance > buy_price * 1.03:
-                    target_price = nearest_resistance
-                elif bb_upper > 0:
-                    target_price = bb_upper
-                else:
-                    target_price = buy_price * 1.08
+        def _value(x):
+            return None if np.isnan(x) else float(x)
 
-                atr_stop = buy_price - (2.0 * atr) if atr > 0 else buy_price * 0.95
-                struct_stop = nearest_support * 0.99 if nearest_support else atr_stop
-                stop_loss = max(atr_stop, struct_stop)
-                if stop_loss >= buy_price:
-                    stop_loss = buy_price * 0.95
+        return [(_value(b), _value(t), _value(s), label)
+                for b, t, s, label in zip(buy, target, stop, strategy)]
 
-                target_price, stop_loss = self._validate_risk_reward(
-                    buy_price, target_price, stop_loss, atr, swing_highs)
-                strategy = "⚠️ 조정대기(진입조건가)"
-
-            # ========== Tier 3: 세분화 전략 (일반종목) ==========
-            else:
-                rsi = tech_breakdown.get('rsi_value', 50)
-                ma120 = tech_breakdown.get('ma120', 0)
-
-                uptrend = (ma20 > 0 and ma60 > 0 and ma20 > ma60)
-                price_above_ma20 = (ma20 > 0 and current_price > ma20)
-                sideways = (ma20 > 0 and ma60 > 0 and abs(ma20 - ma60) / ma60 < 0.02)
-                weak = (ma60 > 0 and current_price < ma60) or rsi < 40
-
-                # --- Tier 3A: 추세추종 ---
-                if uptrend and price_above_ma20 and rsi >= 50:
-                    buy_price = current_price
-                    if nearest_resistance and nearest_resistance > current_price * 1.02:
-                        target_price = nearest_resistance
-                    elif bb_upper > 0 and bb_upper > current_price * 1.02:
-                        target_price = bb_upper
-                    else:
-                        target_price = current_price + (2.0 * atr) if atr > 0 else current_price * 1.08
-                    atr_stop = current_price - (2.0 * atr) if atr > 0 else current_price * 0.95
-                    ma20_stop = ma20 * 0.99 if ma20 > 0 else atr_stop
-                    stop_loss = max(atr_stop, ma20_stop)
-                    if stop_loss > current_price * 0.98:
-                        stop_loss = current_price * 0.98
-                    if stop_loss >= current_price:
-                        stop_loss = current_price * 0.95
-                    target_price, stop_loss = self._validate_risk_reward(
-                        buy_price, target_price, stop_loss, atr, swing_highs)
-                    strategy = "📈 추세추종(MA20↑)"
-
-                # --- Tier 3B: 풀백매수 ---
-                elif uptrend and not price_above_ma20:
-                    support_candidates = []
-                    if ma20 > 0 and ma20 < current_price * 1.03:
-                        support_candidates.append(('MA20', ma20))
-                    if bb_lower > 0 and bb_lower < current_price:
-                        support_candidates.append(('BB하단', bb_lower))
-                    if nearest_support and nearest_support < current_price:
-                        support_candidates.append(('스윙저점', nearest_support))
-                    if support_candidates:
-                        best_label, best_support = max(support_candidates, key=lambda x: x[1])
-                        buy_price = best_support
-                        strategy_suffix = best_label
-                    else:
-                        buy_price = ma20 if ma20 > 0 else current_price
-                        strategy_suffix = "MA20"
-                    if nearest_resistance and nearest_resistance > current_price:
-                        target_price = nearest_resistance
-                    elif bb_upper > 0 and bb_upper > current_price:
-                        target_price = bb_upper
-                    else:
-                        target_price = buy_price + (2.0 * atr) if atr > 0 else buy_price * 1.08
-                    supports_below = [l for l in swing_lows if l < buy_price]
-                    struct_stop = max(supports_below) * 0.99 if supports_below else buy_price * 0.95
-                    atr_stop = buy_price - (2.0 * atr) if atr > 0 else buy_price * 0.95
-                    stop_loss = max(atr_stop, struct_stop)
-                    if stop_loss > buy_price * 0.98:
-                        stop_loss = buy_price * 0.98
-                    if stop_loss >= buy_price:
-                        stop_loss = buy_price * 0.95
-                    target_price, stop_loss = self._validate_risk_reward(
-                        buy_price, target_price, stop_loss, atr, swing_highs)
-                    strategy = f"📊 풀백매수({strategy_suffix})"
-
-                # --- Tier 3C: 박스권하단 ---
-                elif sideways or (not uptrend and not weak):
-                    support_candidates = []
-                    if bb_lower > 0 and bb_lower < current_price:
-                        support_candidates.append(('BB하단', bb_lower))
-                    if nearest_support and nearest_support < current_price:
-                        support_candidates.append(('스윙저점', nearest_support))
-                    if ma60 > 0 and ma60 < current_price:
-                        support_candidates.append(('MA60', ma60))
-                    if support_candidates:
-                        best_label, best_support = max(support_candidates, key=lambda x: x[1])
-                        buy_price = best_support
-                        strategy_suffix = best_label
-                    else:
-                        buy_price = current_price * 0.97
-                        strategy_suffix = "지지선"
-                    if nearest_resistance and nearest_resistance > current_price:
-                        target_price = nearest_resistance
-                    elif bb_upper > 0 and bb_upper > current_price:
-                        target_price = bb_upper
-                    else:
-                        target_price = buy_price + (1.5 * atr) if atr > 0 else buy_price * 1.06
-                    supports_below = [l for l in swing_lows if l < buy_price]
-                    struct_stop = max(supports_below) * 0.99 if supports_below else buy_price * 0.95
-                    atr_stop = buy_price - (2.0 * atr) if atr > 0 else buy_price * 0.95
-                    stop_loss = max(atr_stop, struct_stop)
-                    if stop_loss > buy_price * 0.98:
-                        stop_loss = buy_price * 0.98
-                    if stop_loss >= buy_price:
-                        stop_loss = buy_price * 0.95
-                    target_price, stop_loss = self._validate_risk_reward(
-                        buy_price, target_price, stop_loss, atr, swing_highs)
-                    strategy = f"📦 박스권하단({strategy_suffix})"
-
-                # --- Tier 3D: 반등대기 ---
-                else:
-                    support_candidates = []
-                    if nearest_support and nearest_support < current_price:
-                        support_candidates.append(('스윙저점', nearest_support))
-                    if ma120 > 0 and ma120 < current_price:
-                        support_candidates.append(('MA120', ma120))
-                    if bb_lower > 0 and bb_lower < current_price:
-                        support_candidates.append(('BB하단', bb_lower))
-                    if support_candidates:
-                        best_label, best_support = max(support_candidates, key=lambda x: x[1])
-                        buy_price = best_support
-                        strategy_suffix = best_label
-                    else:
-                        buy_price = current_price * 0.95
-                        strategy_suffix = "지지확인"
-                    if ma60 > 0 and ma60 > current_price:
-                        target_price = ma60
-                    elif nearest_resistance and nearest_resistance > current_price:
-                        target_price = nearest_resistance
-                    else:
-                        target_price = buy_price + (1.5 * atr) if atr > 0 else buy_price * 1.06
-                    supports_below = [l for l in swing_lows if l < buy_price]
-                    struct_stop = max(supports_below) * 0.99 if supports_below else buy_price * 0.95
-                    atr_stop = buy_price - (1.5 * atr) if atr > 0 else buy_price * 0.95
-                    stop_loss = max(atr_stop, struct_stop)
-                    if stop_loss > buy_price * 0.97:
-                        stop_loss = buy_price * 0.97
-                    if stop_loss >= buy_price:
-                        stop_loss = buy_price * 0.95
-                    target_price, stop_loss = self._validate_risk_reward(
-                        buy_price, target_price, stop_loss, atr, swing_highs)
-                    strategy = f"🔄 반등대기({strategy_suffix})"
-
-            return buy_price, target_price, stop_loss, strategy
+    def _calculate_smart_entry_exit(self, current_price, contrarian_adj, hist, tech_breakdown,
+                                    levels=None):
+        """스윙매매 특화 진입/청산 전략 (기술적 레벨 기반, US v2.0 동기화)
 
+        levels: support_resistance 결과 (시간대별 스윙 레벨), 없으면 일봉 레벨 계산
+        종목 1개 경로 — 다종목은 _apply_entry_exit 로 일괄 계산
+        """
+        try:
+            if len(hist) < 20:
+                return None, None, None, "데이터 부족"
+            if levels is None:
+                levels = support_resistance(hist['High'].values, hist['Low'].values)
+            inputs = self._entry_exit_inputs(current_price, contrarian_adj, hist, tech_breakdown, levels)
         except Exception:
             return None, None, None, "계산 실패"
+        return self._calculate_entry_exit_batch([inputs])[0]
+
+    def _apply_entry_exit(self, results, inputs):
+        """분석 결과에 진입/청산 가격·전략(주봉 확인 라벨) + 애널리스트 코멘트 반영"""
+        for result, (buy_price, target, stop_loss, strategy) in zip(
+                results, self._calculate_entry_exit_batch(inputs)):
+            # 다중 시간대: 주봉 추세로 스윙 진입 확인
+            weekly_trend = result.get('horizons', {}).get('weekly', {}).get('trend')
+            if buy_price is not None and weekly_trend in self.WEEKLY_TREND_LABELS:
+                strategy = f"{strategy} · {self.WEEKLY_TREND_LABELS[weekly_trend]}"
+            result['buy_price'] = buy_price
+            result['buy_strategy'] = strategy
+            result['target'] = target
+            result['stop_loss'] = stop_loss
+            result['analyst_comment'] = self._generate_analyst_comment(result)
 
     def _get_current_price(self, info, hist):
         return info.get('currentPrice') or info.get('regularMarketPrice') or (int(hist['Close'].iloc[-1]) if not hist.empty else 0)
@@ -1939,19 +1622,120 @@ class TitanKRAnalyzer:
     # ================================================================
     # 개별 종목 분석
     # ================================================================
-    def _analyze_single_stock(self, code, kospi_hist=None):
-        info = self.data_provider.get_info(code)
+    def _fetch_stock_data(self, code, batch=None):
+        """종목별 info + 1년 히스토리 수집 (I/O 전용, 스레드에서 호출)
+
+        다중 시간대 모드: 3년 히스토리 1회 조회 → 주/월봉 리샘플링,
+        1년 일봉은 같은 조회 결과(프로바이더 메모리 캐시)에서 잘라 사용
+        ML 연동 모드: ML 학습 기간(SHARED_HISTORY_PERIOD) 히스토리도 보관 (1년 일봉은 그 일부)
+        """
+        info = self.data_provider.get_info(code, batch=batch)
+        if self.multi_horizon:
+            bars = self.data_provider.get_multi_horizon_history(code, period=self.HORIZON_PERIOD)
+            self.horizon_history[code] = {k: v for k, v in bars.items() if k != 'daily'}
+        if self.share_ml_indicators:
+            self.indicator_history[code] = self.data_provider.get_history(code, period=SHARED_HISTORY_PERIOD)
+        hist = self.data_provider.get_history(code, period='1y')
+        return info, hist
+
+    def _get_horizon_breakdown(self, indicators, close):
+        """주/월봉 지표 마지막 값 → 추세 판정 (up: 종가·MA5 > MA20 + MACD > 시그널)"""
+        last = {key: float(indicators[key][-1])
+                for key in ('ma5', 'ma20', 'macd', 'macd_signal', 'rsi', 'adx')}
+        price = float(close)
+        trend = 'neutral'
+        if not any(np.isnan(last[k]) for k in ('ma5', 'ma20', 'macd', 'macd_signal')):
+            if price > last['ma20'] and last['ma5'] > last['ma20'] and last['macd'] > last['macd_signal']:
+                trend = 'up'
+            elif price < last['ma20'] and last['ma5'] < last['ma20'] and last['macd'] < last['macd_signal']:
+                trend = 'down'
+        breakdown = {key: (None if np.isnan(value) else round(value, 2)) for key, value in last.items()}
+        breakdown['close'] = price
+        breakdown['trend'] = trend
+        return breakdown
+
+    def _get_horizon_breakdowns(self, code):
+        """종목의 주/월봉 추세 {horizon: breakdown} (다중 시간대 모드 아니면 빈 dict)"""
+        breakdowns = {}
+        for horizon, bars in self.horizon_history.get(code, {}).items():
+            if bars is None or bars.empty:
+                continue
+            indicators = self.indicator_series.series((code, horizon), bars)
+            breakdown = self._get_horizon_breakdown(indicators, bars['Close'].iloc[-1])
+            breakdown['bars'] = len(bars)
+            breakdowns[horizon] = breakdown
+        return breakdowns
+
+    def _scoring_indicators(self, code, hist):
+        """_get_technical_score 지표 마지막 값 (technical_indicators 키, 값은 길이 1 배열)
+
+        ML 연동 모드: ML 피처와 같은 히스토리의 공유 시계열 마지막 값 (ML 준비 시 재계산 없음)
+        그 외: 종목별 누적 상태로 새 봉만 반영 (장중 반복 실행 시 전체 재계산 생략)
+        """
+        full = self.indicator_history.get(code) if self.share_ml_indicators else None
+        if full is None or full.empty or full.index[-1] != hist.index[-1]:
+            return self.indicator_states.indicators(code, hist)
+        series = self.indicator_series.series(code, full)
+        indicators = {key: values[-1:] for key, values in series.items()}
+        # 52주 고/저가는 점수 창(1년 일봉) 기준 — 다른 지표는 창 밖 봉과 무관하거나 수렴값
+        closes = hist['Close'].values[-min(TRADING_DAYS_52W, len(hist)):]
+        indicators['high_52w'] = np.array([closes.max()], dtype=float)
+        indicators['low_52w'] = np.array([closes.min()], dtype=float)
+        return indicators
+
+    def _prefetch_stock_data(self, codes):
+        """전 종목 데이터 병렬 수집
+
+        공유 벌크 캐시와 다종목 시장 정보(get_info_batch)를 먼저 구성한 뒤
+        종목별 I/O(히스토리, 재무 보완)만 스레드 풀에서 실행.
+        점수 계산은 호출 측에서 입력 순서대로 수행 (결과 결정성 유지)
+
+        Returns:
+            dict: {code: (info, hist)} — 수집 실패 종목은 제외
+        """
+        self.data_provider.warm_shared_caches()
+        batch = self.data_provider.get_info_batch(codes)
+
+        prefetched = {}
+        total = len(codes)
+        workers = max(1, min(self.PREFETCH_WORKERS, total))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(self._fetch_stock_data, code, batch): code for code in codes}
+            for done, future in enumerate(as_completed(futures), 1):
+                code = futures[future]
+                try:
+                    prefetched[code] = future.result()
+                except Exception as e:
+                    print(f"  ⚠️  {code} 데이터 수집 실패: {e}")
+                if done % 10 == 0 or done == total:
+                    print(f"   데이터 수집: {done}/{total}", flush=True)
+        self.data_provider.print_source_metrics()
+        return prefetched
+
+    def _analyze_single_stock(self, code, market=None, prefetched=None, defer_entry_exit=False,
+                              fundamentals=None):
+        """종목 분석
+
+        defer_entry_exit: 진입/청산 입력만 '_entry_inputs'로 남기고 _apply_entry_exit 일괄 계산
+        fundamentals: _get_fundamental_scores 일괄 계산 결과 (없으면 종목 단독 계산)
+        """
+        if prefetched is not None:
+            info, hist = prefetched
+        else:
+            info, hist = self._fetch_stock_data(code)
         # 가치주 모드에서 배당귀족 판별용 코드 삽입
         info['_code'] = code
-        hist = self.data_provider.get_history(code, period='1y')
 
         if hist.empty or len(hist) < 20:
             return None
 
         current_price = self._get_current_price(info, hist)
 
-        fund_score, fund_comments, fund_breakdown = self._get_fundamental_score(info)
-        tech_score, tech_comments, tech_breakdown = self._get_technical_score(hist, current_price, kospi_hist)
+        fund_score, fund_comments, fund_breakdown = fundamentals or self._get_fundamental_score(info)
+        indicators = self._scoring_indicators(code, hist) if len(hist) >= 120 else None
+        tech_score, tech_comments, tech_breakdown = self._get_technical_score(
+            hist, current_price, market, indicators=indicators,
+            benchmarks=self.data_provider.get_benchmark_indices(code))
 
         contrarian_adj, contrarian_comment = self._apply_contrarian_adjustment(
             fund_score, tech_breakdown, fund_breakdown.get('sector_name', ''))
@@ -1961,9 +1745,12 @@ class TitanKRAnalyzer:
 
         total_score = fund_score + tech_score + contrarian_adj + trading_bonus
 
-        # 스마트 진입/청산 전략 (US v2.0)
-        buy_price, target, stop_loss, strategy = self._calculate_smart_entry_exit(
-            current_price, contrarian_adj, hist, tech_breakdown)
+        # 스마트 진입/청산 전략 입력 (US v2.0, 구성 실패 시 종목 유지 + "계산 실패")
+        try:
+            levels = support_resistance(hist['High'].values, hist['Low'].values)
+            entry_inputs = self._entry_exit_inputs(current_price, contrarian_adj, hist, tech_breakdown, levels)
+        except Exception:
+            levels, entry_inputs = {}, None
 
         market_info = self._get_market_status_and_prices(info)
         verdict = self._get_verdict(total_score)
@@ -1989,15 +1776,20 @@ class TitanKRAnalyzer:
             'verdict': verdict,
             'price': current_price,
             'market_info': market_info,
-            'buy_price': buy_price,
-            'buy_strategy': strategy,
-            'target': target,
-            'stop_loss': stop_loss,
+            'buy_price': None,
+            'buy_strategy': '',
+            'target': None,
+            'stop_loss': None,
+            'support_levels': self._get_support_levels(levels, current_price),
+            'horizons': self._get_horizon_breakdowns(code),
             'comment': comment
         }
 
-        # 애널리스트 코멘트 생성
-        result['analyst_comment'] = self._generate_analyst_comment(result)
+        if defer_entry_exit:
+            result['_entry_inputs'] = entry_inputs
+        else:
+            # 진입/청산 + 애널리스트 코멘트 생성
+            self._apply_entry_exit([result], [entry_inputs])
 
         return result
 
@@ -2139,21 +1931,101 @@ class TitanKRAnalyzer:
             json.dump(cache, f, indent=2, ensure_ascii=False)
         print(f"💾 Titan KR 점수 캐시 저장: {cache_file} ({len(cache)}개 종목)")
 
+        # 점수 산출에 사용한 시장 컨텍스트 (레짐/KOSPI 수익률/섹터 순환매)
+        if self.market_context is not None:
+            context_file = self.MARKET_CONTEXT_FILE
+            self.market_context.save(context_file)
+            print(f"💾 시장 컨텍스트 저장: {context_file}")
+
     # ================================================================
     # 2단계: 정밀 분석
     # ================================================================
+    def technical_scan(self, codes, period='1y', market=None, min_bars=120):
+        """전 종목 기술적 점수 일괄 산출 (날짜×종목 패널 → 2차원 지표 계산)
+
+        종목별 히스토리 조회/지표 계산 대신 일별 전종목 스냅샷 패널에서
+        모든 종목의 지표를 한 번에 계산 → KRX 전 종목(~2,500) 1차 스크리닝용
+
+        Returns:
+            list of dict: [{code, price, tech_score, tech_comments, tech_breakdown}, ...]
+                          (tech_score 내림차순)
+        """
+        horizons = {}
+        if self.multi_horizon:
+            # 3년 패널 1회 구성 → 주/월봉은 패널 단위 리샘플링, 일봉 점수는 period 구간만
+            full = self.data_provider.get_history_panel(codes, period=self.HORIZON_PERIOD)
+            if full is None or full.empty:
+                return []
+            horizons = self._panel_horizon_breakdowns(full)
+            days = self.data_provider.PERIOD_DAYS.get(period, 365)
+            panel = full[full.index >= pd.Timestamp((datetime.now() - timedelta(days=days)).date())]
+        else:
+            panel = self.data_provider.get_history_panel(codes, period=period)
+        if panel is None or panel.empty:
+            return []
+        if market is None:
+            market = self.market_context or self.build_market_context(period, sector_rotation=False)
+
+        fields = [panel[f].values for f in ('High', 'Low', 'Close', 'Volume')]
+        indicators, counts = panel_technical_indicators(*fields)
+
+        # 점수 계산에 필요한 종가/거래량만 종목별 유효 봉으로 정렬 (패널 xs 반복 회피)
+        mask = ~np.isnan(np.stack(fields)).any(axis=0)
+        (close, volume), _ = right_align(mask, fields[2], fields[3])
+        n = len(close)
+
+        results = []
+        for j, code in enumerate(panel['Close'].columns):
+            if counts[j] < min_bars:
+                continue
+            start = n - int(counts[j])
+            hist = pd.DataFrame({'Close': close[start:, j], 'Volume': volume[start:, j]})
+            current_price = float(hist['Close'].iloc[-1])
+            tech_score, tech_comments, tech_breakdown = self._get_technical_score(
+                hist, current_price, market, indicators=panel_column(indicators, counts, j),
+                benchmarks=self.data_provider.get_benchmark_indices(code))
+            results.append({
+                'code': code,
+                'price': current_price,
+                'tech_score': tech_score,
+                'tech_comments': tech_comments,
+                'tech_breakdown': tech_breakdown,
+                'horizons': horizons.get(code, {}),
+            })
+
+        results.sort(key=lambda r: r['tech_score'], reverse=True)
+        return results
+
+    def _panel_horizon_breakdowns(self, panel):
+        """일봉 패널 → 주/월봉 패널 리샘플링 + 2차원 지표 → {code: {horizon: breakdown}}"""
+        breakdowns = {}
+        for horizon, rule in self.data_provider.HORIZON_RULES.items():
+            bars = self.data_provider.resample_ohlcv(panel, rule)
+            fields = [bars[f].values for f in ('High', 'Low', 'Close', 'Volume')]
+            indicators, counts = panel_technical_indicators(*fields)
+            mask = ~np.isnan(np.stack(fields)).any(axis=0)
+            (close,), _ = right_align(mask, fields[2])
+            for j, code in enumerate(bars['Close'].columns):
+                if counts[j] == 0:
+                    continue
+                breakdown = self._get_horizon_breakdown(
+                    panel_column(indicators, counts, j), close[-1, j])
+                breakdown['bars'] = int(counts[j])
+                breakdowns.setdefault(code, {})[horizon] = breakdown
+        return breakdowns
+
     def stage2_deep_analysis(self, codes):
         print("=" * 70)
         print("📊 STAGE 2: 정밀 분석 (Fundamental + Technical)")
         print("=" * 70)
 
-        print("\n🌍 시장 상태 감지 중...")
-        market_regime, regime_details, regime_desc = self._detect_market_regime()
+        # 🌍 시장 컨텍스트 (KOSPI 1회 조회 → 레짐/RS/섹터 순환매 공유)
+        print("\n🌍 시장 상태 감지 + 섹터 순환매 분석 중...")
+        market = self.build_market_context()
+        market_regime, regime_desc = market.regime, market.regime_description
         print(f"   {regime_desc}\n")
 
-        # 🔄 섹터 순환매 분석
-        print("🔄 섹터 순환매 분석 중...")
-        self.sector_rotation = self._analyze_sector_rotation()
+        self.sector_rotation = market.sector_rotation
         if self.sector_rotation:
             phases = {}
             for sector, info in self.sector_rotation.items():
@@ -2168,22 +2040,34 @@ class TitanKRAnalyzer:
                     print(f"   {icons.get(phase, '')} {phase}: {', '.join(phases[phase])}")
             print()
 
-        # KOSPI 히스토리 (RS vs KOSPI용)
-        print("📈 KOSPI 지수 로딩 중...")
-        kospi_hist = self.data_provider.get_market_index(period='1y')
-        if not kospi_hist.empty:
-            print(f"   KOSPI: {kospi_hist['Close'].iloc[-1]:,.0f} ({len(kospi_hist)}일)")
+        if market.available:
+            returns = ", ".join(f"{name} {value*100:+.1f}%" for name, value in market.returns.items())
+            print(f"   KOSPI: {market.close[-1]:,.0f} ({market.bars}일) — {returns}")
         else:
             print("   ⚠️ KOSPI 데이터 없음 (RS 분석 생략)")
         print()
 
+        print(f"📥 종목 데이터 병렬 수집 중 (workers={self.PREFETCH_WORKERS})...")
+        prefetched = self._prefetch_stock_data(codes)
+        print()
+
+        # 펀더멘털 점수: 전 종목 1회 계산 (섹터 임계값 고유 섹터당 1회 해석)
+        for code, (info, _) in prefetched.items():
+            info['_code'] = code
+        fundamentals = dict(zip(prefetched, self._get_fundamental_scores(
+            [info for info, _ in prefetched.values()])))
+
         results = []
         total = len(codes)
 
         for i, code in enumerate(codes, 1):
             try:
+                if code not in prefetched:
+                    continue
                 print(f"분석 중: {i}/{total} - {code}")
-                result = self._analyze_single_stock(code, kospi_hist=kospi_hist)
+                result = self._analyze_single_stock(
+                    code, market=market, prefetched=prefetched[code], defer_entry_exit=True,
+                    fundamentals=fundamentals[code])
                 if result:
                     is_downtrend = result.get('tech_breakdown', {}).get('is_downtrend', False)
                     tech_adjusted, fund_adjusted, adjustment_msg = self._apply_regime_adjustment(
@@ -2226,10 +2110,12 @@ class TitanKRAnalyzer:
 
                     results.append(result)
 
-                time.sleep(0.3)
             except Exception as e:
                 print(f"  ⚠️  {code} 분석 실패: {e}")
 
+        # 스마트 진입/청산: 전 종목 1회 벡터 계산
+        self._apply_entry_exit(results, [r.pop('_entry_inputs') for r in results])
+
         print(f"\n✅ 2단계 완료: {len(results)}개 종목 분석 완료")
         print(f"📊 시장 상태: {regime_desc}\n")
         return results
@@ -3130,11 +3016,26 @@ if __name__ == "__main__":
     ╚═══════════════════════════════════════════════════════════╝
     """)
 
-    mode = 'growth'
-    if len(sys.argv) > 1:
-        mode = sys.argv[1].lower()
+    args = [a.lower() for a in sys.argv[1:] if not a.startswith('--')]
+    force = '--force' in sys.argv[1:]
+    multi_horizon = '--multi-horizon' in sys.argv[1:]
+    intraday = '--intraday' in sys.argv[1:]
+    mode = args[0] if args else 'growth'
 
     analyzer = TitanKRAnalyzer()
+
+    # KRX 휴장일 (주말/공휴일) 실행 생략 — 수동 실행은 --force
+    calendar = analyzer.data_provider.calendar
+    calendar.refresh()
+    if not force and not calendar.is_trading_day():
+        print(f"⏸️ KRX 휴장일 ({datetime.now(pytz.timezone('Asia/Seoul')).strftime('%Y-%m-%d')}) "
+              f"— 분석 생략 (강제 실행: --force)")
+        sys.exit(0)
+
+    # 장중 cron: 전종목 스냅샷 1회 → 저장된 히스토리에 잠정 봉 결합 (종목별 증분 조회 생략)
+    if intraday and calendar.is_market_open():
+        analyzer.data_provider.enable_intraday()
+
     holding_codes = _fetch_user_holding_codes(market='kr')
 
     if mode == 'value':
@@ -3150,6 +3051,11 @@ if __name__ == "__main__":
         report_type = "KOSPI Growth"
         filename = "titan_kr_growth_report.html"
 
+    # 다중 시간대 (3년 1회 조회 → 일/주/월봉, 주봉 추세로 스윙 진입 확인)
+    if multi_horizon:
+        analyzer.multi_horizon = True
+        print("🕐 다중 시간대 모드 (일/주/월봉)")
+
     print(f"📊 분석 대상: {len(codes)}개 종목\n")
 
     results = analyzer.stage2_deep_analysis(codes)
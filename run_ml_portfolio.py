@@ -24,6 +24,7 @@ def scan_titan_scores(min_score=MIN_SCORE):
     """Titan KR 분석으로 70점+ 종목 자동 추출 (Growth/Value 분리)"""
     analyzer = TitanKRAnalyzer(dart_api_key=dart_key)
     analyzer.data_provider = provider  # 프로바이더 공유
+    analyzer.share_ml_indicators = True  # 점수 지표 = ML 피처 지표 (종목당 1회 계산)
     growth_list = []
     value_list = []
 
@@ -79,12 +80,12 @@ print(f"   - Growth: {len(GROWTH_70_PLUS)}개 (기술적 분석)")
 print(f"   - Value: {len(VALUE_70_PLUS)}개 (펀더멘털 + 기술적 분석)")
 print("=" * 70)
 
-# ML 예측 실행 - 성장주와 가치주 분리
+# ML 예측 실행 - 성장주와 가치주 분리 (모드별 전 종목 풀링 모델 1회 학습)
 print("\n📈 성장주 ML 분석 중...")
-growth_results = train_and_predict(GROWTH_70_PLUS, value_mode=False)
+growth_results = train_and_predict(GROWTH_70_PLUS, value_mode=False, pooled=True)
 
 print("\n💎 가치주 ML 분석 중 (펀더멘털 피처 포함)...")
-value_results = train_and_predict(VALUE_70_PLUS, value_mode=True)
+value_results = train_and_predict(VALUE_70_PLUS, value_mode=True, pooled=True)
 
 # 결과 병합
 results = growth_results + value_results
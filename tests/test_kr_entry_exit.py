@@ -0,0 +1,358 @@
+# -*- coding: utf-8 -*-
+"""
+kr_entry_exit.entry_exit_batch ↔ 기존 종목별 계산 동등성 테스트
+
+기존 TitanKRAnalyzer._calculate_smart_entry_exit / _validate_risk_reward 를
+그대로 옮겨 둔 사본(_legacy_*)과 무작위 입력(동률, NaN 레벨, atr == 0 포함)에서
+매수가/목표가/손절가/전략명을 비교한다.
+"""
+
+import math
+import os
+import random
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kr_entry_exit import MIN_BARS, entry_exit_batch, pad_levels  # noqa: E402
+
+
+# ================================================================
+# 기존 종목별 구현 (변경 금지 — 비교 기준)
+# ================================================================
+def _legacy_nearest_below(levels, price):
+    candidates = [l for l in levels if l < price]
+    return max(candidates) if candidates else None
+
+
+def _legacy_nearest_above(levels, price):
+    candidates = [l for l in levels if l > price]
+    return min(candidates) if candidates else None
+
+
+def _legacy_validate_risk_reward(buy_price, target_price, stop_loss, atr, swing_highs):
+    """R:R >= 2.0 보장, 최대 손절 7%"""
+    max_stop = buy_price * 0.93
+    if stop_loss < max_stop:
+        stop_loss = max_stop
+
+    risk = buy_price - stop_loss
+    reward = target_price - buy_price
+    if risk > 0 and reward / risk < 2.0:
+        farther = [r for r in swing_highs if r > target_price]
+        if farther:
+            target_price = min(farther)
+        elif atr > 0:
+            target_price = buy_price + (3.0 * atr)
+        else:
+            target_price = buy_price * 1.12
+
+    return target_price, stop_loss
+
+
+def _legacy_entry_exit(current_price, contrarian_adj, bars, tech_breakdown, swing_lows, swing_highs):
+    try:
+        if bars < 20:
+            return None, None, None, "데이터 부족"
+
+        ma20 = tech_breakdown.get('ma20', 0)
+        ma60 = tech_breakdown.get('ma60', 0)
+        bb_upper = tech_breakdown.get('bb_upper', 0)
+        bb_lower = tech_breakdown.get('bb_lower', 0)
+        atr = tech_breakdown.get('atr_value', 0)
+
+        nearest_support = _legacy_nearest_below(swing_lows, current_price)
+        nearest_resistance = _legacy_nearest_above(swing_highs, current_price)
+
+        # ========== Tier 1: 역발상 매수 (과매도 우량주) ==========
+        if contrarian_adj > 0:
+            if bb_lower > 0 and bb_lower >= current_price * 0.97:
+                buy_price = bb_lower
+            else:
+                buy_price = current_price
+
+            if nearest_resistance and nearest_resistance > buy_price * 1.03:
+                target_price = nearest_resistance
+            elif bb_upper > 0 and bb_upper > buy_price * 1.03:
+                target_price = bb_upper
+            else:
+                target_price = buy_price + (1.5 * atr) if atr > 0 else buy_price * 1.08
+
+            atr_stop = buy_price - (2.0 * atr) if atr > 0 else buy_price * 0.95
+            struct_stop = nearest_support * 0.99 if nearest_support else atr_stop
+            stop_loss = max(atr_stop, struct_stop)
+            if stop_loss > buy_price * 0.98:
+                stop_loss = buy_price * 0.98
+            if stop_loss >= buy_price:
+                stop_loss = buy_price * 0.95
+
+            target_price, stop_loss = _legacy_validate_risk_reward(
+                buy_price, target_price, stop_loss, atr, swing_highs)
+            strategy = "🎯 역발상매수(기술적지지)"
+
+        # ========== Tier 2: 조정대기 (과열주) ==========
+        elif contrarian_adj < 0:
+            candidates = []
+            if ma20 > 0 and ma20 < current_price:
+                candidates.append(ma20)
+            if nearest_support and nearest_support < current_price:
+                candidates.append(nearest_support)
+            if atr > 0:
+                candidates.append(current_price - (2.0 * atr))
+
+            buy_price = max(candidates) if candidates else current_price * 0.95
+
+            if nearest_resistance and nearest_resistance > buy_price * 1.03:
+                target_price = nearest_resistance
+            elif bb_upper > 0:
+                target_price = bb_upper
+            else:
+                target_price = buy_price * 1.08
+
+            atr_stop = buy_price - (2.0 * atr) if atr > 0 else buy_price * 0.95
+            struct_stop = nearest_support * 0.99 if nearest_support else atr_stop
+            stop_loss = max(atr_stop, struct_stop)
+            if stop_loss >= buy_price:
+                stop_loss = buy_price * 0.95
+
+            target_price, stop_loss = _legacy_validate_risk_reward(
+                buy_price, target_price, stop_loss, atr, swing_highs)
+            strategy = "⚠️ 조정대기(진입조건가)"
+
+        # ========== Tier 3: 세분화 전략 (일반종목) ==========
+        else:
+            rsi = tech_breakdown.get('rsi_value', 50)
+            ma120 = tech_breakdown.get('ma120', 0)
+
+            uptrend = (ma20 > 0 and ma60 > 0 and ma20 > ma60)
+            price_above_ma20 = (ma20 > 0 and current_price > ma20)
+            sideways = (ma20 > 0 and ma60 > 0 and abs(ma20 - ma60) / ma60 < 0.02)
+            weak = (ma60 > 0 and current_price < ma60) or rsi < 40
+
+            # --- Tier 3A: 추세추종 ---
+            if uptrend and price_above_ma20 and rsi >= 50:
+                buy_price = current_price
+                if nearest_resistance and nearest_resistance > current_price * 1.02:
+                    target_price = nearest_resistance
+                elif bb_upper > 0 and bb_upper > current_price * 1.02:
+                    target_price = bb_upper
+                else:
+                    target_price = current_price + (2.0 * atr) if atr > 0 else current_price * 1.08
+                atr_stop = current_price - (2.0 * atr) if atr > 0 else current_price * 0.95
+                ma20_stop = ma20 * 0.99 if ma20 > 0 else atr_stop
+                stop_loss = max(atr_stop, ma20_stop)
+                if stop_loss > current_price * 0.98:
+                    stop_loss = current_price * 0.98
+                if stop_loss >= current_price:
+                    stop_loss = current_price * 0.95
+                target_price, stop_loss = _legacy_validate_risk_reward(
+                    buy_price, target_price, stop_loss, atr, swing_highs)
+                strategy = "📈 추세추종(MA20↑)"
+
+            # --- Tier 3B: 풀백매수 ---
+            elif uptrend and not price_above_ma20:
+                support_candidates = []
+                if ma20 > 0 and ma20 < current_price * 1.03:
+                    support_candidates.append(('MA20', ma20))
+                if bb_lower > 0 and bb_lower < current_price:
+                    support_candidates.append(('BB하단', bb_lower))
+                if nearest_support and nearest_support < current_price:
+                    support_candidates.append(('스윙저점', nearest_support))
+                if support_candidates:
+                    best_label, best_support = max(support_candidates, key=lambda x: x[1])
+                    buy_price = best_support
+                    strategy_suffix = best_label
+                else:
+                    buy_price = ma20 if ma20 > 0 else current_price
+                    strategy_suffix = "MA20"
+                if nearest_resistance and nearest_resistance > current_price:
+                    target_price = nearest_resistance
+                elif bb_upper > 0 and bb_upper > current_price:
+                    target_price = bb_upper
+                else:
+                    target_price = buy_price + (2.0 * atr) if atr > 0 else buy_price * 1.08
+                supports_below = [l for l in swing_lows if l < buy_price]
+                struct_stop = max(supports_below) * 0.99 if supports_below else buy_price * 0.95
+                atr_stop = buy_price - (2.0 * atr) if atr > 0 else buy_price * 0.95
+                stop_loss = max(atr_stop, struct_stop)
+                if stop_loss > buy_price * 0.98:
+                    stop_loss = buy_price * 0.98
+                if stop_loss >= buy_price:
+                    stop_loss = buy_price * 0.95
+                target_price, stop_loss = _legacy_validate_risk_reward(
+                    buy_price, target_price, stop_loss, atr, swing_highs)
+                strategy = f"📊 풀백매수({strategy_suffix})"
+
+            # --- Tier 3C: 박스권하단 ---
+            elif sideways or (not uptrend and not weak):
+                support_candidates = []
+                if bb_lower > 0 and bb_lower < current_price:
+                    support_candidates.append(('BB하단', bb_lower))
+                if nearest_support and nearest_support < current_price:
+                    support_candidates.append(('스윙저점', nearest_support))
+                if ma60 > 0 and ma60 < current_price:
+                    support_candidates.append(('MA60', ma60))
+                if support_candidates:
+                    best_label, best_support = max(support_candidates, key=lambda x: x[1])
+                    buy_price = best_support
+                    strategy_suffix = best_label
+                else:
+                    buy_price = current_price * 0.97
+                    strategy_suffix = "지지선"
+                if nearest_resistance and nearest_resistance > current_price:
+                    target_price = nearest_resistance
+                elif bb_upper > 0 and bb_upper > current_price:
+                    target_price = bb_upper
+                else:
+                    target_price = buy_price + (1.5 * atr) if atr > 0 else buy_price * 1.06
+                supports_below = [l for l in swing_lows if l < buy_price]
+                struct_stop = max(supports_below) * 0.99 if supports_below else buy_price * 0.95
+                atr_stop = buy_price - (2.0 * atr) if atr > 0 else buy_price * 0.95
+                stop_loss = max(atr_stop, struct_stop)
+                if stop_loss > buy_price * 0.98:
+                    stop_loss = buy_price * 0.98
+                if stop_loss >= buy_price:
+                    stop_loss = buy_price * 0.95
+                target_price, stop_loss = _legacy_validate_risk_reward(
+                    buy_price, target_price, stop_loss, atr, swing_highs)
+                strategy = f"📦 박스권하단({strategy_suffix})"
+
+            # --- Tier 3D: 반등대기 ---
+            else:
+                support_candidates = []
+                if nearest_support and nearest_support < current_price:
+                    support_candidates.append(('스윙저점', nearest_support))
+                if ma120 > 0 and ma120 < current_price:
+                    support_candidates.append(('MA120', ma120))
+                if bb_lower > 0 and bb_lower < current_price:
+                    support_candidates.append(('BB하단', bb_lower))
+                if support_candidates:
+                    best_label, best_support = max(support_candidates, key=lambda x: x[1])
+                    buy_price = best_support
+                    strategy_suffix = best_label
+                else:
+                    buy_price = current_price * 0.95
+                    strategy_suffix = "지지확인"
+                if ma60 > 0 and ma60 > current_price:
+                    target_price = ma60
+                elif nearest_resistance and nearest_resistance > current_price:
+                    target_price = nearest_resistance
+                else:
+                    target_price = buy_price + (1.5 * atr) if atr > 0 else buy_price * 1.06
+                supports_below = [l for l in swing_lows if l < buy_price]
+                struct_stop = max(supports_below) * 0.99 if supports_below else buy_price * 0.95
+                atr_stop = buy_price - (1.5 * atr) if atr > 0 else buy_price * 0.95
+                stop_loss = max(atr_stop, struct_stop)
+                if stop_loss > buy_price * 0.97:
+                    stop_loss = buy_price * 0.97
+                if stop_loss >= buy_price:
+                    stop_loss = buy_price * 0.95
+                target_price, stop_loss = _legacy_validate_risk_reward(
+                    buy_price, target_price, stop_loss, atr, swing_highs)
+                strategy = f"🔄 반등대기({strategy_suffix})"
+
+        return buy_price, target_price, stop_loss, strategy
+
+    except Exception:
+        return None, None, None, "계산 실패"
+
+
+# ================================================================
+# 무작위 입력
+# ================================================================
+def _random_rows(seed, n):
+    rng = random.Random(seed)
+
+    def level(price, missing=0.2):
+        return 0 if rng.random() < missing else price * rng.uniform(0.85, 1.15)
+
+    rows = []
+    for _ in range(n):
+        price = rng.choice([1000, 5230, 71200, 123.5]) * rng.uniform(0.9, 1.1)
+        if rng.random() < 0.3:
+            price = int(price)
+        tech = {'ma20': level(price), 'ma60': level(price), 'ma120': level(price),
+                'bb_upper': level(price), 'bb_lower': level(price),
+                'atr_value': 0 if rng.random() < 0.2 else price * rng.uniform(0.005, 0.05)}
+        if rng.random() < 0.8:
+            tech['rsi_value'] = rng.uniform(20, 80)
+        lows = sorted({price * rng.uniform(0.7, 1.05) for _ in range(rng.randint(0, 6))})
+        highs = sorted({price * rng.uniform(0.95, 1.4) for _ in range(rng.randint(0, 6))})
+
+        # 동률: MA 끼리, BB하단 = 스윙저점, 현재가 = 레벨
+        if rng.random() < 0.1:
+            tech['ma20'] = tech['ma60']
+        if rng.random() < 0.05 and lows:
+            tech['bb_lower'] = lows[-1]
+        if rng.random() < 0.05:
+            tech['ma20'] = price
+        if rng.random() < 0.05 and highs:
+            highs[0] = price
+        # NaN 레벨 (빈 목록은 pad_levels 에서 NaN 패딩)
+        if rng.random() < 0.05:
+            lows.append(float('nan'))
+        if rng.random() < 0.05:
+            highs.insert(0, float('nan'))
+
+        contrarian_adj = rng.choice([-5, -3, 0, 0, 0, 5])
+        bars = rng.choice([10, MIN_BARS, 60, 200])
+        rows.append((price, contrarian_adj, bars, tech, lows, highs))
+    return rows
+
+
+def _batch(rows):
+    def column(key, default=0):
+        return [tech.get(key, default) for _, _, _, tech, _, _ in rows]
+
+    return entry_exit_batch(
+        price=[row[0] for row in rows],
+        contrarian_adj=[row[1] for row in rows],
+        ma20=column('ma20'), ma60=column('ma60'), ma120=column('ma120'),
+        bb_upper=column('bb_upper'), bb_lower=column('bb_lower'),
+        atr=column('atr_value'), rsi=column('rsi_value', 50),
+        swing_lows=pad_levels([row[4] for row in rows]),
+        swing_highs=pad_levels([row[5] for row in rows]),
+        bars=[row[2] for row in rows])
+
+
+def _same_price(expected, got):
+    if expected is None:
+        return math.isnan(got)
+    return expected == got
+
+
+# ================================================================
+# 테스트
+# ================================================================
+@pytest.mark.parametrize('seed', [1, 7, 2024])
+def test_batch_matches_legacy(seed):
+    rows = _random_rows(seed, 5000)
+    buy, target, stop, strategy = _batch(rows)
+
+    mismatches = []
+    for i, (price, adj, bars, tech, lows, highs) in enumerate(rows):
+        expected = _legacy_entry_exit(price, adj, bars, tech, lows, highs)
+        got = (buy[i], target[i], stop[i], strategy[i])
+        if expected[3] != got[3] or not all(_same_price(e, g) for e, g in zip(expected[:3], got[:3])):
+            mismatches.append((i, expected, got))
+
+    assert not mismatches, f"{len(mismatches)} mismatches, first: {mismatches[:3]}"
+
+
+def test_batch_covers_all_tiers():
+    _, _, _, strategy = _batch(_random_rows(1, 5000))
+    tiers = {label.split('(')[0] for label in strategy}
+    assert tiers >= {"🎯 역발상매수", "⚠️ 조정대기", "📈 추세추종", "📊 풀백매수",
+                     "📦 박스권하단", "🔄 반등대기", "데이터 부족"}
+
+
+def test_single_row_without_levels():
+    """레벨이 전혀 없고 atr == 0 인 종목 1개"""
+    tech = {'ma20': 0, 'ma60': 0, 'ma120': 0, 'bb_upper': 0, 'bb_lower': 0, 'atr_value': 0}
+    rows = [(10000, 0, 60, tech, [], [])]
+    buy, target, stop, strategy = _batch(rows)
+    expected = _legacy_entry_exit(10000, 0, 60, tech, [], [])
+    assert (buy[0], target[0], stop[0], strategy[0]) == expected